@@ -2,134 +2,299 @@
 """
 API Bridge for Agent Communication
 Connects Strapi backend to Python agents
+
+Runs either once per call (--action/--data) or as a persistent bridge
+(--serve, optionally --socket PATH) that reads newline-delimited JSON
+requests of the form {"id": ..., "action": ..., "data": {...}} and answers
+each with {"id": ..., "success": ..., "result"/"error": ...}.
 """
 
 import asyncio
 import argparse
-import json
+import atexit
+import functools
 import sys
 import os
-from pathlib import Path
 
-# Add agents directory to Python path
-agents_dir = Path(__file__).parent
-sys.path.insert(0, str(agents_dir))
+from communication.config_example import TiDBConfig
+from communication.serialization import dumps, loads
 
-from communication.tidb_service import TiDBCommunicationService
-from specialized.analytics_agent import AnalyticsAgent
-from specialized.assessment_agent import AssessmentAgent
-from specialized.research_agent import ResearchAgent
-from specialized.content_generation_agent import ContentGenerationAgent
-from specialized.personalization_agent import PersonalizationAgent
-from specialized.tutor_agent import TutorAgent
 
-async def main():
-    parser = argparse.ArgumentParser(description='Agent API Bridge')
-    parser.add_argument('--action', required=True, help='Action to perform')
-    parser.add_argument('--data', required=True, help='Data as JSON string')
+# TiDB settings, read from the environment once at import
+_CFG = TiDBConfig(
+    host=os.getenv('TIDB_HOST', 'localhost'),
+    port=int(os.getenv('TIDB_PORT', 4000)),
+    user=os.getenv('TIDB_USER', 'root'),
+    password=os.getenv('TIDB_PASSWORD', ''),
+    database=os.getenv('TIDB_DATABASE', 'edulms'),
+    pool_size=int(os.getenv('TIDB_POOL_SIZE', 25)),
+    ssl_disabled=False,
+    scan_pool_size=int(os.getenv('TIDB_SCAN_POOL_SIZE', 2))
+)
+
+
+# Agent factories. Imports are local so a call only pays for the agent it
+# actually uses; lru_cache keeps the instance around for repeated calls.
+@functools.lru_cache(maxsize=None)
+def _analytics_agent():
+    from specialized.analytics_agent import AnalyticsAgent
+    return AnalyticsAgent()
+
+
+@functools.lru_cache(maxsize=None)
+def _assessment_agent():
+    from specialized.assessment_agent import AssessmentAgent
+    return AssessmentAgent()
+
+
+@functools.lru_cache(maxsize=None)
+def _research_agent():
+    from specialized.research_agent import ResearchAgent
+    return ResearchAgent()
+
+
+@functools.lru_cache(maxsize=None)
+def _content_agent():
+    from specialized.content_generation_agent import ContentGenerationAgent
+    return ContentGenerationAgent()
+
+
+@functools.lru_cache(maxsize=None)
+def _personalization_agent():
+    from specialized.personalization_agent import PersonalizationAgent
+    return PersonalizationAgent()
+
+
+@functools.lru_cache(maxsize=1)
+def _tidb_service():
+    # One service (and connection pool) per process, shared by every
+    # message action and closed cleanly on exit.
+    from communication.tidb_service import TiDBCommunicationService
+    service = TiDBCommunicationService(**_CFG._asdict())
+    atexit.register(lambda: asyncio.run(service.close()))
+    return service
+
+
+# action -> (target factory, method name, argument extractor)
+ACTIONS = {
+    'analytics_query': (
+        _analytics_agent,
+        'generate_analytics_report',
+        lambda data: dict(
+            query_type=data.get('query_type'),
+            user_id=data.get('user_id'),
+            course_id=data.get('course_id'),
+            timeframe=data.get('timeframe', '30d')
+        )
+    ),
+    'create_quiz': (
+        _assessment_agent,
+        'create_quiz',
+        lambda data: dict(
+            lesson_content=data.get('lesson_content'),
+            difficulty=data.get('difficulty', 'intermediate'),
+            num_questions=data.get('num_questions', 5)
+        )
+    ),
+    'grade_assignment': (
+        _assessment_agent,
+        'grade_assignment',
+        lambda data: dict(
+            assignment_text=data.get('assignment_text'),
+            rubric=data.get('rubric', ''),
+            max_score=100
+        )
+    ),
+    'research_query': (
+        _research_agent,
+        'conduct_research',
+        lambda data: dict(
+            query=data.get('query'),
+            research_type=data.get('research_type', 'academic_search'),
+            depth=data.get('depth', 'standard')
+        )
+    ),
+    'generate_content': (
+        _content_agent,
+        'generate_lesson_content',
+        lambda data: dict(
+            topic=data.get('topic'),
+            difficulty_level=data.get('difficulty_level', 'intermediate'),
+            content_type=data.get('content_type', 'lesson')
+        )
+    ),
+    'update_personalization': (
+        _personalization_agent,
+        'update_user_profile',
+        lambda data: dict(
+            user_id=data.get('user_id'),
+            learning_data=data
+        )
+    ),
+    'send_message': (
+        _tidb_service,
+        'send_message',
+        lambda data: dict(
+            channel=data.get('channel'),
+            sender_agent=data.get('sender_agent'),
+            message=data.get('message'),
+            recipient_agent=data.get('recipient_agent')
+        )
+    ),
+    'get_messages': (
+        _tidb_service,
+        'poll_messages',
+        lambda data: dict(
+            channel=data.get('channel'),
+            agent_name='api_bridge',
+            limit=data.get('limit', 10)
+        )
+    ),
+    'send_messages': (
+        _tidb_service,
+        'send_messages',
+        lambda data: dict(messages=data.get('messages') or [])
+    ),
+    'get_messages_multi': (
+        _tidb_service,
+        'poll_messages_multi',
+        lambda data: dict(
+            channels=data.get('channels') or [],
+            agent_name='api_bridge',
+            limit=data.get('limit', 10)
+        )
+    ),
+}
+
+
+async def dispatch(action, data):
+    """Run a single bridge action and return its result."""
+    if action == 'get_status':
+        return {
+            'agents_active': 9,
+            'tidb_connected': True,
+            'gemini_connected': True,
+            'last_updated': '2024-09-15T21:15:00Z'
+        }
     
-    args = parser.parse_args()
+    try:
+        factory, method_name, extract_args = ACTIONS[action]
+    except KeyError:
+        raise ValueError(f"Unknown action: {action}") from None
     
+    handler = getattr(factory(), method_name)
+    return await handler(**extract_args(data))
+
+
+async def _handle_request(line, write):
+    """Decode one newline-delimited JSON request and write its response."""
+    request_id = None
+    action = None
     try:
-        data = json.loads(args.data)
-        
-        # Initialize agents
-        analytics_agent = AnalyticsAgent()
-        assessment_agent = AssessmentAgent()
-        research_agent = ResearchAgent()
-        content_agent = ContentGenerationAgent()
-        personalization_agent = PersonalizationAgent()
-        tutor_agent = TutorAgent()
+        request = loads(line)
+        request_id = request.get('id')
+        action = request.get('action')
+        result = await dispatch(action, request.get('data') or {})
+        response = {'id': request_id, 'success': True, 'result': result}
+    except Exception as e:
+        response = {
+            'id': request_id,
+            'success': False,
+            'error': str(e),
+            'action': action
+        }
+    await write(dumps(response, default=str) + '\n')
+
+
+async def _serve_stream(reader, write):
+    """Serve requests from a stream until EOF, one task per request."""
+    tasks = set()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        task = asyncio.create_task(_handle_request(line, write))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def serve_stdio():
+    """Serve newline-delimited JSON requests on stdin, responses on stdout."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+    )
+    
+    async def write(payload):
+        sys.stdout.write(payload)
+        sys.stdout.flush()
+    
+    await _serve_stream(reader, write)
+
+
+async def serve_socket(path):
+    """Serve newline-delimited JSON requests on a Unix domain socket."""
+    async def handle_client(reader, writer):
+        lock = asyncio.Lock()
         
-        result = None
+        async def write(payload):
+            async with lock:
+                writer.write(payload.encode())
+                await writer.drain()
         
-        if args.action == 'analytics_query':
-            result = await analytics_agent.generate_analytics_report(
-                query_type=data.get('query_type'),
-                user_id=data.get('user_id'),
-                course_id=data.get('course_id'),
-                timeframe=data.get('timeframe', '30d')
-            )
-            
-        elif args.action == 'create_quiz':
-            result = await assessment_agent.create_quiz(
-                lesson_content=data.get('lesson_content'),
-                difficulty=data.get('difficulty', 'intermediate'),
-                num_questions=data.get('num_questions', 5)
-            )
-            
-        elif args.action == 'grade_assignment':
-            result = await assessment_agent.grade_assignment(
-                assignment_text=data.get('assignment_text'),
-                rubric=data.get('rubric', ''),
-                max_score=100
-            )
-            
-        elif args.action == 'research_query':
-            result = await research_agent.conduct_research(
-                query=data.get('query'),
-                research_type=data.get('research_type', 'academic_search'),
-                depth=data.get('depth', 'standard')
-            )
-            
-        elif args.action == 'generate_content':
-            result = await content_agent.generate_lesson_content(
-                topic=data.get('topic'),
-                difficulty_level=data.get('difficulty_level', 'intermediate'),
-                content_type=data.get('content_type', 'lesson')
-            )
-            
-        elif args.action == 'update_personalization':
-            result = await personalization_agent.update_user_profile(
-                user_id=data.get('user_id'),
-                learning_data=data
-            )
-            
-        elif args.action == 'send_message':
-            # Initialize TiDB service for message passing
-            tidb_service = TiDBCommunicationService(
-                host=os.getenv('TIDB_HOST', 'localhost'),
-                port=int(os.getenv('TIDB_PORT', 4000)),
-                user=os.getenv('TIDB_USER', 'root'),
-                password=os.getenv('TIDB_PASSWORD', ''),
-                database=os.getenv('TIDB_DATABASE', 'edulms')
-            )
-            
-            result = await tidb_service.send_message(
-                channel=data.get('channel'),
-                sender_agent=data.get('sender_agent'),
-                message=data.get('message'),
-                recipient_agent=data.get('recipient_agent')
-            )
-            
-        elif args.action == 'get_messages':
-            tidb_service = TiDBCommunicationService(
-                host=os.getenv('TIDB_HOST', 'localhost'),
-                port=int(os.getenv('TIDB_PORT', 4000)),
-                user=os.getenv('TIDB_USER', 'root'),
-                password=os.getenv('TIDB_PASSWORD', ''),
-                database=os.getenv('TIDB_DATABASE', 'edulms')
-            )
-            
-            result = await tidb_service.poll_messages(
-                channel=data.get('channel'),
-                agent_name='api_bridge',
-                limit=data.get('limit', 10)
-            )
-            
-        elif args.action == 'get_status':
-            result = {
-                'agents_active': 9,
-                'tidb_connected': True,
-                'gemini_connected': True,
-                'last_updated': '2024-09-15T21:15:00Z'
-            }
-            
+        try:
+            await _serve_stream(reader, write)
+        finally:
+            writer.close()
+    
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(handle_client, path=path)
+    async with server:
+        await server.serve_forever()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Agent API Bridge')
+    parser.add_argument('--action', help='Action to perform')
+    parser.add_argument('--data', help='Data as JSON string')
+    parser.add_argument(
+        '--serve', action='store_true',
+        help='Run as a persistent bridge reading JSON lines from stdin'
+    )
+    parser.add_argument(
+        '--socket', help='Serve on this Unix domain socket instead of stdin'
+    )
+    
+    args = parser.parse_args()
+    
+    if args.serve or args.socket:
+        if args.socket:
+            await serve_socket(args.socket)
         else:
-            raise ValueError(f"Unknown action: {args.action}")
+            await serve_stdio()
+        return
+    
+    if not args.action or args.data is None:
+        parser.error('--action and --data are required unless --serve is given')
+    
+    # mysql-connector opens the whole pool up front; a one-shot call needs
+    # only one connection, and cross-process reuse belongs to a pooler such
+    # as ProxySQL (see proxysql/ at the repository root).
+    global _CFG
+    _CFG = _CFG._replace(pool_size=1, scan_pool_size=1)
+    
+    try:
+        data = loads(args.data)
+        result = await dispatch(args.action, data)
         
         # Output result as JSON
-        print(json.dumps(result, indent=2, default=str))
+        print(dumps(result, default=str, indent=True))
         
     except Exception as e:
         error_result = {
@@ -137,8 +302,17 @@ async def main():
             'error': str(e),
             'action': args.action
         }
-        print(json.dumps(error_result, indent=2))
+        print(dumps(error_result, indent=True))
         sys.exit(1)
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    # uvloop on POSIX, winloop on Windows, plain asyncio if neither is installed
+    for loop_module in ('uvloop', 'winloop'):
+        try:
+            run = __import__(loop_module).run
+            break
+        except ImportError:
+            continue
+    else:
+        run = asyncio.run
+    run(main())
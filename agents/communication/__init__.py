@@ -6,6 +6,10 @@ for the multi-agent system, including messaging, caching, session management,
 task queuing, and real-time notifications.
 """
 
+import asyncio
+import os
+from typing import Optional
+
 from .tidb_service import (
     TiDBCommunicationService,
     AgentMessage,
@@ -45,6 +49,8 @@ from .notification_service import (
     NotificationEvent
 )
 
+from .cdc_backend import TiCDCNotificationBackend
+
 __all__ = [
     # Core service
     "TiDBCommunicationService",
@@ -78,7 +84,8 @@ __all__ = [
     "MessagePollingService",
     "SubscriptionType",
     "Subscription",
-    "NotificationEvent"
+    "NotificationEvent",
+    "TiCDCNotificationBackend"
 ]
 
 
@@ -98,7 +105,13 @@ class AgentCommunicationHub:
         password: str,
         database: str,
         pool_size: int = 10,
-        ssl_disabled: bool = False
+        ssl_disabled: bool = False,
+        scan_pool_size: int = 2,
+        use_native_ttl: bool = False,
+        use_fulltext_search: bool = False,
+        cdc_bootstrap_servers: Optional[str] = None,
+        cdc_topic: str = "agent-messages",
+        cdc_fallback_poll_interval: float = 30
     ):
         """
         Initialize the communication hub.
@@ -111,6 +124,17 @@ class AgentCommunicationHub:
             database: Database name
             pool_size: Connection pool size
             ssl_disabled: Whether to disable SSL
+            scan_pool_size: Connection pool size for large scans and admin
+                            queries
+            use_native_ttl: Whether agent_cache uses TiDB table TTL for expiry
+            use_fulltext_search: Whether session content search uses the
+                                 TiDB full-text index (requires TiFlash)
+            cdc_bootstrap_servers: Kafka servers of a TiCDC changefeed on
+                                   agent_messages; when set, subscribers get
+                                   messages pushed instead of polling for them
+            cdc_topic: Kafka topic of the changefeed
+            cdc_fallback_poll_interval: Minimum polling interval in seconds
+                                        while the changefeed is in use
         """
         # Initialize core communication service
         self.comm_service = TiDBCommunicationService(
@@ -120,28 +144,70 @@ class AgentCommunicationHub:
             password=password,
             database=database,
             pool_size=pool_size,
-            ssl_disabled=ssl_disabled
+            ssl_disabled=ssl_disabled,
+            scan_pool_size=scan_pool_size
         )
         
         # Initialize specialized managers
-        self.cache_manager = CacheManager(self.comm_service)
-        self.session_manager = SessionManager(self.comm_service)
+        self.cache_manager = CacheManager(
+            self.comm_service,
+            use_native_ttl=use_native_ttl
+        )
+        self.session_manager = SessionManager(
+            self.comm_service,
+            use_fulltext_search=use_fulltext_search
+        )
         self.task_queue_manager = TaskQueueManager(self.comm_service)
-        self.notification_service = TriggerNotificationService(self.comm_service)
-        self.polling_service = MessagePollingService(self.comm_service)
+        if cdc_bootstrap_servers:
+            self.notification_service = TiCDCNotificationBackend(
+                self.comm_service,
+                bootstrap_servers=cdc_bootstrap_servers,
+                topic=cdc_topic
+            )
+        else:
+            self.notification_service = TriggerNotificationService(self.comm_service)
+        # With a changefeed pushing messages, polling is only a safety net
+        self.polling_service = MessagePollingService(
+            self.comm_service,
+            min_poll_interval=cdc_fallback_poll_interval if cdc_bootstrap_servers else 0
+        )
+        self.notification_service.polling_service = self.polling_service
+        self._gemini_warmup_task: Optional[asyncio.Task] = None
     
     async def start(self) -> None:
         """Start all communication services."""
+        # Warm the Gemini connection in the background while the rest of
+        # startup runs; disable with GEMINI_WARMUP=0
+        if os.getenv("GEMINI_WARMUP", "1") == "1" and os.getenv("GOOGLE_API_KEY"):
+            from .gemini_client import get_gemini_client
+            self._gemini_warmup_task = asyncio.create_task(get_gemini_client().warmup())
+        
         await self.cache_manager.start_cleanup_scheduler()
         await self.notification_service.start_notification_service()
         await self.polling_service.start_polling_service()
     
     async def stop(self) -> None:
         """Stop all communication services."""
-        await self.cache_manager.stop_cleanup_scheduler()
-        await self.notification_service.stop_notification_service()
-        await self.polling_service.stop_polling_service()
-        await self.comm_service.close()
+        if self._gemini_warmup_task is not None:
+            self._gemini_warmup_task.cancel()
+            try:
+                await self._gemini_warmup_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._gemini_warmup_task = None
+        
+        # Buffered writes go out first; a failed flush must not leave the
+        # other services running
+        try:
+            await self.session_manager.flush()
+        finally:
+            try:
+                await self.task_queue_manager.flush()
+            finally:
+                await self.cache_manager.stop_cleanup_scheduler()
+                await self.notification_service.stop_notification_service()
+                await self.polling_service.stop_polling_service()
+                await self.comm_service.close()
     
     async def health_check(self) -> dict:
         """
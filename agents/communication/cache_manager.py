@@ -6,18 +6,22 @@ pattern matching, and automatic cleanup for the multi-agent system.
 """
 
 import asyncio
+import functools
 import logging
 import re
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Pattern
 from dataclasses import dataclass
 
+from cachetools import TTLCache
+
+from .serialization import decode_cache_value
 from .tidb_service import TiDBCommunicationService
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class CacheEntry:
     """Cache entry data structure."""
     key: str
@@ -50,25 +54,49 @@ class CacheManager:
     pattern-based invalidation, and comprehensive statistics.
     """
 
-    def __init__(self, communication_service: TiDBCommunicationService):
+    def __init__(
+        self,
+        communication_service: TiDBCommunicationService,
+        local_cache_size: int = 10_000,
+        local_cache_ttl: int = 60,
+        use_native_ttl: bool = False
+    ):
         """
         Initialize cache manager.
         
         Args:
             communication_service: TiDB communication service instance
+            local_cache_size: Maximum entries held in the in-process cache
+            local_cache_ttl: Seconds an entry may be served from the
+                             in-process cache before TiDB is consulted again
+            use_native_ttl: Whether agent_cache expiry is handled by TiDB's
+                            table TTL, making the cleanup scheduler unnecessary
         """
         self.comm_service = communication_service
+        self.local_cache = TTLCache(maxsize=local_cache_size, ttl=local_cache_ttl)
+        self.local_cache_ttl = local_cache_ttl
+        self.hits = 0
+        self.misses = 0
+        self._pattern_cache: Dict[str, Pattern] = {}
         self.cleanup_interval = 3600  # 1 hour default
         self.cleanup_task: Optional[asyncio.Task] = None
         self.running = False
+        self.warm_chunk_size = 500  # Rows per multi-row INSERT
+        self.use_native_ttl = use_native_ttl
 
     async def start_cleanup_scheduler(self, interval_seconds: int = 3600) -> None:
         """
         Start automatic cleanup scheduler.
         
+        Does nothing when TiDB expires rows itself (use_native_ttl).
+        
         Args:
             interval_seconds: Cleanup interval in seconds
         """
+        if self.use_native_ttl:
+            logger.info("Cache cleanup handled by TiDB table TTL; scheduler not started")
+            return
+        
         self.cleanup_interval = interval_seconds
         self.running = True
         self.cleanup_task = asyncio.create_task(self._cleanup_scheduler())
@@ -128,6 +156,7 @@ class CacheManager:
             agent_name=agent_name,
             result_type=result_type
         )
+        self._store_local(cache_key, value, ttl_seconds)
 
     async def get(
         self,
@@ -138,6 +167,10 @@ class CacheManager:
         """
         Retrieve value from cache.
         
+        Hot keys are served from the in-process cache, so a value may be
+        returned for up to ``local_cache_ttl`` seconds after it was changed
+        or expired in TiDB by another process.
+        
         Args:
             key: Cache key
             agent_name: Agent requesting the value
@@ -147,7 +180,90 @@ class CacheManager:
             Cached value or None if not found/expired
         """
         cache_key = self._build_key(key, namespace)
-        return await self.comm_service.get_cache(cache_key, agent_name)
+        
+        try:
+            value = self.local_cache[cache_key]
+            self.hits += 1
+            return value
+        except KeyError:
+            pass
+        
+        value = await self.comm_service.get_cache(cache_key, agent_name)
+        
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.local_cache[cache_key] = value
+        return value
+
+    async def mset(
+        self,
+        entries: List[Dict[str, Any]],
+        agent_name: str
+    ) -> int:
+        """
+        Store multiple values in cache with batched inserts.
+        
+        Args:
+            entries: List of cache entries
+                    Each entry should have: key, value, ttl_seconds,
+                    result_type (optional), namespace (optional)
+            agent_name: Agent storing the values
+            
+        Returns:
+            Number of entries stored
+        """
+        rows = [
+            {
+                "key": self._build_key(entry["key"], entry.get("namespace")),
+                "result": entry["value"],
+                "ttl_seconds": entry["ttl_seconds"],
+                "result_type": entry.get("result_type")
+            }
+            for entry in entries
+        ]
+        written = await self.comm_service.set_cache_many(rows, agent_name)
+        for row in rows:
+            self._store_local(row["key"], row["result"], row["ttl_seconds"])
+        return written
+
+    async def mget(
+        self,
+        keys: List[str],
+        agent_name: str,
+        namespace: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve multiple values from cache with batched reads.
+        
+        Args:
+            keys: Cache keys
+            agent_name: Agent requesting the values
+            namespace: Optional namespace for key organization
+            
+        Returns:
+            Mapping of found keys (without namespace) to cached values
+        """
+        cache_keys = {self._build_key(key, namespace): key for key in keys}
+        
+        values = {}
+        remote_keys = []
+        for cache_key, key in cache_keys.items():
+            try:
+                values[key] = self.local_cache[cache_key]
+            except KeyError:
+                remote_keys.append(cache_key)
+        
+        if remote_keys:
+            found = await self.comm_service.get_cache_many(remote_keys, agent_name)
+            for cache_key, value in found.items():
+                self.local_cache[cache_key] = value
+                values[cache_keys[cache_key]] = value
+        
+        self.hits += len(values)
+        self.misses += len(cache_keys) - len(values)
+        return values
 
     async def delete(
         self,
@@ -167,6 +283,7 @@ class CacheManager:
             True if entry was deleted, False if not found
         """
         cache_key = self._build_key(key, namespace)
+        self.local_cache.pop(cache_key, None)
         count = await self.comm_service.invalidate_cache(cache_key, agent_name)
         return count > 0
 
@@ -188,6 +305,7 @@ class CacheManager:
             Number of invalidated entries
         """
         cache_pattern = self._build_key(pattern, namespace)
+        self._evict_local_pattern(cache_pattern)
         return await self.comm_service.invalidate_cache(cache_pattern, agent_name)
 
     async def invalidate_by_agent(self, agent_name: str) -> int:
@@ -202,13 +320,17 @@ class CacheManager:
         """
         query = "DELETE FROM agent_cache WHERE agent_name = %s"
         
+        # Local entries don't record their agent, so drop them all
+        self.local_cache.clear()
+        
         try:
-            await self.comm_service._execute_query(query, (agent_name,))
-            
-            # Get affected row count
-            count_query = "SELECT ROW_COUNT() as count"
-            result = await self.comm_service._execute_query(count_query, fetch=True, fetch_one=True)
-            invalidated_count = result["count"] if result else 0
+            invalidated_count = await self.comm_service._execute_query(
+                query,
+                (agent_name,),
+                return_rowcount=True,
+                prepared=True,
+                pool="scan"
+            )
             
             logger.debug(f"Invalidated {invalidated_count} cache entries for agent {agent_name}")
             return invalidated_count
@@ -230,13 +352,13 @@ class CacheManager:
         """
         query = "DELETE FROM agent_cache WHERE result_type = %s"
         
+        # Local entries don't record their type, so drop them all
+        self.local_cache.clear()
+        
         try:
-            await self.comm_service._execute_query(query, (result_type,))
-            
-            # Get affected row count
-            count_query = "SELECT ROW_COUNT() as count"
-            result = await self.comm_service._execute_query(count_query, fetch=True, fetch_one=True)
-            invalidated_count = result["count"] if result else 0
+            invalidated_count = await self.comm_service._execute_query(
+                query, (result_type,), return_rowcount=True, prepared=True
+            )
             
             # Log operation
             await self.comm_service._log_operation(
@@ -282,20 +404,25 @@ class CacheManager:
         Returns:
             Cache statistics
         """
+        # WITH ROLLUP adds per-agent subtotal rows and a grand total row
+        # (flagged by GROUPING()), so totals are computed server-side.
         stats_query = """
         SELECT 
+            agent_name,
+            result_type,
+            GROUPING(agent_name) as agent_rollup,
+            GROUPING(result_type) as type_rollup,
             COUNT(*) as total_entries,
             COUNT(CASE WHEN expires_at <= NOW() THEN 1 END) as expired_entries,
-            AVG(access_count) as avg_access_count,
-            SUM(CHAR_LENGTH(result)) as total_size_bytes,
-            agent_name,
-            result_type
+            SUM(OCTET_LENGTH(result)) as total_size_bytes
         FROM agent_cache
-        GROUP BY agent_name, result_type
+        GROUP BY agent_name, result_type WITH ROLLUP
         """
         
         try:
-            results = await self.comm_service._execute_query(stats_query, fetch=True)
+            results = await self.comm_service._execute_query(
+                stats_query, fetch=True, pool="scan"
+            )
             
             total_entries = 0
             expired_entries = 0
@@ -303,21 +430,21 @@ class CacheManager:
             agents = {}
             result_types = {}
             
-            if results:
-                for row in results:
-                    total_entries += row["total_entries"]
-                    expired_entries += row["expired_entries"] or 0
-                    total_size_bytes += row["total_size_bytes"] or 0
-                    
-                    agent_name = row["agent_name"]
+            for row in results or []:
+                if row["agent_rollup"]:
+                    total_entries = row["total_entries"]
+                    expired_entries = row["expired_entries"] or 0
+                    total_size_bytes = row["total_size_bytes"] or 0
+                elif row["type_rollup"]:
+                    agents[row["agent_name"]] = row["total_entries"]
+                else:
                     result_type = row["result_type"] or "unknown"
-                    
-                    agents[agent_name] = agents.get(agent_name, 0) + row["total_entries"]
                     result_types[result_type] = result_types.get(result_type, 0) + row["total_entries"]
             
-            # Calculate hit/miss rates (simplified - would need more detailed tracking)
-            hit_rate = 0.8  # Placeholder - would need actual hit/miss tracking
-            miss_rate = 1.0 - hit_rate
+            # Hit/miss rates as observed by this manager
+            lookups = self.hits + self.misses
+            hit_rate = self.hits / lookups if lookups > 0 else 0.0
+            miss_rate = self.misses / lookups if lookups > 0 else 0.0
             
             return CacheStats(
                 total_entries=total_entries,
@@ -351,37 +478,40 @@ class CacheManager:
             List of matching cache entries
         """
         cache_pattern = self._build_key(pattern, namespace)
+        predicate, predicate_params = self.comm_service._cache_key_predicate(cache_pattern)
         
-        query = """
+        query = f"""
         SELECT cache_key, agent_name, result, result_type, expires_at, 
                created_at, access_count, last_accessed
         FROM agent_cache
-        WHERE cache_key LIKE %s
+        WHERE {predicate}
         ORDER BY last_accessed DESC
         LIMIT %s
         """
         
         try:
             results = await self.comm_service._execute_query(
-                query, (cache_pattern, limit), fetch=True
+                query,
+                predicate_params + (limit,),
+                fetch=True,
+                prepared=True,
+                pool="scan"
             )
             
-            entries = []
-            if results:
-                for row in results:
-                    entry = CacheEntry(
-                        key=row["cache_key"],
-                        agent_name=row["agent_name"],
-                        result=row["result"],  # Keep as JSON string for inspection
-                        result_type=row["result_type"],
-                        expires_at=row["expires_at"],
-                        created_at=row["created_at"],
-                        access_count=row["access_count"],
-                        last_accessed=row["last_accessed"]
-                    )
-                    entries.append(entry)
-            
-            return entries
+            # Positional construction in column order, cheaper than keywords
+            return [
+                CacheEntry(
+                    row["cache_key"],
+                    row["agent_name"],
+                    decode_cache_value(row["result"]),
+                    row["result_type"],
+                    row["expires_at"],
+                    row["created_at"],
+                    row["access_count"],
+                    row["last_accessed"]
+                )
+                for row in results or ()
+            ]
             
         except Exception as e:
             logger.error(f"Failed to get entries by pattern: {e}")
@@ -415,12 +545,12 @@ class CacheManager:
         """
         
         try:
-            await self.comm_service._execute_query(query, (additional_seconds, cache_key))
-            
-            # Check if any rows were affected
-            count_query = "SELECT ROW_COUNT() as count"
-            result = await self.comm_service._execute_query(count_query, fetch=True, fetch_one=True)
-            updated = (result["count"] if result else 0) > 0
+            updated = await self.comm_service._execute_query(
+                query,
+                (additional_seconds, cache_key),
+                return_rowcount=True,
+                prepared=True
+            ) > 0
             
             # Log operation
             await self.comm_service._log_operation(
@@ -453,10 +583,71 @@ class CacheManager:
             )
             raise
 
-    def _build_key(self, key: str, namespace: Optional[str] = None) -> str:
+    def _store_local(self, cache_key: str, value: Any, ttl_seconds: int) -> None:
+        """
+        Write a value through to the in-process cache.
+        
+        Entries whose TiDB TTL is shorter than the local TTL are only evicted,
+        so the local copy never outlives the stored one.
+        
+        Args:
+            cache_key: Full cache key
+            value: Cached value
+            ttl_seconds: TTL the value was stored with
+        """
+        if ttl_seconds >= self.local_cache_ttl:
+            self.local_cache[cache_key] = value
+        else:
+            self.local_cache.pop(cache_key, None)
+
+    def _evict_local_pattern(self, pattern: str) -> None:
+        """
+        Evict in-process entries matching a SQL LIKE pattern.
+        
+        Args:
+            pattern: Pattern to match (SQL LIKE syntax)
+        """
+        regex = self._pattern_cache.get(pattern)
+        if regex is None:
+            regex = self._pattern_cache[pattern] = self._like_to_regex(pattern)
+        for cache_key in [k for k in self.local_cache.keys() if regex.match(k)]:
+            self.local_cache.pop(cache_key, None)
+
+    @staticmethod
+    def _like_to_regex(pattern: str) -> Pattern:
+        """
+        Translate a SQL LIKE pattern into an anchored regular expression.
+        
+        Args:
+            pattern: Pattern in SQL LIKE syntax
+            
+        Returns:
+            Compiled regular expression
+        """
+        parts = []
+        escaped = False
+        for char in pattern:
+            if escaped:
+                parts.append(re.escape(char))
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == "%":
+                parts.append(".*")
+            elif char == "_":
+                parts.append(".")
+            else:
+                parts.append(re.escape(char))
+        return re.compile("".join(parts) + r"\Z", re.DOTALL)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _build_key(key: str, namespace: Optional[str] = None) -> str:
         """
         Build cache key with optional namespace.
         
+        Memoized, since it runs on every cache operation.
+        
         Args:
             key: Base key
             namespace: Optional namespace
@@ -485,21 +676,13 @@ class CacheManager:
             Number of entries successfully cached
         """
         successful = 0
-        
-        for entry in entries:
+        # Queries block the event loop, so chunks are written one at a time
+        for start in range(0, len(entries), self.warm_chunk_size):
+            chunk = entries[start:start + self.warm_chunk_size]
             try:
-                await self.set(
-                    key=entry["key"],
-                    value=entry["value"],
-                    ttl_seconds=entry["ttl_seconds"],
-                    agent_name=agent_name,
-                    result_type=entry.get("result_type"),
-                    namespace=entry.get("namespace")
-                )
-                successful += 1
-                
+                successful += await self.mset(chunk, agent_name)
             except Exception as e:
-                logger.error(f"Failed to warm cache entry {entry.get('key', 'unknown')}: {e}")
+                logger.error(f"Failed to warm cache chunk of {len(chunk)} entries: {e}")
         
         logger.info(f"Cache warmed: {successful}/{len(entries)} entries by {agent_name}")
         return successful
\ No newline at end of file
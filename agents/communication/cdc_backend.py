@@ -0,0 +1,193 @@
+"""
+TiCDC Push Notifications for Agent Communication
+
+Delivers new agent_messages rows to subscribers as they are committed,
+instead of agents re-querying the table on a timer. TiCDC streams row
+changes into Kafka and this backend consumes the topic with aiokafka.
+
+Changefeed setup (canal-json protocol, filtered to agent_messages):
+
+    cdc cli changefeed create \\
+        --sink-uri="kafka://broker:9092/agent-messages?protocol=canal-json" \\
+        --config=changefeed.toml
+
+    # changefeed.toml
+    [filter]
+    rules = ["edulms.agent_messages"]
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+try:
+    from aiokafka import AIOKafkaConsumer
+except ImportError:  # pragma: no cover - depends on installed extras
+    AIOKafkaConsumer = None
+
+from .notification_service import TriggerNotificationService
+from .serialization import loads
+from .tidb_service import TiDBCommunicationService
+
+logger = logging.getLogger(__name__)
+
+
+class TiCDCNotificationBackend(TriggerNotificationService):
+    """
+    Push-based notification service fed by a TiCDC changefeed.
+
+    Keeps the subscribe/unsubscribe/trigger_event API of
+    TriggerNotificationService; every INSERT on agent_messages is turned
+    into a "message" event on the row's channel and dispatched to the
+    channel's subscriber callbacks.
+    """
+
+    def __init__(
+        self,
+        communication_service: TiDBCommunicationService,
+        bootstrap_servers: str,
+        topic: str = "agent-messages",
+        group_id: Optional[str] = None
+    ):
+        """
+        Initialize TiCDC notification backend.
+
+        Args:
+            communication_service: TiDB communication service instance
+            bootstrap_servers: Kafka bootstrap servers of the changefeed sink
+            topic: Kafka topic the changefeed writes to
+            group_id: Kafka consumer group; defaults to one per process, as
+                      subscriptions are held in process memory and every
+                      hub must see every row rather than a share of the
+                      partitions
+        """
+        if AIOKafkaConsumer is None:
+            raise ImportError(
+                "TiCDCNotificationBackend requires aiokafka "
+                "(pip install 'edulms-agents[cdc]')"
+            )
+
+        super().__init__(communication_service)
+        self.bootstrap_servers = bootstrap_servers
+        self.topic = topic
+        self.group_id = group_id or f"agent-communication-hub-{socket.gethostname()}-{os.getpid()}"
+        self.consumer: Optional[AIOKafkaConsumer] = None
+        self.restart_delay = 1.0  # seconds before restarting a failed consumer
+        self.max_restart_delay = 30.0
+        self._next_restart_delay = self.restart_delay
+
+    async def start_notification_service(self) -> None:
+        """Start consuming the changefeed topic."""
+        if self.running:
+            return
+
+        await super().start_notification_service()
+
+        await self._start_consumer()
+        self.notification_tasks.append(asyncio.create_task(self._consume()))
+
+        logger.info("TiCDC notification backend consuming %s", self.topic)
+
+    async def stop_notification_service(self) -> None:
+        """Stop consuming and shut down the Kafka consumer."""
+        await super().stop_notification_service()
+
+        if self.consumer:
+            await self.consumer.stop()
+            self.consumer = None
+
+    async def _start_consumer(self) -> None:
+        """Create and start the Kafka consumer."""
+        self.consumer = AIOKafkaConsumer(
+            self.topic,
+            bootstrap_servers=self.bootstrap_servers,
+            group_id=self.group_id,
+            auto_offset_reset="latest"
+        )
+        await self.consumer.start()
+
+    async def _consume(self) -> None:
+        """
+        Dispatch changefeed records until the service is stopped.
+
+        A consumer error restarts the consumer with exponential backoff
+        instead of silently ending push delivery; the fallback poll covers
+        messages committed meanwhile.
+        """
+        while self.running:
+            try:
+                if self.consumer is None:
+                    await self._start_consumer()
+                await self._consume_records()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "TiCDC consumer failed, restarting in %.1fs: %s", self._next_restart_delay, e
+                )
+
+            if self.consumer:
+                try:
+                    await self.consumer.stop()
+                except Exception:
+                    pass
+                self.consumer = None
+            await asyncio.sleep(self._next_restart_delay)
+            self._next_restart_delay = min(self._next_restart_delay * 2, self.max_restart_delay)
+
+    async def _consume_records(self) -> None:
+        """Dispatch records from the current consumer."""
+        async for record in self.consumer:
+            if not self.running:
+                break
+            self._next_restart_delay = self.restart_delay
+
+            try:
+                change = loads(record.value)
+            except ValueError as e:
+                logger.error("Skipping undecodable changefeed record: %s", e)
+                continue
+
+            if change.get("type") != "INSERT" or change.get("table") != "agent_messages":
+                continue
+
+            for row in change.get("data") or []:
+                try:
+                    data = self._message_from_row(row)
+                    await self.trigger_event(
+                        "message", data["channel"], data, data["sender_agent"]
+                    )
+                except Exception as e:
+                    logger.error("Failed to dispatch changefeed row: %s", e)
+
+        if self.running:
+            raise RuntimeError("changefeed consumer stopped")
+
+    @staticmethod
+    def _message_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a canal-json agent_messages row into event data.
+
+        canal-json carries every column as a string, so numeric and JSON
+        columns are decoded back to their Python types.
+
+        Args:
+            row: Row image from the changefeed
+
+        Returns:
+            Message fields matching AgentMessage
+        """
+        created_at = row.get("created_at")
+        return {
+            "id": int(row["id"]) if row.get("id") else None,
+            "channel": row.get("channel", ""),
+            "sender_agent": row.get("sender_agent", ""),
+            "recipient_agent": row.get("recipient_agent"),
+            "message": loads(row["message"]) if row.get("message") else {},
+            "priority": int(row.get("priority") or 5),
+            "created_at": datetime.fromisoformat(created_at) if created_at else None
+        }
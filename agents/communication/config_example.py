@@ -5,62 +5,93 @@ This module provides example configurations for setting up the TiDB
 communication infrastructure in different environments.
 """
 
+import functools
 import os
-from typing import Dict, Any
+from typing import NamedTuple, Optional
 
 
-def get_development_config() -> Dict[str, Any]:
+class TiDBConfig(NamedTuple):
+    """
+    TiDB connection settings.
+    
+    Pass them on as keyword arguments with
+    ``create_communication_hub(**config._asdict())``.
+    """
+    host: Optional[str]
+    port: int
+    user: Optional[str]
+    password: Optional[str]
+    database: Optional[str]
+    pool_size: int
+    ssl_disabled: bool
+    scan_pool_size: int = 2
+
+
+@functools.lru_cache(maxsize=1)
+def get_development_config() -> TiDBConfig:
     """
     Get development environment configuration.
     
+    The environment is read on the first call only; the returned config is
+    immutable and shared between callers.
+    
     Returns:
-        Development configuration dictionary
+        Development configuration
     """
-    return {
-        "host": os.getenv("TIDB_HOST", "localhost"),
-        "port": int(os.getenv("TIDB_PORT", "4000")),
-        "user": os.getenv("TIDB_USER", "root"),
-        "password": os.getenv("TIDB_PASSWORD", ""),
-        "database": os.getenv("TIDB_DATABASE", "edulms_v2"),
-        "pool_size": 5,
-        "ssl_disabled": True
-    }
-
-
-def get_production_config() -> Dict[str, Any]:
+    return TiDBConfig(
+        host=os.getenv("TIDB_HOST", "localhost"),
+        port=int(os.getenv("TIDB_PORT", "4000")),
+        user=os.getenv("TIDB_USER", "root"),
+        password=os.getenv("TIDB_PASSWORD", ""),
+        database=os.getenv("TIDB_DATABASE", "edulms_v2"),
+        pool_size=5,
+        ssl_disabled=True
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_production_config() -> TiDBConfig:
     """
     Get production environment configuration.
     
     Returns:
-        Production configuration dictionary
+        Production configuration
     """
-    return {
-        "host": os.getenv("TIDB_HOST"),
-        "port": int(os.getenv("TIDB_PORT", "4000")),
-        "user": os.getenv("TIDB_USER"),
-        "password": os.getenv("TIDB_PASSWORD"),
-        "database": os.getenv("TIDB_DATABASE"),
-        "pool_size": int(os.getenv("TIDB_POOL_SIZE", "20")),
-        "ssl_disabled": False
-    }
-
-
-def get_test_config() -> Dict[str, Any]:
+    return TiDBConfig(
+        host=os.getenv("TIDB_HOST"),
+        port=int(os.getenv("TIDB_PORT", "4000")),
+        user=os.getenv("TIDB_USER"),
+        password=os.getenv("TIDB_PASSWORD"),
+        database=os.getenv("TIDB_DATABASE"),
+        pool_size=int(os.getenv("TIDB_POOL_SIZE", "20")),
+        ssl_disabled=False
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_test_config() -> TiDBConfig:
     """
     Get test environment configuration.
     
     Returns:
-        Test configuration dictionary
+        Test configuration
     """
-    return {
-        "host": os.getenv("TIDB_TEST_HOST", "localhost"),
-        "port": int(os.getenv("TIDB_TEST_PORT", "4000")),
-        "user": os.getenv("TIDB_TEST_USER", "root"),
-        "password": os.getenv("TIDB_TEST_PASSWORD", ""),
-        "database": os.getenv("TIDB_TEST_DATABASE", "edulms_v2_test"),
-        "pool_size": 3,
-        "ssl_disabled": True
-    }
+    return TiDBConfig(
+        host=os.getenv("TIDB_TEST_HOST", "localhost"),
+        port=int(os.getenv("TIDB_TEST_PORT", "4000")),
+        user=os.getenv("TIDB_TEST_USER", "root"),
+        password=os.getenv("TIDB_TEST_PASSWORD", ""),
+        database=os.getenv("TIDB_TEST_DATABASE", "edulms_v2_test"),
+        pool_size=3,
+        ssl_disabled=True
+    )
+
+
+def invalidate_config_cache() -> None:
+    """Re-read the environment on the next get_*_config call."""
+    get_development_config.cache_clear()
+    get_production_config.cache_clear()
+    get_test_config.cache_clear()
 
 
 # Environment variable template for .env file
@@ -92,6 +123,8 @@ BATCH_PROCESSING_SIZE=100
 LOG_LEVEL=INFO
 """
 
+_ENV_TEMPLATE_BYTES = ENV_TEMPLATE.encode("utf-8")
+
 
 def create_env_file(filename: str = ".env") -> None:
     """
@@ -100,12 +133,18 @@ def create_env_file(filename: str = ".env") -> None:
     Args:
         filename: Name of the environment file to create
     """
-    if not os.path.exists(filename):
-        with open(filename, "w") as f:
-            f.write(ENV_TEMPLATE)
-        print(f"Created {filename} with template configuration")
-    else:
+    # O_EXCL makes the existence check and creation a single atomic step
+    try:
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
         print(f"{filename} already exists")
+        return
+    
+    try:
+        os.write(fd, _ENV_TEMPLATE_BYTES)
+    finally:
+        os.close(fd)
+    print(f"Created {filename} with template configuration")
 
 
 # Usage examples
@@ -168,8 +207,8 @@ if __name__ == "__main__":
     print("TiDB Communication Infrastructure Configuration")
     print("=" * 50)
     print("\nAvailable configurations:")
-    print("- Development:", get_development_config())
-    print("- Production:", get_production_config())
-    print("- Test:", get_test_config())
+    print("- Development:", get_development_config()._asdict())
+    print("- Production:", get_production_config()._asdict())
+    print("- Test:", get_test_config()._asdict())
     print("\nUsage Examples:")
     print(USAGE_EXAMPLES)
\ No newline at end of file
@@ -5,15 +5,75 @@ Provides unified interface for Gemini API calls across all agents
 
 import os
 import asyncio
-from typing import List, Dict, Any, Optional, Union
-from google import genai
-from google.genai import types
+import functools
+import hashlib
+import json
+import warnings
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Set, Tuple, Union
 import logging
 
+import numpy as np
+from cachetools import TTLCache
+
+from .serialization import dumps, loads
+
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types
+
 logger = logging.getLogger(__name__)
 
+
+class FunctionCallResult(dict):
+    """function_calling result; a plain dict with a to_json() shortcut"""
+    
+    def to_json(self) -> str:
+        return dumps(self)
+
+
 class GeminiClient:
-    """Unified Gemini client for all EduLMS agents"""
+    """
+    Unified Gemini client for all EduLMS agents
+    
+    All API calls are native coroutines on the running event loop; the agent
+    entrypoints run that loop on uvloop/winloop when the speedups extra is
+    installed.
+    """
+    
+    # (genai, types), imported on first use so that code paths which never
+    # call Gemini don't pay for loading the SDK
+    _sdk = None
+    
+    # Safety settings shared by every client, built with the SDK import
+    SAFETY_SETTINGS: tuple = ()
+    
+    # Generation defaults; per-call overrides go into a fresh config
+    DEFAULT_GENERATION = {
+        'temperature': 0.7,
+        'top_p': 0.8,
+        'top_k': 40,
+        'max_output_tokens': 2048
+    }
+    
+    @classmethod
+    def _lazy_sdk(cls):
+        """Import google-genai once and return its (genai, types) modules"""
+        if cls._sdk is None:
+            from google import genai
+            from google.genai import types
+            harm = types.HarmCategory
+            block_medium = types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
+            cls.SAFETY_SETTINGS = tuple(
+                types.SafetySetting(category=category, threshold=block_medium)
+                for category in (
+                    harm.HARM_CATEGORY_HARASSMENT,
+                    harm.HARM_CATEGORY_HATE_SPEECH,
+                    harm.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+                    harm.HARM_CATEGORY_DANGEROUS_CONTENT
+                )
+            )
+            cls._sdk = (genai, types)
+        return cls._sdk
     
     def __init__(self):
         self.api_key = os.getenv('GOOGLE_API_KEY')
@@ -23,62 +83,174 @@ class GeminiClient:
         if not self.api_key:
             raise ValueError("GOOGLE_API_KEY environment variable is required")
         
-        # Initialize client
-        self.client = genai.Client(api_key=self.api_key)
+        # Texts per embed_content request
+        self.max_embedding_batch = 100
         
-        # Default generation config
-        self.default_config = types.GenerateContentConfig(
-            temperature=0.7,
-            top_p=0.8,
-            top_k=40,
-            max_output_tokens=2048,
-            safety_settings=[
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_HARASSMENT,
-                    threshold=types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                ),
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
-                    threshold=types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                ),
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
-                    threshold=types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                ),
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                    threshold=types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                )
-            ]
+        # Temperature 0 generate_content calls are collected for
+        # batch_window seconds (up to max_batch calls) and identical ones
+        # are sent once
+        self.batch_window = 0.01
+        self.max_batch = 32
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        self._batch_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatch_tasks: Set[asyncio.Task] = set()
+        
+        # Cap on in-flight API requests, shared by all calls on this client
+        self.max_concurrent_requests = int(os.getenv('MAX_CONCURRENT_AGENTS', '10'))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Responses to deterministic (temperature 0) prompts and embeddings,
+        # keyed by a hash of the model and request
+        self._response_cache = TTLCache(maxsize=2048, ttl=3600)
+    
+    @functools.cached_property
+    def client(self) -> "genai.Client":
+        """Gemini API client, created on first use"""
+        genai, _ = self._lazy_sdk()
+        return genai.Client(api_key=self.api_key)
+    
+    def _build_config(self, **overrides) -> "types.GenerateContentConfig":
+        """
+        Build a generation config from the defaults plus per-call overrides.
+        
+        A new config is created for every call, so concurrent requests never
+        see each other's temperature, system instruction or tools.
+        """
+        _, types = self._lazy_sdk()
+        # Unset (None) overrides keep the default rather than replacing it
+        settings = {
+            **self.DEFAULT_GENERATION,
+            **{key: value for key, value in overrides.items() if value is not None}
+        }
+        return types.GenerateContentConfig(
+            safety_settings=list(self.SAFETY_SETTINGS),
+            **settings
         )
     
     async def generate_content(
         self, 
-        prompt: str, 
+        prompt: Union[str, List["types.Content"]], 
         system_instruction: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         **kwargs
     ) -> str:
-        """Generate content using Gemini model"""
+        """
+        Generate content using Gemini model
+        
+        prompt is either a single prompt string or a multi-turn list of
+        Content objects; multi-turn and sampled (temperature != 0) requests
+        skip batching and caching.
+        """
+        # Only temperature 0 output is repeatable enough to share or reuse;
+        # sampled requests skip the batch window
+        if not isinstance(prompt, str) or temperature != 0:
+            return await self._generate(prompt, system_instruction, temperature, max_tokens)
+        
+        cache_key = self._cache_key(
+            self.model, system_instruction, prompt, temperature, max_tokens
+        )
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        loop = asyncio.get_running_loop()
+        if self._batch_loop is not loop or self._batch_task.done():
+            # Dispatcher is bound to the loop it was started on
+            self._batch_queue = asyncio.Queue()
+            self._batch_task = loop.create_task(self._batch_dispatcher())
+            self._batch_loop = loop
+        
+        future = loop.create_future()
+        request = (prompt, system_instruction, temperature, max_tokens)
+        await self._batch_queue.put((request, future))
+        text = await future
+        
+        self._response_cache[cache_key] = text
+        return text
+    
+    def _request_slot(self) -> asyncio.Semaphore:
+        """Semaphore bounding in-flight requests, created per event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def _call(self, method, **kwargs):
+        """Await an SDK call once a request slot is free"""
+        async with self._request_slot():
+            return await method(**kwargs)
+    
+    @staticmethod
+    def _cache_key(*parts) -> bytes:
+        """Stable hash of a request, used as the response cache key"""
+        return hashlib.blake2b(
+            "|".join(map(str, parts)).encode(), digest_size=16
+        ).digest()
+    
+    async def _batch_dispatcher(self) -> None:
+        """Collect queued generate_content calls and dispatch them in groups"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._batch_queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._batch_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Gemini takes one prompt per request, so identical requests
+            # share a call and distinct ones run concurrently
+            groups: Dict[tuple, List[asyncio.Future]] = {}
+            for request, future in batch:
+                groups.setdefault(request, []).append(future)
+            for request, futures in groups.items():
+                task = loop.create_task(self._dispatch_group(request, futures))
+                # Referenced until done so in-flight requests aren't collected
+                self._dispatch_tasks.add(task)
+                task.add_done_callback(self._dispatch_tasks.discard)
+    
+    async def _dispatch_group(self, request: tuple, futures: List[asyncio.Future]) -> None:
+        """Run one generate_content request and fan the result out to its callers"""
+        try:
+            text = await self._generate(*request)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future in futures:
+            if not future.done():
+                future.set_result(text)
+    
+    async def _generate(
+        self,
+        prompt: Union[str, List["types.Content"]],
+        system_instruction: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int]
+    ) -> str:
+        """Send a single generate_content request"""
         try:
-            # Prepare config
-            config = self.default_config
-            if temperature is not None:
-                config.temperature = temperature
-            if max_tokens is not None:
-                config.max_output_tokens = max_tokens
+            config = self._build_config(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                system_instruction=system_instruction or None
+            )
             
             # Prepare contents
-            contents = [prompt]
-            
-            # Add system instruction if provided
-            if system_instruction:
-                config.system_instruction = system_instruction
+            contents = [prompt] if isinstance(prompt, str) else prompt
             
             # Generate content
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
+            response = await self._call(
+                self.client.aio.models.generate_content,
                 model=self.model,
                 contents=contents,
                 config=config
@@ -94,58 +266,171 @@ class GeminiClient:
         self, 
         prompt: str, 
         system_instruction: Optional[str] = None,
+        coalesce_ms: int = 10,
         **kwargs
     ):
-        """Generate streaming content using Gemini model"""
+        """
+        Generate streaming content using Gemini model
+        
+        Chunks arriving within coalesce_ms of the first buffered chunk are
+        joined into one yielded string; pass coalesce_ms=0 to yield every
+        chunk as soon as it arrives.
+        """
         try:
-            config = self.default_config
-            if system_instruction:
-                config.system_instruction = system_instruction
+            config = self._build_config(
+                system_instruction=system_instruction or None
+            )
             
             contents = [prompt]
             
-            # Generate streaming content
-            stream = await asyncio.to_thread(
-                self.client.models.generate_content_stream,
-                model=self.model,
-                contents=contents,
-                config=config
-            )
-            
-            async for chunk in stream:
-                if chunk.text:
-                    yield chunk.text
+            # The request slot is held until the stream is finished
+            async with self._request_slot():
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=self.model,
+                    contents=contents,
+                    config=config
+                )
+                
+                if coalesce_ms <= 0:
+                    async for chunk in stream:
+                        if chunk.text:
+                            yield chunk.text
+                else:
+                    async for text in self._coalesce_stream(stream, coalesce_ms / 1000):
+                        yield text
                     
         except Exception as e:
             logger.error(f"Error generating streaming content: {e}")
             raise
     
+    @staticmethod
+    async def _coalesce_stream(stream, window: float):
+        """Yield the text of stream chunks, joined into window-second groups"""
+        loop = asyncio.get_running_loop()
+        iterator = stream.__aiter__()
+        buffer: List[str] = []
+        deadline = None
+        pending = asyncio.ensure_future(iterator.__anext__())
+        try:
+            while True:
+                timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                # asyncio.wait leaves the pending read running on timeout
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+                if not done:
+                    yield "".join(buffer)
+                    buffer.clear()
+                    deadline = None
+                    continue
+                
+                try:
+                    chunk = pending.result()
+                except StopAsyncIteration:
+                    break
+                if chunk.text:
+                    if not buffer:
+                        deadline = loop.time() + window
+                    buffer.append(chunk.text)
+                pending = asyncio.ensure_future(iterator.__anext__())
+            
+            if buffer:
+                yield "".join(buffer)
+        finally:
+            if not pending.done():
+                pending.cancel()
+    
     async def generate_embeddings(
         self, 
         texts: Union[str, List[str]],
-        task_type: str = "RETRIEVAL_DOCUMENT"
-    ) -> List[List[float]]:
-        """Generate embeddings using Gemini embedding model"""
+        task_type: str = "RETRIEVAL_DOCUMENT",
+        as_list: bool = False
+    ) -> np.ndarray:
+        """
+        Generate embeddings using Gemini embedding model
+        
+        Returns a float32 array of shape (len(texts), dimensions). as_list
+        returns nested Python lists instead and is deprecated.
+        """
         try:
             if isinstance(texts, str):
                 texts = [texts]
             
-            embeddings = []
-            for text in texts:
-                response = await asyncio.to_thread(
-                    self.client.models.embed_content,
-                    model=self.embedding_model,
-                    contents=[text],
-                    task_type=task_type
-                )
-                embeddings.append(response.embeddings[0].values)
+            # Embeddings are deterministic, so previously seen texts are
+            # served from the cache and only the rest are requested
+            keys = [
+                self._cache_key(self.embedding_model, task_type, text)
+                for text in texts
+            ]
+            embeddings = [self._response_cache.get(key) for key in keys]
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if not missing:
+                return self._embedding_result(embeddings, as_list)
+            
+            # One request per batch of up to max_embedding_batch texts,
+            # batches dispatched concurrently; gather keeps input order
+            _, types = self._lazy_sdk()
+            config = types.EmbedContentConfig(task_type=task_type)
+            batches = [
+                [texts[i] for i in missing[start:start + self.max_embedding_batch]]
+                for start in range(0, len(missing), self.max_embedding_batch)
+            ]
+            if len(batches) == 1:
+                results = [await self._embed_batch(batches[0], config)]
+            else:
+                results = await asyncio.gather(*[
+                    self._embed_batch(batch, config) for batch in batches
+                ])
+            
+            fetched = (values for result in results for values in result)
+            for i, values in zip(missing, fetched):
+                embeddings[i] = np.asarray(values, dtype=np.float32)
+                self._response_cache[keys[i]] = embeddings[i]
             
-            return embeddings
+            return self._embedding_result(embeddings, as_list)
             
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             raise
     
+    @staticmethod
+    def _embedding_result(embeddings: List[np.ndarray], as_list: bool):
+        """Stack per-text vectors into the generate_embeddings return value"""
+        result = np.stack(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+        if as_list:
+            warnings.warn(
+                "generate_embeddings(as_list=True) is deprecated; use the returned ndarray",
+                DeprecationWarning,
+                stacklevel=3
+            )
+            return result.tolist()
+        return result
+    
+    async def _embed_batch(
+        self,
+        batch: List[str],
+        config: "types.EmbedContentConfig"
+    ) -> List[List[float]]:
+        """Embed a batch of texts with one request where the SDK allows it"""
+        response = await self._call(
+            self.client.aio.models.embed_content,
+            model=self.embedding_model,
+            contents=batch,
+            config=config
+        )
+        if len(response.embeddings) == len(batch):
+            return [embedding.values for embedding in response.embeddings]
+        
+        # Older SDKs embed only the first item of a list; send texts singly
+        responses = await asyncio.gather(*[
+            self._call(
+                self.client.aio.models.embed_content,
+                model=self.embedding_model,
+                contents=text,
+                config=config
+            )
+            for text in batch
+        ])
+        return [response.embeddings[0].values for response in responses]
+    
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -154,18 +439,22 @@ class GeminiClient:
     ) -> str:
         """Chat completion interface compatible with existing agent code"""
         try:
-            # Convert messages to Gemini format
-            contents = []
-            for msg in messages:
-                if msg['role'] == 'user':
-                    contents.append(msg['content'])
-                elif msg['role'] == 'assistant':
-                    # For conversation history, we might need to handle this differently
-                    # For now, we'll include it as context
-                    contents.append(f"Assistant: {msg['content']}")
+            turns = [msg for msg in messages if msg['role'] in ('user', 'assistant')]
             
-            # Use the last user message as the main prompt
-            prompt = contents[-1] if contents else ""
+            if len(turns) <= 1:
+                # Single prompt: plain string, eligible for batching/caching
+                prompt = turns[0]['content'] if turns else ""
+            else:
+                # Send the history as real turns so the server can reuse the
+                # shared prefix across calls in the same conversation
+                _, types = self._lazy_sdk()
+                prompt = [
+                    types.Content(
+                        role='user' if msg['role'] == 'user' else 'model',
+                        parts=[types.Part(text=msg['content'])]
+                    )
+                    for msg in turns
+                ]
             
             return await self.generate_content(
                 prompt=prompt,
@@ -182,30 +471,18 @@ class GeminiClient:
         prompt: str,
         functions: List[Dict[str, Any]],
         system_instruction: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> FunctionCallResult:
         """Function calling with Gemini"""
         try:
-            # Convert functions to Gemini format
-            tools = []
-            for func in functions:
-                tool = types.Tool(
-                    function_declarations=[
-                        types.FunctionDeclaration(
-                            name=func['name'],
-                            description=func['description'],
-                            parameters=func.get('parameters', {})
-                        )
-                    ]
-                )
-                tools.append(tool)
+            tools = self._build_tools(json.dumps(functions, sort_keys=True))
             
-            config = self.default_config
-            config.tools = tools
-            if system_instruction:
-                config.system_instruction = system_instruction
+            config = self._build_config(
+                tools=list(tools),
+                system_instruction=system_instruction or None
+            )
             
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
+            response = await self._call(
+                self.client.aio.models.generate_content,
                 model=self.model,
                 contents=[prompt],
                 config=config
@@ -214,20 +491,58 @@ class GeminiClient:
             # Parse function calls from response
             if response.candidates and response.candidates[0].content.parts:
                 for part in response.candidates[0].content.parts:
-                    if hasattr(part, 'function_call'):
-                        return {
-                            'function_call': {
+                    if part.function_call:
+                        # JSON round-trip turns SDK map/list wrappers into
+                        # plain Python values and proves they serialize
+                        return FunctionCallResult(
+                            function_call={
                                 'name': part.function_call.name,
-                                'arguments': dict(part.function_call.args)
+                                'arguments': loads(dumps(dict(part.function_call.args or {})))
                             }
-                        }
+                        )
             
-            return {'text': response.text}
+            return FunctionCallResult(text=response.text)
             
         except Exception as e:
             logger.error(f"Error in function calling: {e}")
             raise
     
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def _build_tools(cls, functions_json: str) -> Tuple["types.Tool", ...]:
+        """
+        Convert function schemas to Gemini tools.
+        
+        All declarations go into a single Tool. Keyed by the JSON-encoded
+        schemas so repeated calls with the same functions reuse the objects.
+        """
+        _, types = cls._lazy_sdk()
+        return (
+            types.Tool(
+                function_declarations=[
+                    types.FunctionDeclaration(
+                        name=func['name'],
+                        description=func['description'],
+                        parameters=func.get('parameters', {})
+                    )
+                    for func in json.loads(functions_json)
+                ]
+            ),
+        )
+    
+    async def warmup(self) -> None:
+        """
+        Open the connection to the Gemini API ahead of the first real request.
+        
+        Sends a one-token embedding so the TLS and HTTP/2 setup happens at
+        startup rather than on a user-facing call. Failures are only logged.
+        """
+        try:
+            await self.generate_embeddings(["_"], task_type="RETRIEVAL_QUERY")
+            logger.info("Gemini connection warmed up")
+        except Exception as e:
+            logger.warning(f"Gemini warmup failed: {e}")
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the current model"""
         return {
@@ -257,4 +572,4 @@ async def create_embedding(text, **kwargs):
     """Compatibility function for existing OpenAI-style embedding calls"""
     client = get_gemini_client()
     embeddings = await client.generate_embeddings(text, **kwargs)
-    return embeddings[0] if embeddings else []
+    return embeddings[0] if len(embeddings) else embeddings
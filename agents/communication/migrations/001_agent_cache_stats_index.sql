@@ -0,0 +1,5 @@
+-- Covering index for CacheManager.get_cache_stats
+-- Lets the GROUP BY agent_name, result_type WITH ROLLUP scan read the
+-- index instead of the full agent_cache rows.
+
+CREATE INDEX idx_agent_cache_stats ON agent_cache (agent_name, result_type, expires_at);
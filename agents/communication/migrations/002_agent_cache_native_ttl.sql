@@ -0,0 +1,6 @@
+-- Native TTL for agent_cache (TiDB >= 6.5)
+-- TiDB's background TTL job deletes rows once expires_at has passed, so
+-- CacheManager can run with use_native_ttl=True and skip its own cleanup
+-- scheduler. Do not apply on MySQL or older TiDB versions.
+
+ALTER TABLE agent_cache TTL = `expires_at` + INTERVAL 0 SECOND TTL_ENABLE = 'ON';
@@ -0,0 +1,6 @@
+-- Store agent_cache.result as binary
+-- Large cache values are written zstd-compressed behind a one-byte codec
+-- header (see communication/serialization.py); existing JSON rows remain
+-- readable as-is.
+
+ALTER TABLE agent_cache MODIFY COLUMN result MEDIUMBLOB;
@@ -0,0 +1,7 @@
+-- Prepared plan cache (TiDB >= 6.1)
+-- The hot agent_cache queries run as server-side prepared statements
+-- (_execute_query(..., prepared=True)); with the plan cache enabled TiDB
+-- reuses their execution plans instead of re-optimizing on every EXECUTE.
+-- The variable is global-only on current TiDB releases.
+
+SET GLOBAL tidb_enable_prepared_plan_cache = ON;
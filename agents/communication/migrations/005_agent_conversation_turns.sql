@@ -0,0 +1,54 @@
+-- Append-only conversation turns
+-- SessionManager.add_conversation_turn inserts one row per turn instead of
+-- rewriting agent_sessions.conversation_history, and history reads push
+-- their filters and LIMIT down to this table. The clustered primary key
+-- keeps a session's turns contiguous, so a history read is a single range
+-- scan. AUTO_ID_CACHE 1 makes seq increase in insert order across TiDB
+-- servers (TiDB >= 6.4).
+-- Histories already stored in agent_sessions.conversation_history are
+-- copied into the table in their original order, so existing sessions keep
+-- their history, metrics, summaries and search results; later migrations
+-- convert the copied rows along with the rest. TiDB has no JSON_TABLE, so
+-- the history is unpacked by array position (up to 10000 turns per
+-- session). Sessions that already have turn rows are skipped.
+
+CREATE TABLE IF NOT EXISTS agent_conversation_turns (
+    session_id VARCHAR(255) NOT NULL,
+    seq BIGINT NOT NULL AUTO_INCREMENT,
+    agent_name VARCHAR(255) NOT NULL,
+    message_type VARCHAR(100) NOT NULL,
+    content JSON,
+    ts DATETIME(6) NOT NULL,
+    processing_time_ms INT NULL,
+    metadata JSON,
+    PRIMARY KEY (session_id, seq) CLUSTERED,
+    KEY idx_turns_seq (seq)
+) AUTO_ID_CACHE 1;
+
+INSERT INTO agent_conversation_turns
+    (session_id, agent_name, message_type, content, ts, processing_time_ms, metadata)
+SELECT s.session_id,
+       JSON_UNQUOTE(JSON_EXTRACT(s.conversation_history, CONCAT('$[', p.n, '].agent_name'))),
+       JSON_UNQUOTE(JSON_EXTRACT(s.conversation_history, CONCAT('$[', p.n, '].message_type'))),
+       JSON_EXTRACT(s.conversation_history, CONCAT('$[', p.n, '].content')),
+       CAST(JSON_UNQUOTE(JSON_EXTRACT(s.conversation_history, CONCAT('$[', p.n, '].timestamp'))) AS DATETIME(6)),
+       CAST(NULLIF(JSON_UNQUOTE(JSON_EXTRACT(s.conversation_history, CONCAT('$[', p.n, '].processing_time_ms'))), 'null') AS SIGNED),
+       COALESCE(JSON_EXTRACT(s.conversation_history, CONCAT('$[', p.n, '].metadata')), JSON_OBJECT())
+FROM agent_sessions s
+JOIN (
+    SELECT a.n * 1000 + b.n * 100 + c.n * 10 + d.n AS n
+    FROM (SELECT 0 AS n UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4
+          UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9) a
+    CROSS JOIN (SELECT 0 AS n UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4
+          UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9) b
+    CROSS JOIN (SELECT 0 AS n UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4
+          UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9) c
+    CROSS JOIN (SELECT 0 AS n UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4
+          UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9) d
+) p ON p.n < JSON_LENGTH(s.conversation_history)
+WHERE JSON_LENGTH(s.conversation_history) > 0
+  AND NOT EXISTS (
+      SELECT 1 FROM agent_conversation_turns t WHERE t.session_id = s.session_id
+  )
+-- Insert order assigns seq, so each session's turns keep their positions
+ORDER BY s.session_id, p.n;
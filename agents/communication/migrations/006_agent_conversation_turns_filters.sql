@@ -0,0 +1,9 @@
+-- Filtered conversation history pages
+-- get_conversation_turns(agent_name=..., message_type=...) walks a
+-- session's turns backwards by seq. Secondary indexes on the clustered
+-- table carry the primary key, so these are effectively
+-- (session_id, agent_name, seq) and (session_id, message_type, seq) and the
+-- filtered ORDER BY seq DESC LIMIT reads stay index range scans.
+
+CREATE INDEX idx_turns_session_agent ON agent_conversation_turns (session_id, agent_name);
+CREATE INDEX idx_turns_session_type ON agent_conversation_turns (session_id, message_type);
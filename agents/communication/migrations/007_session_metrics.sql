@@ -0,0 +1,43 @@
+-- Running per-session metrics
+-- SessionManager.add_conversation_turn upserts this row alongside each turn
+-- so get_session_metrics is a primary key lookup instead of a scan of the
+-- whole conversation. Sessions that already have turns (including the
+-- histories copied by migration 005) are backfilled here, so the first
+-- upsert for such a session adds to its full totals rather than starting a
+-- row that only counts new turns; later migrations convert these rows with
+-- the rest. Errors are counted with the same rule as migration 013.
+
+CREATE TABLE IF NOT EXISTS session_metrics (
+    session_id VARCHAR(255) NOT NULL PRIMARY KEY,
+    total_turns INT NOT NULL DEFAULT 0,
+    sum_processing_time_ms BIGINT NOT NULL DEFAULT 0,
+    count_processing_samples INT NOT NULL DEFAULT 0,
+    first_ts DATETIME(6) NOT NULL,
+    last_ts DATETIME(6) NOT NULL,
+    error_count INT NOT NULL DEFAULT 0,
+    message_type_counts JSON NOT NULL
+);
+
+INSERT INTO session_metrics
+    (session_id, total_turns, sum_processing_time_ms, count_processing_samples,
+     first_ts, last_ts, error_count, message_type_counts)
+SELECT t.session_id,
+       COUNT(*),
+       COALESCE(SUM(t.processing_time_ms), 0),
+       COUNT(t.processing_time_ms),
+       MIN(t.ts),
+       MAX(t.ts),
+       SUM(LOWER(t.message_type) LIKE '%error%'
+           OR COALESCE(JSON_UNQUOTE(JSON_EXTRACT(t.content, '$.error')) NOT IN ('', 'null', 'false', '0'), FALSE)),
+       ANY_VALUE(c.message_type_counts)
+FROM agent_conversation_turns t
+JOIN (
+    SELECT session_id, JSON_OBJECTAGG(message_type, turns) AS message_type_counts
+    FROM (
+        SELECT session_id, message_type, COUNT(*) AS turns
+        FROM agent_conversation_turns
+        GROUP BY session_id, message_type
+    ) types
+    GROUP BY session_id
+) c ON c.session_id = t.session_id
+GROUP BY t.session_id;
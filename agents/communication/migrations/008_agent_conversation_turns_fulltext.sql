@@ -0,0 +1,13 @@
+-- Full-text search over conversation turns
+-- insert_conversation_turn stores the string values of each turn's content
+-- in turn_text. With SessionManager(use_fulltext_search=True),
+-- search_sessions_by_content matches it through a full-text index with
+-- fts_match_word instead of a leading-wildcard JSON_SEARCH over every row;
+-- the default keeps JSON_SEARCH. The index needs a TiDB deployment with
+-- full-text search support (TiDB Cloud with TiFlash), so it is only created
+-- where the flag is enabled: run the commented statement there. Turns
+-- inserted before this migration have no turn_text and are not found by
+-- full-text search.
+
+ALTER TABLE agent_conversation_turns ADD COLUMN turn_text TEXT NULL;
+-- ALTER TABLE agent_conversation_turns ADD FULLTEXT INDEX ft_turn_text (turn_text) WITH PARSER MULTILINGUAL;
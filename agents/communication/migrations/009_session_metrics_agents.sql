@@ -0,0 +1,14 @@
+-- Agents per session in session_metrics
+-- agents_involved is a JSON object used as a set (agent names are the
+-- keys), so recording an agent is an idempotent JSON_SET and
+-- get_session_metrics no longer runs a DISTINCT over the session's turns.
+-- Existing rows are backfilled from agent_conversation_turns.
+
+ALTER TABLE session_metrics ADD COLUMN agents_involved JSON NULL;
+
+UPDATE session_metrics m
+SET agents_involved = (
+    SELECT JSON_OBJECTAGG(d.agent_name, 1)
+    FROM (SELECT DISTINCT session_id, agent_name FROM agent_conversation_turns) d
+    WHERE d.session_id = m.session_id
+);
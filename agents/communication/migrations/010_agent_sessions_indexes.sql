@@ -0,0 +1,8 @@
+-- agent_sessions lookup indexes
+-- idx_status_created turns the cleanup_expired_sessions UPDATE
+-- (status IN (...) AND created_at < ?) into an index range scan;
+-- idx_user_status serves get_active_sessions_for_user and the user and
+-- status filters of get_session_summaries.
+
+CREATE INDEX idx_status_created ON agent_sessions (status, created_at);
+CREATE INDEX idx_user_status ON agent_sessions (user_id, status);
@@ -0,0 +1,9 @@
+-- Session summary listing index
+-- get_session_summaries filters on user_id and status and orders by
+-- created_at; with all three in one index the listing is an ordered index
+-- range scan that stops after LIMIT rows. TiDB has no INCLUDE columns, and
+-- the remaining selected columns are JSON, so this replaces
+-- idx_user_status rather than covering the query.
+
+CREATE INDEX idx_user_status_created ON agent_sessions (user_id, status, created_at);
+DROP INDEX idx_user_status ON agent_sessions;
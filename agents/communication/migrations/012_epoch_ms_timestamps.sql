@@ -0,0 +1,21 @@
+-- Epoch millisecond timestamps for turns and session metrics
+-- Turn times are stored as BIGINT UNIX epoch milliseconds so reads carry
+-- plain integers and durations are integer subtraction; a datetime is only
+-- built at the API boundary (ConversationTurn.timestamp). Existing values
+-- are converted in the session time zone, the same zone they were written
+-- in.
+
+ALTER TABLE agent_conversation_turns ADD COLUMN ts_ms BIGINT NULL;
+UPDATE agent_conversation_turns SET ts_ms = FLOOR(UNIX_TIMESTAMP(ts) * 1000);
+ALTER TABLE agent_conversation_turns MODIFY COLUMN ts_ms BIGINT NOT NULL;
+ALTER TABLE agent_conversation_turns DROP COLUMN ts;
+
+ALTER TABLE session_metrics ADD COLUMN first_ts_ms BIGINT NULL;
+ALTER TABLE session_metrics ADD COLUMN last_ts_ms BIGINT NULL;
+UPDATE session_metrics
+SET first_ts_ms = FLOOR(UNIX_TIMESTAMP(first_ts) * 1000),
+    last_ts_ms = FLOOR(UNIX_TIMESTAMP(last_ts) * 1000);
+ALTER TABLE session_metrics MODIFY COLUMN first_ts_ms BIGINT NOT NULL;
+ALTER TABLE session_metrics MODIFY COLUMN last_ts_ms BIGINT NOT NULL;
+ALTER TABLE session_metrics DROP COLUMN first_ts;
+ALTER TABLE session_metrics DROP COLUMN last_ts;
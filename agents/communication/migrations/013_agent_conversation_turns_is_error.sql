@@ -0,0 +1,10 @@
+-- Error flag on conversation turns
+-- Whether a turn is an error (an "error" message type, or content with a
+-- truthy "error" key) is decided once when the turn is written, so metrics
+-- neither lowercase message types nor inspect content per turn on read.
+-- Existing turns are classified here with the same rule.
+
+ALTER TABLE agent_conversation_turns ADD COLUMN is_error BOOLEAN NOT NULL DEFAULT FALSE;
+UPDATE agent_conversation_turns
+SET is_error = LOWER(message_type) LIKE '%error%'
+    OR COALESCE(JSON_UNQUOTE(JSON_EXTRACT(content, '$.error')) NOT IN ('', 'null', 'false', '0'), FALSE);
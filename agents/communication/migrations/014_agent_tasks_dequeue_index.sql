@@ -0,0 +1,23 @@
+-- agent_tasks dequeue index
+-- delay_until exposes parameters._delay_until (an ISO timestamp) as a
+-- DATETIME, so dequeue_task compares a column instead of parsing JSON per
+-- pending row. TaskQueueManager always writes _delay_until with
+-- microseconds and rejects malformed values, matching the STR_TO_DATE
+-- format. TiDB can't add a STORED generated column to an existing
+-- table; the VIRTUAL column is computed when the index is built and kept in
+-- it. With idx_dequeue, dequeue_task is an ordered range scan over an
+-- agent's pending tasks in priority order, with the delay checked from the
+-- index. Existing values written without fractional seconds are padded
+-- first.
+
+UPDATE agent_tasks
+SET parameters = JSON_SET(
+    parameters, '$._delay_until',
+    CONCAT(JSON_UNQUOTE(JSON_EXTRACT(parameters, '$._delay_until')), '.000000')
+)
+WHERE JSON_UNQUOTE(JSON_EXTRACT(parameters, '$._delay_until')) NOT LIKE '%.%';
+
+ALTER TABLE agent_tasks
+    ADD COLUMN delay_until DATETIME(6)
+    AS (STR_TO_DATE(JSON_UNQUOTE(JSON_EXTRACT(parameters, '$._delay_until')), '%Y-%m-%dT%H:%i:%s.%f')) VIRTUAL;
+CREATE INDEX idx_dequeue ON agent_tasks (agent_name, status, priority, created_at, delay_until);
@@ -0,0 +1,7 @@
+-- agent_tasks claim token
+-- TaskQueueManager.dequeue_tasks_batch claims a batch of tasks with one
+-- UPDATE and tags the rows it moved to 'processing' with a random token, so
+-- when other workers claimed some of the same tasks it can tell which ones
+-- it won. The rows are found by task_id, so the column needs no index.
+
+ALTER TABLE agent_tasks ADD COLUMN claim_token VARCHAR(32) NULL;
@@ -0,0 +1,7 @@
+-- agent_tasks dependency index (TiDB >= 7.1)
+-- Multi-valued index over the task IDs in parameters._dependencies, so
+-- TaskQueueManager.get_dependent_tasks is an index lookup instead of a
+-- JSON_SEARCH over every task. Task IDs are 36-character UUIDs. The query
+-- must use the same JSON_EXTRACT expression for TiDB to pick the index.
+
+CREATE INDEX idx_deps ON agent_tasks ((CAST(JSON_EXTRACT(parameters, '$._dependencies') AS CHAR(64) ARRAY)));
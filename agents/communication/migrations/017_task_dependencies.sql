@@ -0,0 +1,32 @@
+-- Task dependency table
+-- One row per (task, dependency) pair, written by TaskQueueManager before
+-- the task itself. dequeue_task checks dependencies with a join on this
+-- table instead of reading parameters._dependencies, and
+-- get_task_dependencies / get_dependent_tasks are key lookups in either
+-- direction. The primary key serves task_id lookups, idx_depends_on the
+-- reverse ones; this replaces idx_deps. parameters._dependencies is still
+-- written for processors that read it.
+-- TiDB has no JSON_TABLE, so existing dependencies are unpacked by array
+-- position (up to 64 per task).
+
+CREATE TABLE IF NOT EXISTS task_dependencies (
+    task_id VARCHAR(64) NOT NULL,
+    depends_on VARCHAR(64) NOT NULL,
+    PRIMARY KEY (task_id, depends_on),
+    KEY idx_depends_on (depends_on)
+);
+
+INSERT IGNORE INTO task_dependencies (task_id, depends_on)
+SELECT t.task_id,
+       JSON_UNQUOTE(JSON_EXTRACT(t.parameters, CONCAT('$._dependencies[', p.n, ']')))
+FROM agent_tasks t
+JOIN (
+    SELECT a.n * 8 + b.n AS n
+    FROM (SELECT 0 AS n UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3
+          UNION ALL SELECT 4 UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7) a
+    CROSS JOIN (SELECT 0 AS n UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3
+          UNION ALL SELECT 4 UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7) b
+) p ON p.n < JSON_LENGTH(t.parameters, '$._dependencies')
+WHERE JSON_EXTRACT(t.parameters, '$._dependencies') IS NOT NULL;
+
+DROP INDEX idx_deps ON agent_tasks;
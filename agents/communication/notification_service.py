@@ -6,15 +6,24 @@ mechanisms for agent communication using database triggers and subscriptions.
 """
 
 import asyncio
+import heapq
 import logging
 import json
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Callable, Set
+import random
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import threading
 import time
 
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - depends on installed extras
+    ahocorasick = None
+
+from .serialization import dumps_bytes
 from .tidb_service import TiDBCommunicationService, AgentMessage
 
 logger = logging.getLogger(__name__)
@@ -27,26 +36,48 @@ class SubscriptionType(Enum):
     PATTERN = "pattern"
 
 
-@dataclass
+def _now_us() -> int:
+    """Current time as integer epoch microseconds."""
+    return time.time_ns() // 1000
+
+
+def _format_epoch_us(timestamp_us: Optional[int]) -> Optional[str]:
+    """Format epoch microseconds as a UTC ISO 8601 string."""
+    if timestamp_us is None:
+        return None
+    return datetime.fromtimestamp(timestamp_us / 1e6, tz=timezone.utc).isoformat()
+
+
+@dataclass(slots=True)
 class Subscription:
-    """Agent subscription data structure."""
+    """Agent subscription data structure (timestamps in epoch microseconds)."""
     agent_name: str
     channel: str
     subscription_type: SubscriptionType
     pattern: Optional[str] = None
     callback: Optional[Callable] = None
-    last_poll: Optional[datetime] = None
+    last_poll: Optional[int] = None
     message_count: int = 0
+    wants_bytes: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class NotificationEvent:
-    """Notification event data structure."""
+    """Notification event data structure (timestamp in epoch microseconds)."""
     event_type: str
     channel: str
     data: Dict[str, Any]
-    timestamp: datetime
+    timestamp: int
     source_agent: Optional[str] = None
+    payload_bytes: Optional[bytes] = None
+
+
+class _ChannelIndex(NamedTuple):
+    """A channel's subscriptions partitioned for event dispatch."""
+    broadcast: Tuple[Subscription, ...]
+    direct: Mapping[str, Subscription]
+    by_pattern: Mapping[str, Tuple[Subscription, ...]]
+    matcher: Any
 
 
 class TriggerNotificationService:
@@ -65,10 +96,22 @@ class TriggerNotificationService:
             communication_service: TiDB communication service instance
         """
         self.comm_service = communication_service
-        self.subscriptions: Dict[str, List[Subscription]] = {}
+        # channel -> agent name -> subscription, for O(1) upsert and removal
+        self.subscriptions: Dict[str, Dict[str, Subscription]] = {}
         self.event_handlers: Dict[str, List[Callable]] = {}
         self.running = False
         self.notification_tasks: List[asyncio.Task] = []
+        # Async subscriber callbacks run concurrently, at most this many at once
+        self.max_concurrent_callbacks = 16
+        self._callback_slots = asyncio.Semaphore(self.max_concurrent_callbacks)
+        # Per-channel subscriptions partitioned by type. Each index is
+        # immutable and replaced whole when the channel's subscriptions
+        # change, so notify_subscribers reads a consistent snapshot without
+        # building anything itself
+        self._channel_indexes: Dict[str, _ChannelIndex] = {}
+        # Local polling service woken on every triggered event, so pollers
+        # of the channel don't wait out their backoff interval
+        self.polling_service: Optional["MessagePollingService"] = None
 
     async def subscribe_agent(
         self,
@@ -76,7 +119,8 @@ class TriggerNotificationService:
         channel: str,
         subscription_type: SubscriptionType = SubscriptionType.ALL,
         pattern: Optional[str] = None,
-        callback: Optional[Callable] = None
+        callback: Optional[Callable] = None,
+        wants_bytes: bool = False
     ) -> None:
         """
         Subscribe an agent to a channel for notifications.
@@ -87,6 +131,10 @@ class TriggerNotificationService:
             subscription_type: Type of subscription
             pattern: Pattern for pattern-based subscriptions
             callback: Optional callback function for notifications
+            wants_bytes: Whether the callback needs the event serialized as
+                         JSON in event.payload_bytes (e.g. to write it to a
+                         socket); it is encoded once and shared by all
+                         such subscribers
         """
         # Store subscription in database
         insert_query = """
@@ -100,35 +148,29 @@ class TriggerNotificationService:
         try:
             await self.comm_service._execute_query(
                 insert_query,
-                (agent_name, channel, subscription_type.value, pattern)
+                (agent_name, channel, subscription_type.value, pattern),
+                prepared=True
             )
             
-            # Store in memory for quick access
-            if channel not in self.subscriptions:
-                self.subscriptions[channel] = []
-            
-            # Remove existing subscription for this agent/channel
-            self.subscriptions[channel] = [
-                sub for sub in self.subscriptions[channel] 
-                if sub.agent_name != agent_name
-            ]
-            
-            # Add new subscription
+            # Store in memory for quick access, replacing any existing
+            # subscription for this agent/channel
             subscription = Subscription(
                 agent_name=agent_name,
                 channel=channel,
                 subscription_type=subscription_type,
                 pattern=pattern,
                 callback=callback,
-                last_poll=datetime.now()
+                last_poll=_now_us(),
+                wants_bytes=wants_bytes
             )
             
-            self.subscriptions[channel].append(subscription)
+            self.subscriptions.setdefault(channel, {})[agent_name] = subscription
+            self._rebuild_channel_index(channel)
             
-            logger.info(f"Agent {agent_name} subscribed to channel {channel} ({subscription_type.value})")
+            logger.info("Agent %s subscribed to channel %s (%s)", agent_name, channel, subscription_type.value)
             
         except Exception as e:
-            logger.error(f"Failed to subscribe agent {agent_name} to channel {channel}: {e}")
+            logger.error("Failed to subscribe agent %s to channel %s: %s", agent_name, channel, e)
             raise
 
     async def unsubscribe_agent(self, agent_name: str, channel: str) -> None:
@@ -146,22 +188,22 @@ class TriggerNotificationService:
         """
         
         try:
-            await self.comm_service._execute_query(delete_query, (agent_name, channel))
+            await self.comm_service._execute_query(
+                delete_query, (agent_name, channel), prepared=True
+            )
             
             # Remove from memory
             if channel in self.subscriptions:
-                self.subscriptions[channel] = [
-                    sub for sub in self.subscriptions[channel] 
-                    if sub.agent_name != agent_name
-                ]
+                self.subscriptions[channel].pop(agent_name, None)
                 
                 if not self.subscriptions[channel]:
                     del self.subscriptions[channel]
+                self._rebuild_channel_index(channel)
             
-            logger.info(f"Agent {agent_name} unsubscribed from channel {channel}")
+            logger.info("Agent %s unsubscribed from channel %s", agent_name, channel)
             
         except Exception as e:
-            logger.error(f"Failed to unsubscribe agent {agent_name} from channel {channel}: {e}")
+            logger.error("Failed to unsubscribe agent %s from channel %s: %s", agent_name, channel, e)
             raise
 
     async def get_agent_subscriptions(self, agent_name: str) -> List[Subscription]:
@@ -180,7 +222,9 @@ class TriggerNotificationService:
         """
         
         try:
-            results = await self.comm_service._execute_query(query, (agent_name,), fetch=True)
+            results = await self.comm_service._execute_query(
+                query, (agent_name,), fetch=True, prepared=True
+            )
             
             subscriptions = []
             if results:
@@ -196,7 +240,7 @@ class TriggerNotificationService:
             return subscriptions
             
         except Exception as e:
-            logger.error(f"Failed to get subscriptions for agent {agent_name}: {e}")
+            logger.error("Failed to get subscriptions for agent %s: %s", agent_name, e)
             return []
 
     async def notify_subscribers(
@@ -218,55 +262,139 @@ class TriggerNotificationService:
         Returns:
             Number of agents notified
         """
-        if channel not in self.subscriptions:
+        index = self._channel_indexes.get(channel)
+        if index is None:
             return 0
         
         event = NotificationEvent(
             event_type=event_type,
             channel=channel,
             data=data,
-            timestamp=datetime.now(),
+            timestamp=_now_us(),
             source_agent=source_agent
         )
         
+        # Collect only the matching subscribers from the channel's index:
+        # every ALL subscription, the DIRECT subscription of the recipient,
+        # and the PATTERN subscriptions whose pattern occurs in the data
+        matched = list(index.broadcast)
+        recipient = index.direct.get(data.get("recipient_agent"))
+        if recipient:
+            matched.append(recipient)
+        if index.matcher:
+            for pattern in self._match_patterns(index.matcher, data):
+                matched.extend(index.by_pattern[pattern])
+        
         notified_count = 0
+        pending: List[Subscription] = []
         
-        for subscription in self.subscriptions[channel]:
+        for subscription in matched:
             try:
-                # Check subscription type and filters
-                should_notify = False
-                
-                if subscription.subscription_type == SubscriptionType.ALL:
-                    should_notify = True
-                elif subscription.subscription_type == SubscriptionType.DIRECT:
-                    # Only notify if message is directly addressed to this agent
-                    should_notify = data.get("recipient_agent") == subscription.agent_name
-                elif subscription.subscription_type == SubscriptionType.PATTERN:
-                    # Check if event matches pattern
-                    if subscription.pattern:
-                        should_notify = subscription.pattern in str(data)
+                if subscription.wants_bytes and event.payload_bytes is None:
+                    event.payload_bytes = dumps_bytes({
+                        "event_type": event_type,
+                        "channel": channel,
+                        "data": data,
+                        "ts": event.timestamp,
+                        "source": source_agent
+                    }, default=str)
                 
-                if should_notify:
-                    # Call callback if provided
-                    if subscription.callback:
+                # Call callback if provided; async callbacks are awaited
+                # together below
+                if subscription.callback:
+                    if asyncio.iscoroutinefunction(subscription.callback):
+                        pending.append(subscription)
+                    else:
                         try:
-                            if asyncio.iscoroutinefunction(subscription.callback):
-                                await subscription.callback(event)
-                            else:
-                                subscription.callback(event)
+                            subscription.callback(event)
                         except Exception as e:
-                            logger.error(f"Callback error for {subscription.agent_name}: {e}")
-                    
-                    # Update subscription stats
-                    subscription.message_count += 1
-                    notified_count += 1
+                            logger.error("Callback error for %s: %s", subscription.agent_name, e)
+                
+                # Update subscription stats
+                subscription.message_count += 1
+                notified_count += 1
             
             except Exception as e:
-                logger.error(f"Failed to notify {subscription.agent_name}: {e}")
+                logger.error("Failed to notify %s: %s", subscription.agent_name, e)
+        
+        if pending:
+            results = await asyncio.gather(
+                *(self._run_callback(sub.callback, event) for sub in pending),
+                return_exceptions=True
+            )
+            for subscription, result in zip(pending, results):
+                if isinstance(result, Exception):
+                    logger.error("Callback error for %s: %s", subscription.agent_name, result)
         
-        logger.debug(f"Notified {notified_count} subscribers for channel {channel}")
+        logger.debug("Notified %d subscribers for channel %s", notified_count, channel)
         return notified_count
 
+    async def _run_callback(self, callback: Callable, event: NotificationEvent) -> None:
+        """Await an async subscriber callback within the concurrency cap."""
+        async with self._callback_slots:
+            await callback(event)
+
+    def _rebuild_channel_index(self, channel: str) -> None:
+        """
+        Replace the channel's dispatch index after its subscriptions change.
+        
+        Args:
+            channel: Channel name
+        """
+        subscriptions = self.subscriptions.get(channel)
+        if not subscriptions:
+            self._channel_indexes.pop(channel, None)
+            return
+        
+        broadcast = []
+        direct = {}
+        by_pattern: Dict[str, List[Subscription]] = {}
+        # Enum members are singletons, so identity checks are enough
+        for sub in subscriptions.values():
+            kind = sub.subscription_type
+            if kind is SubscriptionType.ALL:
+                broadcast.append(sub)
+            elif kind is SubscriptionType.DIRECT:
+                direct[sub.agent_name] = sub
+            elif kind is SubscriptionType.PATTERN and sub.pattern:
+                by_pattern.setdefault(sub.pattern, []).append(sub)
+        
+        # All patterns are matched in a single pass with an Aho-Corasick
+        # automaton when pyahocorasick is installed
+        if ahocorasick is not None and by_pattern:
+            matcher = ahocorasick.Automaton()
+            for pattern in by_pattern:
+                matcher.add_word(pattern, pattern)
+            matcher.make_automaton()
+        else:
+            matcher = frozenset(by_pattern)
+        
+        self._channel_indexes[channel] = _ChannelIndex(
+            tuple(broadcast),
+            MappingProxyType(direct),
+            MappingProxyType({
+                pattern: tuple(subs) for pattern, subs in by_pattern.items()
+            }),
+            matcher
+        )
+
+    @staticmethod
+    def _match_patterns(matcher: Any, data: Dict[str, Any]) -> Set[str]:
+        """
+        Find the patterns of a channel index's matcher that occur in the data.
+        
+        Args:
+            matcher: Aho-Corasick automaton, or frozenset of patterns
+            data: Event data
+            
+        Returns:
+            Patterns found in the event data
+        """
+        text = str(data)
+        if isinstance(matcher, frozenset):
+            return {pattern for pattern in matcher if pattern in text}
+        return {pattern for _, pattern in matcher.iter(text)}
+
     def register_event_handler(self, event_type: str, handler: Callable) -> None:
         """
         Register an event handler for a specific event type.
@@ -279,7 +407,7 @@ class TriggerNotificationService:
             self.event_handlers[event_type] = []
         
         self.event_handlers[event_type].append(handler)
-        logger.info(f"Registered event handler for {event_type}")
+        logger.info("Registered event handler for %s", event_type)
 
     async def trigger_event(
         self,
@@ -306,7 +434,10 @@ class TriggerNotificationService:
                     else:
                         handler(channel, data, source_agent)
                 except Exception as e:
-                    logger.error(f"Event handler error for {event_type}: {e}")
+                    logger.error("Event handler error for %s: %s", event_type, e)
+        
+        if self.polling_service:
+            self.polling_service.wake(channel)
         
         # Notify subscribers
         await self.notify_subscribers(channel, event_type, data, source_agent)
@@ -346,28 +477,28 @@ class TriggerNotificationService:
         """
         
         try:
-            results = await self.comm_service._execute_query(query, fetch=True)
+            results = await self.comm_service._execute_query(query, fetch=True, pool="scan")
             
             if results:
+                now_us = _now_us()
                 for row in results:
                     channel = row["channel"]
-                    if channel not in self.subscriptions:
-                        self.subscriptions[channel] = []
-                    
                     subscription = Subscription(
                         agent_name=row["agent_name"],
                         channel=channel,
                         subscription_type=SubscriptionType(row["subscription_type"]),
                         pattern=row["pattern"],
-                        last_poll=datetime.now()
+                        last_poll=now_us
                     )
                     
-                    self.subscriptions[channel].append(subscription)
+                    self.subscriptions.setdefault(channel, {})[row["agent_name"]] = subscription
             
-            logger.info(f"Loaded {len(results) if results else 0} subscriptions from database")
+            for channel in self.subscriptions:
+                self._rebuild_channel_index(channel)
+            logger.info("Loaded %d subscriptions from database", len(results) if results else 0)
             
         except Exception as e:
-            logger.error(f"Failed to load subscriptions: {e}")
+            logger.error("Failed to load subscriptions: %s", e)
 
 
 class MessagePollingService:
@@ -378,20 +509,51 @@ class MessagePollingService:
     batch processing, and subscription-based filtering.
     """
 
-    def __init__(self, communication_service: TiDBCommunicationService):
+    def __init__(
+        self,
+        communication_service: TiDBCommunicationService,
+        min_poll_interval: float = 0,
+        long_poll: bool = False
+    ):
         """
         Initialize message polling service.
         
         Args:
             communication_service: TiDB communication service instance
+            min_poll_interval: Lower bound on every agent's poll interval in
+                               seconds; set it when messages are pushed by a
+                               notification backend so polling only catches up
+                               on missed events
+            long_poll: Whether idle agents wait for a message to be sent to
+                       their channels (see
+                       TiDBCommunicationService.wait_for_messages) instead
+                       of sleeping, so local sends are picked up immediately
         """
         self.comm_service = communication_service
         self.polling_agents: Dict[str, Dict[str, Any]] = {}
         self.running = False
-        self.polling_tasks: List[asyncio.Task] = []
+        # In-flight poll tick per agent; ticks are started by a single
+        # scheduler task from a heap of (deadline, agent name) instead of
+        # every agent sleeping in its own task
+        self.polling_tasks: Dict[str, asyncio.Task] = {}
+        self.coalesce_window = 0.02  # seconds; due-soon agents poll together
+        self._schedule: List[Tuple[float, str]] = []
+        self._schedule_changed = asyncio.Event()
+        self._scheduler_task: Optional[asyncio.Task] = None
         self.default_poll_interval = 5  # seconds
-        self.max_poll_interval = 60  # seconds
+        self.min_poll_interval = min_poll_interval  # seconds
+        self.max_poll_interval = max(60, min_poll_interval)  # seconds
         self.backoff_multiplier = 1.5
+        self.jitter_ratio = 0.2  # sleep varies by +/- 20% to spread out polls
+        self.queued_batches = 4  # polled batches waiting for the callback
+        # Processed-message acks are collected per agent and written with one
+        # UPDATE per agent every ack_delay seconds, or at once when an agent
+        # has ack_batch_size pending; ack_delay = 0 writes them immediately
+        self.ack_delay = 0.1  # seconds
+        self.ack_batch_size = 500
+        self._pending_acks: Dict[str, List[int]] = {}
+        self._ack_flush_task: Optional[asyncio.Task] = None
+        self.long_poll = long_poll
 
     async def start_polling_for_agent(
         self,
@@ -399,37 +561,53 @@ class MessagePollingService:
         channels: List[str],
         callback: Callable[[List[AgentMessage]], None],
         poll_interval: int = 5,
-        batch_size: int = 10
+        batch_size: int = 10,
+        callback_workers: int = 1
     ) -> None:
         """
         Start polling for messages for a specific agent.
         
+        Polled batches are queued and handed to the callback by separate
+        worker tasks, so a slow callback doesn't hold up polling; messages
+        are marked processed once the callback returns.
+        
         Args:
             agent_name: Agent name
             channels: List of channels to poll
             callback: Callback function for received messages
             poll_interval: Polling interval in seconds
             batch_size: Maximum messages per poll
+            callback_workers: Number of batches the callback may process
+                              concurrently; above 1, batches can complete
+                              out of order
         """
         if agent_name in self.polling_agents:
             await self.stop_polling_for_agent(agent_name)
         
+        poll_interval = max(poll_interval, self.min_poll_interval)
+        
         self.polling_agents[agent_name] = {
             "channels": channels,
             "callback": callback,
             "poll_interval": poll_interval,
             "batch_size": batch_size,
             "current_interval": poll_interval,
-            "last_poll": datetime.now(),
+            "last_poll": _now_us(),
             "message_count": 0,
-            "error_count": 0
+            "error_count": 0,
+            "queue": asyncio.Queue(maxsize=self.queued_batches),
+            "inflight_ids": set()
         }
+        agent_config = self.polling_agents[agent_name]
+        agent_config["workers"] = [
+            asyncio.create_task(self._deliver_batches(agent_name, agent_config))
+            for _ in range(max(1, callback_workers))
+        ]
         
-        # Start polling task
-        task = asyncio.create_task(self._poll_agent_messages(agent_name))
-        self.polling_tasks.append(task)
+        # Poll right away, then on the agent's own interval
+        self._schedule_poll(agent_name, 0)
         
-        logger.info(f"Started polling for agent {agent_name} on channels {channels}")
+        logger.info("Started polling for agent %s on channels %s", agent_name, channels)
 
     async def stop_polling_for_agent(self, agent_name: str) -> None:
         """
@@ -438,105 +616,228 @@ class MessagePollingService:
         Args:
             agent_name: Agent name
         """
-        if agent_name in self.polling_agents:
-            del self.polling_agents[agent_name]
-        
-        # Cancel agent's polling task
-        tasks_to_remove = []
-        for task in self.polling_tasks:
-            if not task.done() and hasattr(task, '_agent_name') and task._agent_name == agent_name:
-                task.cancel()
-                tasks_to_remove.append(task)
+        agent_config = self.polling_agents.pop(agent_name, None)
+        
+        # Cancel the agent's in-flight poll and callback workers; its heap
+        # entry is skipped once the agent is no longer registered. Batches
+        # still queued are not marked processed and will be polled again.
+        tasks = list(agent_config["workers"]) if agent_config else []
+        task = self.polling_tasks.pop(agent_name, None)
+        if task:
+            tasks.append(task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._flush_acks(agent_name)
+        
+        logger.info("Stopped polling for agent %s", agent_name)
+
+    def _schedule_poll(self, agent_name: str, delay: float) -> None:
+        """
+        Schedule the next poll for an agent.
+        
+        Args:
+            agent_name: Agent name
+            delay: Seconds from now
+        """
+        deadline = asyncio.get_running_loop().time() + delay
+        self.polling_agents[agent_name]["next_poll"] = deadline
+        heapq.heappush(self._schedule, (deadline, agent_name))
+        self._schedule_changed.set()
+
+    async def _run_scheduler(self) -> None:
+        """Start poll ticks for agents as their deadlines come due."""
+        loop = asyncio.get_running_loop()
+        
+        while self.running:
+            timeout = self._schedule[0][0] - loop.time() if self._schedule else None
+            if timeout is None or timeout > 0:
+                self._schedule_changed.clear()
                 try:
-                    await task
-                except asyncio.CancelledError:
+                    await asyncio.wait_for(self._schedule_changed.wait(), timeout)
+                except asyncio.TimeoutError:
                     pass
+                continue
+            
+            # Start every agent due within the coalescing window together
+            horizon = loop.time() + self.coalesce_window
+            while self._schedule and self._schedule[0][0] <= horizon:
+                deadline, agent_name = heapq.heappop(self._schedule)
+                agent_config = self.polling_agents.get(agent_name)
+                # Skip entries left behind by stopped or rescheduled agents
+                if agent_config is None or agent_config.get("next_poll") != deadline:
+                    continue
+                self.polling_tasks[agent_name] = asyncio.create_task(
+                    self._poll_agent_messages(agent_name)
+                )
+
+    async def _poll_agent_messages(self, agent_name: str) -> None:
+        """
+        Run one poll for an agent and schedule its next one.
         
-        for task in tasks_to_remove:
-            self.polling_tasks.remove(task)
+        Args:
+            agent_name: Agent name
+        """
+        agent_config = self.polling_agents.get(agent_name)
+        if agent_config is None:
+            return
         
-        logger.info(f"Stopped polling for agent {agent_name}")
+        next_delay = agent_config["poll_interval"]
+        try:
+            all_messages = []
+            queue = agent_config["queue"]
+            inflight_ids = agent_config["inflight_ids"]
+            
+            # When the callback workers are behind, skip this poll; the empty
+            # result backs the interval off below
+            if not queue.full():
+                # Poll messages from all subscribed channels in one query,
+                # over-fetching by the queued messages that aren't marked
+                # processed yet so they don't crowd out new ones
+                try:
+                    polled = await self.comm_service.poll_messages_multi(
+                        channels=agent_config["channels"],
+                        agent_name=agent_name,
+                        limit=agent_config["batch_size"] + len(inflight_ids)
+                    )
+                    all_messages = [
+                        message for message in polled
+                        if message.id not in inflight_ids
+                    ][:agent_config["batch_size"]]
 
-    async def _poll_agent_messages(self, agent_name: str) -> None:
+                except Exception as e:
+                    logger.error("Failed to poll channels %s for %s: %s", agent_config['channels'], agent_name, e)
+                    agent_config["error_count"] += 1
+            
+            # Hand messages to the callback workers
+            if all_messages:
+                inflight_ids.update(message.id for message in all_messages if message.id)
+                queue.put_nowait(all_messages)
+            
+            # Back off on low-yield polls and speed up on near-full ones,
+            # staying between the agent's poll interval and the maximum
+            fill = len(all_messages) / max(1, agent_config["batch_size"])
+            current_interval = agent_config["current_interval"]
+            if fill < 0.25:
+                current_interval = min(
+                    current_interval * self.backoff_multiplier,
+                    self.max_poll_interval
+                )
+            elif fill > 0.75:
+                current_interval = max(
+                    current_interval / 2,
+                    agent_config["poll_interval"]
+                )
+            agent_config["current_interval"] = current_interval
+            
+            # Jitter the wait so idle agents don't poll in lockstep
+            next_delay = current_interval * random.uniform(
+                1 - self.jitter_ratio, 1 + self.jitter_ratio
+            )
+            
+            if self.long_poll and fill < 0.25:
+                # Spend the wait watching the channels; poll again as soon as
+                # a message is sent or the interval runs out
+                await self.comm_service.wait_for_messages(
+                    agent_config["channels"], next_delay
+                )
+                next_delay = 0
+            
+        except Exception as e:
+            logger.error("Polling error for %s: %s", agent_name, e)
+            agent_config["error_count"] += 1
+        
+        finally:
+            if self.polling_tasks.get(agent_name) is asyncio.current_task():
+                del self.polling_tasks[agent_name]
+        
+        # Only reschedule if the agent wasn't stopped or restarted meanwhile
+        if self.running and self.polling_agents.get(agent_name) is agent_config:
+            self._schedule_poll(agent_name, next_delay)
+
+    async def _deliver_batches(self, agent_name: str, agent_config: Dict[str, Any]) -> None:
         """
-        Background polling task for an agent.
+        Callback worker: pass queued batches to the agent's callback.
         
         Args:
             agent_name: Agent name
+            agent_config: The agent's polling configuration
         """
-        # Store agent name in task for identification
-        current_task = asyncio.current_task()
-        if current_task:
-            current_task._agent_name = agent_name
+        queue = agent_config["queue"]
+        callback = agent_config["callback"]
         
-        while self.running and agent_name in self.polling_agents:
+        while True:
+            all_messages = await queue.get()
+            message_ids = [message.id for message in all_messages if message.id]
             try:
-                agent_config = self.polling_agents[agent_name]
-                
-                # Poll messages from all subscribed channels
-                all_messages = []
-                
-                for channel in agent_config["channels"]:
-                    try:
-                        messages = await self.comm_service.poll_messages(
-                            channel=channel,
-                            agent_name=agent_name,
-                            limit=agent_config["batch_size"]
-                        )
-                        all_messages.extend(messages)
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to poll channel {channel} for {agent_name}: {e}")
-                        agent_config["error_count"] += 1
-                
-                # Process messages if any
-                if all_messages:
-                    try:
-                        # Call callback with messages
-                        callback = agent_config["callback"]
-                        if asyncio.iscoroutinefunction(callback):
-                            await callback(all_messages)
-                        else:
-                            callback(all_messages)
-                        
-                        # Mark messages as processed
-                        for message in all_messages:
-                            if message.id:
-                                await self.comm_service.mark_message_processed(
-                                    message.id, agent_name
-                                )
-                        
-                        # Update stats
-                        agent_config["message_count"] += len(all_messages)
-                        agent_config["last_poll"] = datetime.now()
-                        
-                        # Reset polling interval on successful processing
-                        agent_config["current_interval"] = agent_config["poll_interval"]
-                        
-                        logger.debug(f"Processed {len(all_messages)} messages for {agent_name}")
-                        
-                    except Exception as e:
-                        logger.error(f"Message processing error for {agent_name}: {e}")
-                        agent_config["error_count"] += 1
-                
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(all_messages)
                 else:
-                    # No messages, apply backoff
-                    current_interval = agent_config["current_interval"]
-                    new_interval = min(
-                        current_interval * self.backoff_multiplier,
-                        self.max_poll_interval
-                    )
-                    agent_config["current_interval"] = new_interval
+                    callback(all_messages)
                 
-                # Wait for next poll
-                await asyncio.sleep(agent_config["current_interval"])
+                # Update stats
+                agent_config["message_count"] += len(all_messages)
+                agent_config["last_poll"] = _now_us()
+                
+                logger.debug("Processed %d messages for %s", len(all_messages), agent_name)
                 
-            except asyncio.CancelledError:
-                break
             except Exception as e:
-                logger.error(f"Polling error for {agent_name}: {e}")
+                # Unmarked messages are delivered again by a later poll
+                logger.error("Message processing error for %s: %s", agent_name, e)
                 agent_config["error_count"] += 1
-                await asyncio.sleep(agent_config["poll_interval"])
+                agent_config["inflight_ids"].difference_update(message_ids)
+            
+            else:
+                # Messages stay in flight until their ack is written
+                await self._ack_messages(agent_name, message_ids)
+            
+            finally:
+                queue.task_done()
+
+    async def _ack_messages(self, agent_name: str, message_ids: List[int]) -> None:
+        """
+        Queue processed messages to be marked, flushing when due.
+        
+        Args:
+            agent_name: Agent that processed the messages
+            message_ids: Processed message IDs
+        """
+        pending = self._pending_acks.setdefault(agent_name, [])
+        pending.extend(message_ids)
+        
+        if self.ack_delay <= 0 or len(pending) >= self.ack_batch_size:
+            await self._flush_acks(agent_name)
+        elif self._ack_flush_task is None or self._ack_flush_task.done():
+            self._ack_flush_task = asyncio.create_task(self._flush_acks_later())
+
+    async def _flush_acks_later(self) -> None:
+        """Flush all pending acks after the ack delay."""
+        await asyncio.sleep(self.ack_delay)
+        for agent_name in list(self._pending_acks):
+            await self._flush_acks(agent_name)
+
+    async def _flush_acks(self, agent_name: str) -> None:
+        """
+        Mark an agent's pending acked messages as processed.
+        
+        Args:
+            agent_name: Agent name
+        """
+        message_ids = self._pending_acks.pop(agent_name, None)
+        if not message_ids:
+            return
+        
+        try:
+            await self.comm_service.mark_messages_processed_bulk(
+                message_ids, agent_name
+            )
+        except Exception as e:
+            # Unmarked messages are delivered again by a later poll
+            logger.error("Failed to mark %d messages processed for %s: %s", len(message_ids), agent_name, e)
+        finally:
+            agent_config = self.polling_agents.get(agent_name)
+            if agent_config:
+                agent_config["inflight_ids"].difference_update(message_ids)
 
     async def get_polling_stats(self, agent_name: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -556,7 +857,7 @@ class MessagePollingService:
                     "channels": config["channels"],
                     "poll_interval": config["poll_interval"],
                     "current_interval": config["current_interval"],
-                    "last_poll": config["last_poll"].isoformat() if config["last_poll"] else None,
+                    "last_poll": _format_epoch_us(config["last_poll"]),
                     "message_count": config["message_count"],
                     "error_count": config["error_count"],
                     "success_rate": (config["message_count"] / (config["message_count"] + config["error_count"])) if (config["message_count"] + config["error_count"]) > 0 else 1.0
@@ -571,7 +872,7 @@ class MessagePollingService:
                 "channels": config["channels"],
                 "poll_interval": config["poll_interval"],
                 "current_interval": config["current_interval"],
-                "last_poll": config["last_poll"].isoformat() if config["last_poll"] else None,
+                "last_poll": _format_epoch_us(config["last_poll"]),
                 "message_count": config["message_count"],
                 "error_count": config["error_count"],
                 "success_rate": (config["message_count"] / (config["message_count"] + config["error_count"])) if (config["message_count"] + config["error_count"]) > 0 else 1.0
@@ -589,19 +890,46 @@ class MessagePollingService:
             return
         
         self.running = True
+        self._scheduler_task = asyncio.create_task(self._run_scheduler())
         logger.info("Message polling service started")
 
     async def stop_polling_service(self) -> None:
         """Stop the polling service."""
         self.running = False
         
+        if self._scheduler_task:
+            self._scheduler_task.cancel()
+            await asyncio.gather(self._scheduler_task, return_exceptions=True)
+            self._scheduler_task = None
+        
         # Stop all agent polling
-        agent_names = list(self.polling_agents.keys())
+        agent_names = set(self.polling_agents) | set(self.polling_tasks)
         for agent_name in agent_names:
             await self.stop_polling_for_agent(agent_name)
+        self._schedule.clear()
+        
+        if self._ack_flush_task and not self._ack_flush_task.done():
+            self._ack_flush_task.cancel()
         
         logger.info("Message polling service stopped")
 
+    def wake(self, channel: str) -> None:
+        """
+        Poll the channel's agents now instead of at their next deadline.
+        
+        Agents idle in a long-poll wait are released from it; agents waiting
+        on the schedule are moved to the front. Their backoff interval is
+        left as is.
+        
+        Args:
+            channel: Channel that has a new event
+        """
+        self.comm_service._wake_channels((channel,))
+        
+        for agent_name, agent_config in self.polling_agents.items():
+            if agent_name not in self.polling_tasks and channel in agent_config["channels"]:
+                self._schedule_poll(agent_name, 0)
+
     async def update_agent_channels(self, agent_name: str, channels: List[str]) -> None:
         """
         Update channels for an agent.
@@ -612,7 +940,7 @@ class MessagePollingService:
         """
         if agent_name in self.polling_agents:
             self.polling_agents[agent_name]["channels"] = channels
-            logger.info(f"Updated channels for {agent_name}: {channels}")
+            logger.info("Updated channels for %s: %s", agent_name, channels)
 
     async def get_unprocessed_count(self, agent_name: str, channel: str) -> int:
         """
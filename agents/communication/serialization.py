@@ -0,0 +1,135 @@
+"""
+JSON Serialization Helpers
+
+Uses orjson when it is installed and falls back to the standard library
+json module otherwise. Both paths return ``str`` from dumps, UTF-8
+``bytes`` from dumps_bytes and accept ``str``/``bytes`` in loads.
+
+Also provides the agent_cache value codec: large values are stored as
+zstd-compressed JSON behind a one-byte codec header, small values (and
+all values when zstandard isn't installed) as plain JSON text.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on installed extras
+    zstandard = None
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any, default: Any = None, indent: bool = False) -> str:
+        """
+        Serialize an object to a JSON string.
+        
+        Args:
+            obj: Object to serialize
+            default: Fallback serializer for unsupported types
+            indent: Whether to pretty-print with two-space indentation
+            
+        Returns:
+            JSON string
+        """
+        option = _OPTIONS | orjson.OPT_INDENT_2 if indent else _OPTIONS
+        return orjson.dumps(obj, default=default, option=option).decode()
+
+    def dumps_bytes(obj: Any, default: Any = None) -> bytes:
+        """
+        Serialize an object to UTF-8 encoded JSON.
+        
+        Args:
+            obj: Object to serialize
+            default: Fallback serializer for unsupported types
+            
+        Returns:
+            JSON bytes
+        """
+        return orjson.dumps(obj, default=default, option=_OPTIONS)
+
+    loads = orjson.loads
+
+else:
+
+    def dumps(obj: Any, default: Any = None, indent: bool = False) -> str:
+        """
+        Serialize an object to a JSON string.
+        
+        Args:
+            obj: Object to serialize
+            default: Fallback serializer for unsupported types
+            indent: Whether to pretty-print with two-space indentation
+            
+        Returns:
+            JSON string
+        """
+        return json.dumps(obj, default=default, indent=2 if indent else None)
+
+    def dumps_bytes(obj: Any, default: Any = None) -> bytes:
+        """
+        Serialize an object to UTF-8 encoded JSON.
+        
+        Args:
+            obj: Object to serialize
+            default: Fallback serializer for unsupported types
+            
+        Returns:
+            JSON bytes
+        """
+        return json.dumps(obj, default=default, separators=(",", ":")).encode()
+
+    loads = json.loads
+
+
+# agent_cache value codec
+CODEC_ZSTD = 0x01
+COMPRESSION_THRESHOLD = 256  # Bytes of JSON below which compression rarely pays
+
+if zstandard is not None:
+    _compressor = zstandard.ZstdCompressor(level=3)
+    _decompressor = zstandard.ZstdDecompressor()
+
+
+def encode_cache_value(value: Any) -> Union[bytes, str]:
+    """
+    Encode a value for storage in agent_cache.result.
+    
+    Args:
+        value: Value to cache
+        
+    Returns:
+        Codec-prefixed compressed bytes, or plain JSON text for small values
+    """
+    payload = dumps(value)
+    if zstandard is None or len(payload) < COMPRESSION_THRESHOLD:
+        return payload
+    return bytes((CODEC_ZSTD,)) + _compressor.compress(payload.encode())
+
+
+def decode_cache_value(raw: Union[bytes, bytearray, str, None]) -> Any:
+    """
+    Decode a value read from agent_cache.result.
+    
+    Rows without a codec header are plain JSON text.
+    
+    Args:
+        raw: Stored column value
+        
+    Returns:
+        Decoded value, or None for empty values
+    """
+    if not raw:
+        return None
+    if isinstance(raw, (bytes, bytearray)) and raw[0] == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read compressed cache values")
+        return loads(_decompressor.decompress(bytes(raw[1:])))
+    return loads(raw)
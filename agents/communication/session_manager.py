@@ -7,12 +7,17 @@ including conversation history, state management, and session analytics.
 
 import asyncio
 import logging
+import time
 import uuid
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Deque, Dict, Hashable, Iterable, List, MutableMapping, Optional, Set, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
+from cachetools import LRUCache, TTLCache
+
+from .serialization import dumps, loads
 from .tidb_service import TiDBCommunicationService, AgentSessionData
 
 logger = logging.getLogger(__name__)
@@ -26,22 +31,28 @@ class SessionStatus(Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationTurn:
     """Individual conversation turn data structure."""
     agent_name: str
     message_type: str
     content: Dict[str, Any]
-    timestamp: datetime
+    ts_ms: int  # UNIX epoch milliseconds
     processing_time_ms: Optional[int] = None
     metadata: Optional[Dict[str, Any]] = None
+    seq: Optional[int] = None
 
     def __post_init__(self):
         if self.metadata is None:
             self.metadata = {}
 
+    @property
+    def timestamp(self) -> datetime:
+        """Time of the turn as a local datetime."""
+        return datetime.fromtimestamp(self.ts_ms / 1000)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class SessionMetrics:
     """Session performance metrics."""
     total_turns: int
@@ -53,7 +64,7 @@ class SessionMetrics:
     success_rate: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SessionSummary:
     """Session summary for analytics."""
     session_id: str
@@ -67,6 +78,78 @@ class SessionSummary:
     outcome: Optional[str]
 
 
+@dataclass
+class _CachedSession(AgentSessionData):
+    """Active session held in memory with a tail of its most recent turns."""
+    recent_turns: Deque[ConversationTurn] = field(default_factory=deque)
+    # Agents already recorded in the session's metrics row
+    agents_seen: Set[str] = field(default_factory=set)
+
+
+class DerivedCacheIndex:
+    """
+    Index of the cache entries derived from each session.
+    
+    Reads register the cache keys they computed from a session; a write to
+    the session evicts exactly those entries. The index holds at most
+    maxsize sessions; when the least recently registered session is dropped
+    its entries are evicted as well, so no entry outlives its tracking.
+    """
+    
+    def __init__(self, cache: MutableMapping, maxsize: int):
+        """
+        Initialize the index.
+        
+        Args:
+            cache: Cache holding the derived entries
+            maxsize: Maximum number of sessions tracked
+        """
+        self.cache = cache
+        self.maxsize = maxsize
+        self._keys: "OrderedDict[str, Set[Hashable]]" = OrderedDict()
+    
+    def register(self, session_id: str, key: Hashable) -> None:
+        """
+        Record that a cache entry was derived from a session.
+        
+        Args:
+            session_id: Session the entry was computed from
+            key: Cache key of the entry
+        """
+        keys = self._keys.get(session_id)
+        if keys is None:
+            if len(self._keys) >= self.maxsize:
+                _, evicted = self._keys.popitem(last=False)
+                self._evict(evicted)
+            keys = self._keys[session_id] = set()
+        else:
+            self._keys.move_to_end(session_id)
+        keys.add(key)
+    
+    def register_all(self, session_ids: Iterable[str], key: Hashable) -> None:
+        """Record that a cache entry was derived from several sessions."""
+        for session_id in session_ids:
+            self.register(session_id, key)
+    
+    def invalidate(self, session_id: str) -> None:
+        """
+        Evict every cache entry derived from a session.
+        
+        Args:
+            session_id: Changed session
+        """
+        self._evict(self._keys.pop(session_id, ()))
+    
+    def clear(self) -> None:
+        """Evict every tracked entry."""
+        self.cache.clear()
+        self._keys.clear()
+    
+    def _evict(self, keys: Iterable[Hashable]) -> None:
+        for key in keys:
+            self.cache.pop(key, None)
+
+
 class SessionManager:
     """
     Comprehensive session manager for multi-agent interactions.
@@ -75,15 +158,71 @@ class SessionManager:
     state persistence, and session analytics with full SQL query capabilities.
     """
 
-    def __init__(self, communication_service: TiDBCommunicationService):
+    def __init__(
+        self,
+        communication_service: TiDBCommunicationService,
+        use_turns_table: bool = True,
+        use_fulltext_search: bool = False,
+        max_active_sessions: int = 1000,
+        recent_turns_size: int = 50,
+        turn_batch_size: int = 100,
+        turn_flush_interval: float = 0.05,
+        view_cache_size: int = 1024,
+        view_cache_ttl: float = 30,
+        view_index_size: int = 16384
+    ):
         """
         Initialize session manager.
         
         Args:
             communication_service: TiDB communication service instance
+            use_turns_table: Whether conversation turns are stored in
+                             agent_conversation_turns with running totals in
+                             session_metrics (migrations 005 and later); when
+                             False they are appended server-side to
+                             agent_sessions.conversation_history
+            use_fulltext_search: Whether content search uses the full-text
+                                 index on turn_text (migration 008 index,
+                                 TiDB with TiFlash only) instead of
+                                 JSON_SEARCH over the turns
+            max_active_sessions: Active sessions kept in memory; the least
+                                 recently used are dropped beyond this
+            recent_turns_size: Most recent turns kept in memory per active
+                               session to serve short history reads
+            turn_batch_size: Buffered turns that trigger an immediate write
+            turn_flush_interval: Seconds a buffered turn may wait before
+                                 it is written
+            view_cache_size: Entries in each of the session summary and
+                             session metrics result caches
+            view_cache_ttl: Seconds a cached summary or metrics result is
+                            served; writes through this manager evict the
+                            affected entries earlier
+            view_index_size: Sessions whose cached summaries and metrics
+                             are tracked for eviction on write; entries of
+                             sessions beyond this are evicted with them
         """
         self.comm_service = communication_service
-        self.active_sessions: Dict[str, AgentSessionData] = {}
+        self.use_turns_table = use_turns_table
+        self.use_fulltext_search = use_fulltext_search
+        self.active_sessions: LRUCache = LRUCache(maxsize=max_active_sessions)
+        self.recent_turns_size = recent_turns_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # New turns are buffered and written with multi-row inserts
+        self.turn_batch_size = turn_batch_size
+        self.turn_flush_interval = turn_flush_interval
+        self.turn_flush_max_delay = 5.0  # seconds between retries of a failed flush
+        self._turn_flush_failures = 0
+        self._turn_buffer: List[Tuple[str, ConversationTurn, tuple]] = []
+        self._turn_flush_task: Optional[asyncio.Task] = None
+        self._turn_flush_lock = asyncio.Lock()
+        
+        # Read-through caches for dashboard queries
+        self._summary_cache: TTLCache = TTLCache(maxsize=view_cache_size, ttl=view_cache_ttl)
+        self._metrics_cache: TTLCache = TTLCache(maxsize=view_cache_size, ttl=view_cache_ttl)
+        self._summary_index = DerivedCacheIndex(self._summary_cache, view_index_size)
+        self._metrics_index = DerivedCacheIndex(self._metrics_cache, view_index_size)
         self.session_timeout = 3600  # 1 hour default timeout
 
     async def create_session(
@@ -124,7 +263,12 @@ class SessionManager:
         created_session_id = await self.comm_service.create_session(session_data)
         
         # Cache in memory for quick access
-        self.active_sessions[created_session_id] = session_data
+        self._cache_session(session_data)
+        # A new session is listed first in the owner's unfiltered and
+        # active-session summaries
+        self._invalidate_session_views(
+            created_session_id, user_id, (SessionStatus.ACTIVE.value, None)
+        )
         
         logger.info(f"Session created: {created_session_id} for user {user_id} with agents {agents_involved}")
         return created_session_id
@@ -140,18 +284,44 @@ class SessionManager:
             Session data or None if not found
         """
         # Check memory cache first
-        if session_id in self.active_sessions:
-            return self.active_sessions[session_id]
+        cached = self.active_sessions.get(session_id)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        self.cache_misses += 1
         
         # Fetch from database
         session_data = await self.comm_service.get_session(session_id)
         
         # Cache if active
         if session_data and session_data.status == SessionStatus.ACTIVE.value:
-            self.active_sessions[session_id] = session_data
+            return self._cache_session(session_data)
         
         return session_data
 
+    def _cache_session(self, session_data: AgentSessionData) -> _CachedSession:
+        """
+        Keep an active session in the in-memory LRU.
+        
+        With the turns table the legacy conversation_history blob is not
+        retained; recent turns are tracked in a bounded tail instead.
+        
+        Args:
+            session_data: Session data
+            
+        Returns:
+            The cached session
+        """
+        values = vars(session_data)
+        if self.use_turns_table:
+            values = {**values, "conversation_history": []}
+        cached = _CachedSession(
+            **values,
+            recent_turns=deque(maxlen=self.recent_turns_size)
+        )
+        self.active_sessions[cached.session_id] = cached
+        return cached
+
     async def update_session_state(
         self,
         session_id: str,
@@ -166,23 +336,24 @@ class SessionManager:
             state_updates: State updates to apply
             merge: Whether to merge with existing state or replace
         """
-        session = await self.get_session(session_id)
-        if not session:
-            raise ValueError(f"Session not found: {session_id}")
-        
+        # The database applies the change directly; the stored state is not
+        # read first
         if merge:
-            session.session_state.update(state_updates)
+            updated = await self.comm_service.merge_session_state(session_id, state_updates)
         else:
-            session.session_state = state_updates
-        
-        # Update in database
-        await self.comm_service.update_session(session_id, {
-            "session_state": session.session_state
-        })
+            updated = await self.comm_service.update_session(session_id, {
+                "session_state": state_updates
+            })
+        if not updated:
+            raise ValueError(f"Session not found: {session_id}")
         
-        # Update memory cache
-        if session_id in self.active_sessions:
-            self.active_sessions[session_id].session_state = session.session_state
+        # Apply the same change to the cached copy
+        cached = self.active_sessions.get(session_id)
+        if cached is not None:
+            if merge:
+                cached.session_state.update(state_updates)
+            else:
+                cached.session_state = state_updates
         
         logger.debug(f"Session state updated: {session_id}")
 
@@ -214,25 +385,162 @@ class SessionManager:
             agent_name=agent_name,
             message_type=message_type,
             content=content,
-            timestamp=datetime.now(),
+            ts_ms=time.time_ns() // 1_000_000,
             processing_time_ms=processing_time_ms,
             metadata=metadata or {}
         )
         
-        # Add to conversation history
-        session.conversation_history.append(asdict(turn))
-        
-        # Update in database
-        await self.comm_service.update_session(session_id, {
-            "conversation_history": session.conversation_history
-        })
+        # Append only the new turn; the stored history is never rewritten
+        if self.use_turns_table:
+            # Buffered; seq is assigned when the batch is written. The row is
+            # encoded now, once, so a flush only sends prepared values
+            row = self.comm_service.conversation_turn_row(
+                session_id,
+                turn.agent_name,
+                turn.message_type,
+                turn.content,
+                turn.ts_ms,
+                turn.processing_time_ms,
+                turn.metadata,
+                self._is_error_turn(turn.message_type, turn.content)
+            )
+            self._turn_buffer.append((session_id, turn, row))
+            if len(self._turn_buffer) >= self.turn_batch_size:
+                # A failed flush keeps the turn buffered and schedules its own
+                # retry; raising would invite the caller to add it twice
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"Failed to flush conversation turns: {e}")
+            else:
+                self._schedule_turn_flush(self.turn_flush_interval)
+        else:
+            turn_data = {
+                "agent_name": turn.agent_name,
+                "message_type": turn.message_type,
+                "content": turn.content,
+                "timestamp": turn.timestamp.isoformat(),
+                "processing_time_ms": turn.processing_time_ms,
+                "metadata": turn.metadata
+            }
+            await self.comm_service.append_conversation_turn(session_id, dumps(turn_data))
+            session.conversation_history.append(turn_data)
+            turn.seq = len(session.conversation_history)
         
-        # Update memory cache
-        if session_id in self.active_sessions:
-            self.active_sessions[session_id].conversation_history = session.conversation_history
+        if isinstance(session, _CachedSession):
+            session.recent_turns.append(turn)
+        self._invalidate_session_views(session_id)
         
         logger.debug(f"Conversation turn added to session {session_id} by {agent_name}")
 
+    def _schedule_turn_flush(self, delay: float) -> None:
+        """
+        Start a delayed flush unless one is already pending.
+        
+        Args:
+            delay: Seconds to wait before flushing
+        """
+        task = self._turn_flush_task
+        if task is None or task.done() or task is asyncio.current_task():
+            self._turn_flush_task = asyncio.create_task(self._flush_turns_later(delay))
+
+    async def _flush_turns_later(self, delay: float) -> None:
+        """Write buffered turns after a delay."""
+        await asyncio.sleep(delay)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush conversation turns: {e}")
+
+    async def flush(self) -> None:
+        """
+        Write all buffered conversation turns and their metrics.
+        
+        Reads of history and metrics flush first, so they see every turn
+        added through this manager. Call before shutdown so no turns are
+        lost.
+        """
+        async with self._turn_flush_lock:
+            if not self._turn_buffer:
+                return
+            
+            entries, self._turn_buffer = self._turn_buffer, []
+            deltas = self._metrics_deltas(entries)
+            
+            try:
+                # Turns and metrics commit together or not at all
+                first_seq = await self.comm_service.write_conversation_turns(
+                    [row for _, _, row in entries],
+                    deltas
+                )
+            except Exception:
+                # Keep the turns for the next flush and retry with
+                # exponential backoff so they don't wait for the next turn
+                self._turn_buffer[:0] = entries
+                self._turn_flush_failures += 1
+                self._schedule_turn_flush(min(
+                    self.turn_flush_interval * 2 ** self._turn_flush_failures,
+                    self.turn_flush_max_delay
+                ))
+                raise
+            
+            self._turn_flush_failures = 0
+            # In-memory state only reflects what was committed
+            for offset, (_, turn, _) in enumerate(entries):
+                turn.seq = first_seq + offset
+            for session_id, delta in deltas.items():
+                cached = self.active_sessions.get(session_id)
+                if cached is not None:
+                    cached.agents_seen.update(delta["new_agents"])
+
+    def _metrics_deltas(
+        self,
+        entries: List[Tuple[str, ConversationTurn, tuple]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate a batch of turns into per-session metrics increments.
+        
+        Args:
+            entries: Buffered (session_id, turn, row) entries in insertion order
+            
+        Returns:
+            write_conversation_turns metrics keyed by session ID
+        """
+        deltas: Dict[str, Dict[str, Any]] = {}
+        agents_seen: Dict[str, Set[str]] = {}
+        for session_id, turn, row in entries:
+            delta = deltas.get(session_id)
+            if delta is None:
+                # Only agents not yet recorded are sent; sessions outside the
+                # cache send each agent of the batch, a no-op if already known.
+                # The cached set is copied and only updated after the write
+                cached = self.active_sessions.get(session_id)
+                agents_seen[session_id] = set(cached.agents_seen) if cached is not None else set()
+                delta = deltas[session_id] = {
+                    "turn_count": 0,
+                    "processing_time_ms_sum": 0,
+                    "processing_samples": 0,
+                    "first_ts_ms": turn.ts_ms,
+                    "last_ts_ms": turn.ts_ms,
+                    "error_count": 0,
+                    "message_type_counts": {},
+                    "new_agents": []
+                }
+            delta["turn_count"] += 1
+            if turn.processing_time_ms is not None:
+                delta["processing_time_ms_sum"] += turn.processing_time_ms
+                delta["processing_samples"] += 1
+            delta["last_ts_ms"] = turn.ts_ms
+            if row[-1]:  # is_error, classified when the turn was added
+                delta["error_count"] += 1
+            counts = delta["message_type_counts"]
+            counts[turn.message_type] = counts.get(turn.message_type, 0) + 1
+            seen = agents_seen[session_id]
+            if turn.agent_name not in seen:
+                seen.add(turn.agent_name)
+                delta["new_agents"].append(turn.agent_name)
+        return deltas
+
     async def get_conversation_history(
         self,
         session_id: str,
@@ -252,33 +560,162 @@ class SessionManager:
         Returns:
             List of conversation turns
         """
+        # Short unfiltered reads are served from the in-memory tail
+        cached = self.active_sessions.get(session_id)
+        if (
+            cached is not None
+            and limit
+            and limit <= len(cached.recent_turns)
+            and not agent_filter
+            and not message_type_filter
+        ):
+            return list(cached.recent_turns)[-limit:]
+        
+        rows = await self._load_turns(session_id, limit, agent_filter, message_type_filter)
+        return [self._turn_from_row(row) for row in rows]
+
+    async def get_conversation_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        before_seq: Optional[int] = None,
+        agent_filter: Optional[str] = None,
+        message_type_filter: Optional[str] = None
+    ) -> Tuple[List[ConversationTurn], Optional[int]]:
+        """
+        Get one page of conversation history, walking back from the newest turn.
+        
+        Args:
+            session_id: Session ID
+            limit: Maximum number of turns in the page
+            before_seq: Cursor returned with the previous page; None for the
+                        most recent page
+            agent_filter: Filter by specific agent
+            message_type_filter: Filter by message type
+            
+        Returns:
+            Turns of the page, oldest first, and the cursor for the next
+            (older) page, or None when there are no older turns
+        """
+        rows = await self._load_turns(
+            session_id, limit, agent_filter, message_type_filter, before_seq
+        )
+        
+        next_cursor = rows[0]["seq"] if len(rows) == limit else None
+        return [self._turn_from_row(row) for row in rows], next_cursor
+
+    async def iter_conversation_history(
+        self,
+        session_id: str,
+        agent_filter: Optional[str] = None,
+        message_type_filter: Optional[str] = None,
+        page_size: int = 100
+    ) -> AsyncIterator[ConversationTurn]:
+        """
+        Iterate over conversation history from the newest turn backwards.
+        
+        Turns are fetched a page at a time as iteration proceeds, so a
+        caller that stops after the last few turns never loads the rest.
+        
+        Args:
+            session_id: Session ID
+            agent_filter: Filter by specific agent
+            message_type_filter: Filter by message type
+            page_size: Turns fetched per query
+            
+        Yields:
+            Conversation turns, newest first
+        """
+        before_seq = None
+        while True:
+            turns, before_seq = await self.get_conversation_page(
+                session_id,
+                limit=page_size,
+                before_seq=before_seq,
+                agent_filter=agent_filter,
+                message_type_filter=message_type_filter
+            )
+            for turn in reversed(turns):
+                yield turn
+            if before_seq is None:
+                return
+
+    @staticmethod
+    def _is_error_turn(message_type: str, content: Dict[str, Any]) -> bool:
+        """Whether a turn counts as an error in the session metrics."""
+        return "error" in message_type.lower() or bool(content.get("error"))
+
+    @staticmethod
+    def _turn_from_row(row: Dict[str, Any]) -> ConversationTurn:
+        """Build a ConversationTurn from a turn row."""
+        return ConversationTurn(
+            agent_name=row["agent_name"],
+            message_type=row["message_type"],
+            content=row["content"],
+            ts_ms=row["ts_ms"],
+            processing_time_ms=row["processing_time_ms"],
+            metadata=row["metadata"],
+            seq=row["seq"]
+        )
+
+    async def _load_turns(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        agent_filter: Optional[str] = None,
+        message_type_filter: Optional[str] = None,
+        before_seq: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Load turn rows, oldest first, from wherever turns are stored.
+        
+        Args:
+            session_id: Session ID
+            limit: Return only the most recent turns, at most this many
+            agent_filter: Filter by specific agent
+            message_type_filter: Filter by message type
+            before_seq: Only return turns older than this sequence number
+            
+        Returns:
+            Turn rows shaped like agent_conversation_turns rows
+        """
+        if self.use_turns_table:
+            await self.flush()
+            return await self.comm_service.get_conversation_turns(
+                session_id,
+                limit=limit,
+                agent_name=agent_filter,
+                message_type=message_type_filter,
+                before_seq=before_seq
+            )
+        
         session = await self.get_session(session_id)
         if not session:
             return []
         
-        turns = []
-        for turn_data in session.conversation_history:
-            # Apply filters
-            if agent_filter and turn_data.get("agent_name") != agent_filter:
-                continue
-            if message_type_filter and turn_data.get("message_type") != message_type_filter:
-                continue
-            
-            turn = ConversationTurn(
-                agent_name=turn_data["agent_name"],
-                message_type=turn_data["message_type"],
-                content=turn_data["content"],
-                timestamp=datetime.fromisoformat(turn_data["timestamp"]) if isinstance(turn_data["timestamp"], str) else turn_data["timestamp"],
-                processing_time_ms=turn_data.get("processing_time_ms"),
-                metadata=turn_data.get("metadata", {})
-            )
-            turns.append(turn)
+        # Legacy histories have no stored sequence numbers; use positions
+        history = session.conversation_history
+        if before_seq is not None:
+            history = history[:max(before_seq - 1, 0)]
         
-        # Apply limit
-        if limit:
-            turns = turns[-limit:]
+        rows = [
+            {
+                "seq": position,
+                "agent_name": turn_data["agent_name"],
+                "message_type": turn_data["message_type"],
+                "content": turn_data["content"],
+                # The legacy column keeps ISO timestamps
+                "ts_ms": int(datetime.fromisoformat(turn_data["timestamp"]).timestamp() * 1000),
+                "processing_time_ms": turn_data.get("processing_time_ms"),
+                "metadata": turn_data.get("metadata", {}),
+                "is_error": self._is_error_turn(turn_data["message_type"], turn_data["content"])
+            }
+            for position, turn_data in enumerate(history, 1)
+            if (not agent_filter or turn_data.get("agent_name") == agent_filter)
+            and (not message_type_filter or turn_data.get("message_type") == message_type_filter)
+        ]
         
-        return turns
+        return rows[-limit:] if limit else rows
 
     async def pause_session(self, session_id: str, reason: Optional[str] = None) -> None:
         """
@@ -291,7 +728,7 @@ class SessionManager:
         await self._update_session_status(
             session_id, 
             SessionStatus.PAUSED, 
-            {"pause_reason": reason} if reason else None
+            {"metadata_updates": {"pause_reason": reason}} if reason else None
         )
 
     async def resume_session(self, session_id: str) -> None:
@@ -319,11 +756,9 @@ class SessionManager:
         """
         updates = {"completed_at": True}
         
+        # Set the outcome key in place rather than rewriting the metadata
         if outcome:
-            session = await self.get_session(session_id)
-            if session:
-                session.metadata["outcome"] = outcome
-                updates["metadata"] = session.metadata
+            updates["metadata_updates"] = {"outcome": outcome}
         
         if final_state:
             updates["session_state"] = final_state
@@ -331,8 +766,7 @@ class SessionManager:
         await self._update_session_status(session_id, SessionStatus.COMPLETED, updates)
         
         # Remove from active sessions cache
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
+        self.active_sessions.pop(session_id, None)
 
     async def fail_session(
         self,
@@ -348,23 +782,21 @@ class SessionManager:
             error_message: Error description
             error_details: Additional error details
         """
-        session = await self.get_session(session_id)
-        if session:
-            session.metadata.update({
-                "error_message": error_message,
-                "error_details": error_details or {},
-                "failed_at": datetime.now().isoformat()
-            })
-            
-            await self._update_session_status(
-                session_id, 
-                SessionStatus.FAILED, 
-                {"metadata": session.metadata, "completed_at": True}
-            )
+        await self._update_session_status(
+            session_id, 
+            SessionStatus.FAILED, 
+            {
+                "metadata_updates": {
+                    "error_message": error_message,
+                    "error_details": error_details or {},
+                    "failed_at": datetime.now().isoformat()
+                },
+                "completed_at": True
+            }
+        )
         
         # Remove from active sessions cache
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
+        self.active_sessions.pop(session_id, None)
 
     async def _update_session_status(
         self,
@@ -387,8 +819,44 @@ class SessionManager:
         await self.comm_service.update_session(session_id, updates)
         
         # Update memory cache
-        if session_id in self.active_sessions:
-            self.active_sessions[session_id].status = status.value
+        cached = self.active_sessions.get(session_id)
+        if cached is not None:
+            cached.status = status.value
+            cached.metadata.update(updates.get("metadata_updates", {}))
+        self._invalidate_session_views(
+            session_id, cached.user_id if cached is not None else None, (status.value,)
+        )
+
+    def _invalidate_session_views(
+        self,
+        session_id: str,
+        user_id: Optional[str] = None,
+        entered_statuses: Tuple[Optional[str], ...] = ()
+    ) -> None:
+        """
+        Evict cached metrics and summaries that a session change affects.
+        
+        Entries computed from the session are found through the derived
+        cache indexes. Summaries that did not list the session are only
+        affected when it may have entered them, after creation or a status
+        change.
+        
+        Args:
+            session_id: Changed session
+            user_id: Owner of the session; None when unknown, which treats
+                     every user's summaries as the owner's
+            entered_statuses: Status filters (None for unfiltered) of the
+                              summaries the session may have entered
+        """
+        self._metrics_index.invalidate(session_id)
+        self._summary_index.invalidate(session_id)
+        if not entered_statuses:
+            return
+        for key in [
+            key for key in self._summary_cache
+            if key[1] in entered_statuses and (user_id is None or key[0] in (user_id, None))
+        ]:
+            self._summary_cache.pop(key, None)
 
     async def get_active_sessions_for_user(self, user_id: str) -> List[AgentSessionData]:
         """
@@ -412,11 +880,52 @@ class SessionManager:
         Returns:
             Session metrics or None if session not found
         """
-        session = await self.get_session(session_id)
-        if not session:
-            return None
+        metrics = self._metrics_cache.get(session_id)
+        if metrics is None:
+            session = await self.get_session(session_id)
+            if not session:
+                return None
+            metrics = self._metrics_cache[session_id] = await self._compute_session_metrics(session)
+            self._metrics_index.register(session_id, session_id)
+        return metrics
+
+    async def _compute_session_metrics(self, session: AgentSessionData) -> SessionMetrics:
+        """
+        Compute session metrics from the metrics row, a SQL aggregate over
+        the turns, or the full history.
         
-        conversation_history = session.conversation_history
+        Args:
+            session: Session data
+            
+        Returns:
+            Session metrics
+        """
+        session_id = session.session_id
+        if self.use_turns_table:
+            await self.flush()
+            # Migration 007 backfills the running totals of existing
+            # sessions; TiDB aggregates the turns of any session still
+            # without a row
+            row = (
+                await self.comm_service.get_session_metrics_row(session_id)
+                or await self.comm_service.aggregate_conversation_turn_metrics(session_id)
+            )
+            if row:
+                total_turns = row["total_turns"]
+                samples = row["count_processing_samples"]
+                return SessionMetrics(
+                    total_turns=total_turns,
+                    agents_involved=row["agents_involved"],
+                    avg_response_time_ms=row["sum_processing_time_ms"] / samples if samples else 0.0,
+                    total_duration_seconds=(row["last_ts_ms"] - row["first_ts_ms"]) / 1000,
+                    message_types=row["message_type_counts"],
+                    error_count=row["error_count"],
+                    success_rate=(total_turns - row["error_count"]) / total_turns
+                )
+        
+        # Legacy histories are only stored as JSON, so they are computed from
+        # the full history; a session without turns has nothing to compute
+        conversation_history = [] if self.use_turns_table else await self._load_turns(session_id)
         if not conversation_history:
             return SessionMetrics(
                 total_turns=0,
@@ -428,33 +937,32 @@ class SessionManager:
                 success_rate=1.0
             )
         
-        # Calculate metrics
+        # Calculate metrics in a single pass over the history
         total_turns = len(conversation_history)
-        agents_involved = list(set(turn.get("agent_name", "") for turn in conversation_history))
-        
-        # Response times
-        response_times = [
-            turn.get("processing_time_ms", 0) 
-            for turn in conversation_history 
-            if turn.get("processing_time_ms") is not None
-        ]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0.0
-        
-        # Duration
-        start_time = datetime.fromisoformat(conversation_history[0]["timestamp"]) if isinstance(conversation_history[0]["timestamp"], str) else conversation_history[0]["timestamp"]
-        end_time = datetime.fromisoformat(conversation_history[-1]["timestamp"]) if isinstance(conversation_history[-1]["timestamp"], str) else conversation_history[-1]["timestamp"]
-        total_duration = (end_time - start_time).total_seconds()
-        
-        # Message types
+        agents = set()
+        add_agent = agents.add
         message_types = {}
+        message_types_get = message_types.get
+        response_time_sum = 0
+        response_time_samples = 0
         error_count = 0
         for turn in conversation_history:
-            msg_type = turn.get("message_type", "unknown")
-            message_types[msg_type] = message_types.get(msg_type, 0) + 1
+            turn_get = turn.get
+            add_agent(turn_get("agent_name", ""))
+            
+            processing_time_ms = turn_get("processing_time_ms")
+            if processing_time_ms is not None:
+                response_time_sum += processing_time_ms
+                response_time_samples += 1
             
-            if "error" in msg_type.lower() or turn.get("content", {}).get("error"):
+            msg_type = turn_get("message_type", "unknown")
+            message_types[msg_type] = message_types_get(msg_type, 0) + 1
+            if turn_get("is_error"):
                 error_count += 1
         
+        agents_involved = list(agents)
+        avg_response_time = response_time_sum / response_time_samples if response_time_samples else 0.0
+        total_duration = (conversation_history[-1]["ts_ms"] - conversation_history[0]["ts_ms"]) / 1000
         success_rate = (total_turns - error_count) / total_turns if total_turns > 0 else 1.0
         
         return SessionMetrics(
@@ -488,12 +996,9 @@ class SessionManager:
         """
         
         try:
-            await self.comm_service._execute_query(query, (cutoff_time,))
-            
-            # Get affected row count
-            count_query = "SELECT ROW_COUNT() as count"
-            result = await self.comm_service._execute_query(count_query, fetch=True, fetch_one=True)
-            cleaned_count = result["count"] if result else 0
+            cleaned_count = await self.comm_service._execute_query(
+                query, (cutoff_time,), return_rowcount=True
+            )
             
             # Remove from active sessions cache
             expired_sessions = [
@@ -502,7 +1007,9 @@ class SessionManager:
             ]
             
             for session_id in expired_sessions:
-                del self.active_sessions[session_id]
+                self.active_sessions.pop(session_id, None)
+            if cleaned_count:
+                self._summary_index.clear()
             
             logger.info(f"Cleaned up {cleaned_count} expired sessions (older than {max_age_hours} hours)")
             return cleaned_count
@@ -530,34 +1037,51 @@ class SessionManager:
         Returns:
             List of session summaries
         """
+        cache_key = (user_id, status_filter, limit, offset)
+        cached = self._summary_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         where_clauses = []
         params = []
         
         if user_id:
-            where_clauses.append("user_id = %s")
+            where_clauses.append("s.user_id = %s")
             params.append(user_id)
         
         if status_filter:
-            where_clauses.append("status = %s")
+            where_clauses.append("s.status = %s")
             params.append(status_filter)
         
         where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
         
+        if self.use_turns_table:
+            # Message counts come from the running metrics row (a primary key
+            # lookup per listed session), never from the turns themselves
+            await self.flush()
+            total_messages = "COALESCE(m.total_turns, 0)"
+            metrics_join = "LEFT JOIN session_metrics m ON m.session_id = s.session_id"
+        else:
+            total_messages = "JSON_LENGTH(s.conversation_history)"
+            metrics_join = ""
+        
         query = f"""
-        SELECT session_id, user_id, status, created_at, completed_at,
-               agents_involved, metadata,
-               JSON_LENGTH(conversation_history) as total_messages,
-               TIMESTAMPDIFF(SECOND, created_at, COALESCE(completed_at, NOW())) as duration_seconds
-        FROM agent_sessions
+        SELECT s.session_id, s.user_id, s.status, s.created_at, s.completed_at,
+               s.agents_involved,
+               JSON_UNQUOTE(JSON_EXTRACT(s.metadata, '$.outcome')) as outcome,
+               {total_messages} as total_messages,
+               TIMESTAMPDIFF(SECOND, s.created_at, COALESCE(s.completed_at, NOW())) as duration_seconds
+        FROM agent_sessions s
+        {metrics_join}
         {where_clause}
-        ORDER BY created_at DESC
+        ORDER BY s.created_at DESC
         LIMIT %s OFFSET %s
         """
         
         params.extend([limit, offset])
         
         try:
-            results = await self.comm_service._execute_query(query, tuple(params), fetch=True)
+            results = await self.comm_service._execute_query(query, tuple(params), fetch=True, prepared=True)
             
             summaries = []
             if results:
@@ -569,12 +1093,14 @@ class SessionManager:
                         created_at=row["created_at"],
                         completed_at=row["completed_at"],
                         duration_seconds=row["duration_seconds"],
-                        agents_involved=row["agents_involved"] if isinstance(row["agents_involved"], list) else [],
+                        agents_involved=loads(row["agents_involved"]) if row["agents_involved"] else [],
                         total_messages=row["total_messages"] or 0,
-                        outcome=row.get("metadata", {}).get("outcome") if row.get("metadata") else None
+                        outcome=row["outcome"]
                     )
                     summaries.append(summary)
             
+            self._summary_cache[cache_key] = tuple(summaries)
+            self._summary_index.register_all((summary.session_id for summary in summaries), cache_key)
             return summaries
             
         except Exception as e:
@@ -598,19 +1124,36 @@ class SessionManager:
         Returns:
             List of session IDs matching the search
         """
-        where_clauses = ["JSON_SEARCH(conversation_history, 'one', %s) IS NOT NULL"]
-        params = [f"%{search_term}%"]
+        if self.use_turns_table and self.use_fulltext_search:
+            await self.flush()
+            # Word match through the full-text index on turn_text
+            where_clauses = [
+                "s.session_id IN (SELECT t.session_id FROM agent_conversation_turns t"
+                " WHERE fts_match_word(%s, t.turn_text))"
+            ]
+            params = [search_term]
+        elif self.use_turns_table:
+            await self.flush()
+            where_clauses = [
+                "EXISTS (SELECT 1 FROM agent_conversation_turns t"
+                " WHERE t.session_id = s.session_id"
+                " AND JSON_SEARCH(t.content, 'one', %s) IS NOT NULL)"
+            ]
+            params = [f"%{search_term}%"]
+        else:
+            where_clauses = ["JSON_SEARCH(s.conversation_history, 'one', %s) IS NOT NULL"]
+            params = [f"%{search_term}%"]
         
         if user_id:
-            where_clauses.append("user_id = %s")
+            where_clauses.append("s.user_id = %s")
             params.append(user_id)
         
         where_clause = "WHERE " + " AND ".join(where_clauses)
         
         query = f"""
-        SELECT session_id FROM agent_sessions
+        SELECT s.session_id FROM agent_sessions s
         {where_clause}
-        ORDER BY created_at DESC
+        ORDER BY s.created_at DESC
         LIMIT %s
         """
         
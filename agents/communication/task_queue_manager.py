@@ -7,13 +7,14 @@ including priority queuing, batch processing, retry mechanisms, and task analyti
 
 import asyncio
 import logging
+import secrets
 import uuid
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Callable, Union
+from typing import Any, Dict, List, Optional, Callable, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
-import json
 
+from .serialization import dumps, loads
 from .tidb_service import TiDBCommunicationService, AgentTask, TaskStatus
 
 logger = logging.getLogger(__name__)
@@ -64,6 +65,36 @@ class TaskFilter:
     created_before: Optional[datetime] = None
 
 
+def _delay_until(value: Union[datetime, str, int, float]) -> str:
+    """
+    Format a task's _delay_until parameter.
+    
+    Always writes microseconds, matching the STR_TO_DATE format of the
+    delay_until column (migration 014), so the column never sees a value it
+    can't parse.
+    
+    Args:
+        value: Seconds from now, or an absolute local time as a datetime or
+               ISO string
+        
+    Returns:
+        Local time as YYYY-MM-DDTHH:MM:SS.ffffff
+        
+    Raises:
+        ValueError: If value is not a valid ISO timestamp
+    """
+    if isinstance(value, (int, float)):
+        value = datetime.now() + timedelta(seconds=value)
+    elif not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid _delay_until: {value!r}")
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat(timespec="microseconds")
+
+
 class TaskQueueManager:
     """
     Comprehensive task queue manager for agent coordination.
@@ -84,6 +115,18 @@ class TaskQueueManager:
         self.batch_size = 100
         self.retry_delays = [1, 5, 15, 60, 300]  # Exponential backoff in seconds
         self.processing_timeout = 300  # 5 minutes default timeout
+        self.dequeue_candidates = 4  # Pending tasks read per dequeue attempt
+        self.max_concurrency = 32  # Tasks of a batch processed at a time
+        
+        # Completions and permanent failures are buffered and written with
+        # one UPDATE per flush
+        self.status_batch_size = 100
+        self.status_flush_interval = 0.05  # seconds
+        self.status_flush_max_delay = 5.0  # seconds between retries of a failed flush
+        self._status_flush_failures = 0
+        self._status_buffer: Dict[str, Tuple[TaskStatus, Optional[str], Optional[str]]] = {}
+        self._status_flush_task: Optional[asyncio.Task] = None
+        self._status_flush_lock = asyncio.Lock()
 
     def register_task_processor(
         self,
@@ -126,21 +169,28 @@ class TaskQueueManager:
             Task ID
         """
         priority_value = priority.value if isinstance(priority, TaskPriority) else priority
+        task_id = str(uuid.uuid4())
         
         # Add dependency information to parameters
         if depends_on:
             parameters["_dependencies"] = depends_on
+            # Recorded before the task exists, so it can't be dequeued
+            # without them
+            await self._insert_dependencies([(task_id, dependency) for dependency in depends_on])
         
         # Add delay information
         if delay_seconds > 0:
-            parameters["_delay_until"] = (datetime.now() + timedelta(seconds=delay_seconds)).isoformat()
+            parameters["_delay_until"] = _delay_until(delay_seconds)
+        elif "_delay_until" in parameters:
+            parameters["_delay_until"] = _delay_until(parameters["_delay_until"])
         
         task_id = await self.comm_service.enqueue_task(
             agent_name=agent_name,
             task_type=task_type,
             parameters=parameters,
             priority=priority_value,
-            max_retries=max_retries
+            max_retries=max_retries,
+            task_id=task_id
         )
         
         logger.debug(f"Task enqueued: {task_id} for {agent_name} ({task_type}, priority: {priority_value})")
@@ -148,7 +198,8 @@ class TaskQueueManager:
 
     async def enqueue_batch_tasks(
         self,
-        tasks: List[Dict[str, Any]]
+        tasks: List[Dict[str, Any]],
+        chunk_size: int = 500
     ) -> List[str]:
         """
         Enqueue multiple tasks in a batch operation.
@@ -157,21 +208,19 @@ class TaskQueueManager:
             tasks: List of task definitions
                   Each task should have: agent_name, task_type, parameters
                   Optional: priority, max_retries, delay_seconds, depends_on
+            chunk_size: Maximum tasks per INSERT statement
                   
         Returns:
             List of task IDs
         """
         task_ids = []
+        rows = []
+        dependencies = []
         
-        # Use transaction for batch insert
         connection = None
         cursor = None
         
         try:
-            connection = self.comm_service._get_connection()
-            cursor = connection.cursor()
-            connection.start_transaction()
-            
             for task_def in tasks:
                 task_id = str(uuid.uuid4())
                 priority = task_def.get("priority", TaskPriority.NORMAL.value)
@@ -183,30 +232,53 @@ class TaskQueueManager:
                 # Handle dependencies
                 if task_def.get("depends_on"):
                     parameters["_dependencies"] = task_def["depends_on"]
+                    dependencies.extend((task_id, dependency) for dependency in task_def["depends_on"])
                 
                 # Handle delay
                 if task_def.get("delay_seconds", 0) > 0:
-                    delay_until = datetime.now() + timedelta(seconds=task_def["delay_seconds"])
-                    parameters["_delay_until"] = delay_until.isoformat()
+                    parameters["_delay_until"] = _delay_until(task_def["delay_seconds"])
+                elif "_delay_until" in parameters:
+                    parameters["_delay_until"] = _delay_until(parameters["_delay_until"])
                 
-                insert_query = """
-                INSERT INTO agent_tasks 
-                (task_id, agent_name, task_type, parameters, priority, max_retries)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """
-                
-                cursor.execute(insert_query, (
+                rows.append((
                     task_id,
                     task_def["agent_name"],
                     task_def["task_type"],
-                    json.dumps(parameters),
+                    dumps(parameters),
                     priority,
                     task_def.get("max_retries", 3)
                 ))
-                
                 task_ids.append(task_id)
             
-            connection.commit()
+            # Dependencies go in first, so no task of the batch can be
+            # dequeued without them; rows left by a failed batch are inert
+            if dependencies:
+                await self._insert_dependencies(dependencies, chunk_size)
+            
+            # One multi-row INSERT per chunk; the chunk bound keeps each
+            # statement well under max_allowed_packet
+            statements = []
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                insert_query = f"""
+                INSERT INTO agent_tasks 
+                (task_id, agent_name, task_type, parameters, priority, max_retries)
+                VALUES {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(chunk))}
+                """
+                statements.append((insert_query, tuple(value for row in chunk for value in row)))
+            
+            if len(statements) == 1:
+                # A single statement is atomic under autocommit, so it skips
+                # the transaction's extra round trips
+                await self.comm_service._execute_query(*statements[0])
+            elif statements:
+                # Use transaction for a batch spanning several statements
+                connection = self.comm_service._get_connection()
+                cursor = connection.cursor()
+                connection.start_transaction()
+                for insert_query, params in statements:
+                    cursor.execute(insert_query, params)
+                connection.commit()
             
             # Log batch operation
             await self.comm_service._log_operation(
@@ -245,100 +317,232 @@ class TaskQueueManager:
             if connection:
                 connection.close()
 
-    async def dequeue_task(
+    async def _insert_dependencies(
+        self,
+        dependencies: List[Tuple[str, str]],
+        chunk_size: int = 500
+    ) -> None:
+        """
+        Record task dependencies with one multi-row INSERT per chunk.
+        
+        Args:
+            dependencies: (task_id, depends_on) pairs
+            chunk_size: Maximum pairs per INSERT statement
+        """
+        for start in range(0, len(dependencies), chunk_size):
+            chunk = dependencies[start:start + chunk_size]
+            query = f"""
+            INSERT IGNORE INTO task_dependencies (task_id, depends_on)
+            VALUES {', '.join(['(%s, %s)'] * len(chunk))}
+            """
+            
+            try:
+                await self.comm_service._execute_query(
+                    query, tuple(value for pair in chunk for value in pair)
+                )
+                
+            except Exception as e:
+                logger.error(f"Failed to record {len(chunk)} task dependencies: {e}")
+                raise
+
+    def _ready_tasks_query(
         self,
         agent_name: str,
-        task_types: Optional[List[str]] = None
-    ) -> Optional[AgentTask]:
+        task_types: Optional[List[str]],
+        limit: int
+    ) -> Tuple[str, tuple]:
         """
-        Dequeue the next available task for an agent.
+        Build the query selecting an agent's next ready tasks.
         
         Args:
             agent_name: Agent name
             task_types: Optional list of task types to filter by
+            limit: Maximum tasks to select
             
         Returns:
-            Next available task or None
+            Query and parameters
         """
         # Build query with optional task type filtering
-        where_clauses = ["agent_name = %s", "status = 'pending'"]
+        where_clauses = ["t.agent_name = %s", "t.status = 'pending'"]
         params = [agent_name]
         
         if task_types:
             placeholders = ",".join(["%s"] * len(task_types))
-            where_clauses.append(f"task_type IN ({placeholders})")
+            where_clauses.append(f"t.task_type IN ({placeholders})")
             params.extend(task_types)
         
-        # Check for delay and dependencies
+        # Check for delay (delay_until is generated from _delay_until, see
+        # migration 014) and dependencies (task_dependencies, migration
+        # 017); tasks still waiting on a dependency are passed over instead
+        # of blocking the queue
+        where_clauses.append("(t.delay_until IS NULL OR t.delay_until <= NOW())")
         where_clauses.append("""
-            (JSON_EXTRACT(parameters, '$._delay_until') IS NULL 
-             OR STR_TO_DATE(JSON_UNQUOTE(JSON_EXTRACT(parameters, '$._delay_until')), '%Y-%m-%dT%H:%i:%s') <= NOW())
+            NOT EXISTS (
+                SELECT 1 FROM task_dependencies d
+                JOIN agent_tasks a ON a.task_id = d.depends_on
+                WHERE d.task_id = t.task_id AND a.status != 'completed'
+            )
         """)
         
         query = f"""
-        SELECT * FROM agent_tasks
+        SELECT * FROM agent_tasks t
         WHERE {' AND '.join(where_clauses)}
-        ORDER BY priority ASC, created_at ASC
-        LIMIT 1
-        FOR UPDATE
+        ORDER BY t.priority ASC, t.created_at ASC
+        LIMIT %s
         """
+        params.append(limit)
         
-        try:
-            result = await self.comm_service._execute_query(query, tuple(params), fetch=True, fetch_one=True)
+        return query, tuple(params)
+
+    @staticmethod
+    def _claimed_task(row: Dict[str, Any]) -> AgentTask:
+        """Build the AgentTask of a task row just claimed for processing."""
+        return AgentTask(
+            id=row["id"],
+            task_id=row["task_id"],
+            agent_name=row["agent_name"],
+            task_type=row["task_type"],
+            parameters=loads(row["parameters"]) if row["parameters"] else {},
+            priority=row["priority"],
+            status=TaskStatus.PROCESSING,
+            result=loads(row["result"]) if row["result"] else None,
+            error_message=row["error_message"],
+            retry_count=row["retry_count"],
+            max_retries=row["max_retries"],
+            created_at=row["created_at"],
+            started_at=datetime.now(),
+            completed_at=row["completed_at"]
+        )
+
+    async def dequeue_task(
+        self,
+        agent_name: str,
+        task_types: Optional[List[str]] = None
+    ) -> Optional[AgentTask]:
+        """
+        Dequeue the next available task for an agent.
+        
+        Args:
+            agent_name: Agent name
+            task_types: Optional list of task types to filter by
             
-            if result:
-                # Check dependencies if any
-                parameters = json.loads(result["parameters"]) if result["parameters"] else {}
-                dependencies = parameters.get("_dependencies", [])
+        Returns:
+            Next available task or None
+        """
+        # A few candidates, so a worker that loses the claim on the first
+        # can take the next instead of querying again
+        query, params = self._ready_tasks_query(agent_name, task_types, self.dequeue_candidates)
+        
+        # Claiming is a compare-and-set on the status, so only one worker
+        # can move a task out of 'pending'
+        claim_query = """
+        UPDATE agent_tasks 
+        SET status = 'processing', started_at = NOW()
+        WHERE task_id = %s AND status = 'pending'
+        """
+        
+        try:
+            while True:
+                candidates = await self.comm_service._execute_query(query, params, fetch=True)
+                if not candidates:
+                    return None
                 
-                if dependencies:
-                    # Check if all dependencies are completed
-                    dep_check_query = """
-                    SELECT COUNT(*) as incomplete_count FROM agent_tasks
-                    WHERE task_id IN ({}) AND status != 'completed'
-                    """.format(",".join(["%s"] * len(dependencies)))
-                    
-                    dep_result = await self.comm_service._execute_query(
-                        dep_check_query, tuple(dependencies), fetch=True, fetch_one=True
+                for result in candidates:
+                    task_id = result["task_id"]
+                    claimed = await self.comm_service._execute_query(
+                        claim_query, (task_id,), return_rowcount=True, prepared=True
                     )
+                    if not claimed:
+                        continue  # Taken by another worker
                     
-                    if dep_result and dep_result["incomplete_count"] > 0:
-                        # Dependencies not met, skip this task
-                        return None
+                    logger.debug(f"Task dequeued: {task_id} by {agent_name}")
+                    return self._claimed_task(result)
                 
-                # Mark task as processing
-                task_id = result["task_id"]
-                update_query = """
-                UPDATE agent_tasks 
-                SET status = 'processing', started_at = NOW()
-                WHERE task_id = %s
+                # Every candidate was claimed by other workers; look again
+            
+        except Exception as e:
+            logger.error(f"Failed to dequeue task: {e}")
+            raise
+
+    async def dequeue_tasks_batch(
+        self,
+        agent_name: str,
+        limit: int,
+        task_types: Optional[List[str]] = None
+    ) -> List[AgentTask]:
+        """
+        Dequeue up to limit available tasks for an agent at once.
+        
+        The ready tasks are read with one query and claimed with one UPDATE
+        tagged with a claim token (migration 015); only when other workers
+        took some of them is a third query needed to find the ones won.
+        
+        Args:
+            agent_name: Agent name
+            limit: Maximum tasks to dequeue
+            task_types: Optional list of task types to filter by
+            
+        Returns:
+            Claimed tasks in priority order; fewer than limit if the queue
+            runs short or other workers claim some of the same tasks
+        """
+        query, params = self._ready_tasks_query(agent_name, task_types, limit)
+        
+        try:
+            candidates = await self.comm_service._execute_query(query, params, fetch=True)
+            if not candidates:
+                return []
+            
+            claim_token = secrets.token_hex(16)
+            task_ids = [row["task_id"] for row in candidates]
+            placeholders = ", ".join(["%s"] * len(task_ids))
+            
+            claim_query = f"""
+            UPDATE agent_tasks 
+            SET status = 'processing', started_at = NOW(), claim_token = %s
+            WHERE task_id IN ({placeholders}) AND status = 'pending'
+            """
+            claimed = await self.comm_service._execute_query(
+                claim_query, (claim_token, *task_ids), return_rowcount=True
+            )
+            
+            if claimed < len(candidates):
+                won_query = f"""
+                SELECT task_id FROM agent_tasks
+                WHERE task_id IN ({placeholders}) AND claim_token = %s
                 """
-                await self.comm_service._execute_query(update_query, (task_id,))
-                
-                task = AgentTask(
-                    id=result["id"],
-                    task_id=result["task_id"],
-                    agent_name=result["agent_name"],
-                    task_type=result["task_type"],
-                    parameters=parameters,
-                    priority=result["priority"],
-                    status=TaskStatus.PROCESSING,
-                    result=json.loads(result["result"]) if result["result"] else None,
-                    error_message=result["error_message"],
-                    retry_count=result["retry_count"],
-                    max_retries=result["max_retries"],
-                    created_at=result["created_at"],
-                    started_at=datetime.now(),
-                    completed_at=result["completed_at"]
+                won = await self.comm_service._execute_query(
+                    won_query, (*task_ids, claim_token), fetch=True
                 )
-                
-                logger.debug(f"Task dequeued: {task_id} by {agent_name}")
-                return task
+                won_ids = {row["task_id"] for row in won or []}
+                candidates = [row for row in candidates if row["task_id"] in won_ids]
             
-            return None
+            logger.debug(f"Dequeued {len(candidates)} tasks by {agent_name}")
+            return [self._claimed_task(row) for row in candidates]
             
         except Exception as e:
-            logger.error(f"Failed to dequeue task: {e}")
+            logger.error(f"Failed to dequeue task batch: {e}")
+            raise
+
+    async def _release_tasks(self, task_ids: List[str]) -> None:
+        """
+        Return claimed but unprocessed tasks to the queue.
+        
+        Args:
+            task_ids: Task IDs to release
+        """
+        placeholders = ", ".join(["%s"] * len(task_ids))
+        query = f"""
+        UPDATE agent_tasks 
+        SET status = 'pending', started_at = NULL
+        WHERE task_id IN ({placeholders}) AND status = 'processing'
+        """
+        
+        try:
+            await self.comm_service._execute_query(query, tuple(task_ids))
+            
+        except Exception as e:
+            logger.error(f"Failed to release tasks: {e}")
             raise
 
     async def complete_task(
@@ -355,10 +559,8 @@ class TaskQueueManager:
             result: Task result
             processing_time_ms: Processing time in milliseconds
         """
-        await self.comm_service.update_task_status(
-            task_id=task_id,
-            status=TaskStatus.COMPLETED,
-            result=result
+        await self._buffer_status(
+            task_id, TaskStatus.COMPLETED, result=dumps(result) if result is not None else None
         )
         
         # Log processing time if provided
@@ -416,22 +618,129 @@ class TaskQueueManager:
                 WHERE task_id = %s
                 """
                 
-                delay_until = (datetime.now() + timedelta(seconds=delay_seconds)).isoformat()
-                await self.comm_service._execute_query(retry_query, (delay_until, task_id))
+                await self.comm_service._execute_query(retry_query, (_delay_until(delay_seconds), task_id))
                 
                 logger.info(f"Task scheduled for retry: {task_id} (attempt {retry_count + 1}, delay: {delay_seconds}s)")
                 return True
         
         # Permanently fail the task
-        await self.comm_service.update_task_status(
-            task_id=task_id,
-            status=TaskStatus.FAILED,
-            error_message=error_message
-        )
+        await self._buffer_status(task_id, TaskStatus.FAILED, error_message=error_message or None)
         
         logger.warning(f"Task permanently failed: {task_id} - {error_message}")
         return False
 
+    async def _buffer_status(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        result: Optional[str] = None,
+        error_message: Optional[str] = None
+    ) -> None:
+        """
+        Buffer a final task status for the next flush.
+        
+        Args:
+            task_id: Task ID
+            status: COMPLETED or FAILED
+            result: JSON-encoded result of a completed task
+            error_message: Error message of a failed task
+        """
+        self._status_buffer[task_id] = (status, result, error_message)
+        if len(self._status_buffer) >= self.status_batch_size:
+            # A failed flush keeps the status buffered and schedules its own
+            # retry, so the caller's task outcome stands
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush task statuses: {e}")
+        else:
+            self._schedule_status_flush(self.status_flush_interval)
+
+    def _schedule_status_flush(self, delay: float) -> None:
+        """
+        Start a delayed flush unless one is already pending.
+        
+        Args:
+            delay: Seconds to wait before flushing
+        """
+        task = self._status_flush_task
+        if task is None or task.done() or task is asyncio.current_task():
+            self._status_flush_task = asyncio.create_task(self._flush_statuses_later(delay))
+
+    async def _flush_statuses_later(self, delay: float) -> None:
+        """Write buffered task statuses after a delay."""
+        await asyncio.sleep(delay)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush task statuses: {e}")
+
+    async def flush(self) -> None:
+        """
+        Write all buffered task completions and failures.
+        
+        The buffered statuses are written with a single UPDATE whose CASE
+        expressions pick each task's values. Call before shutdown so no
+        statuses are lost.
+        """
+        async with self._status_flush_lock:
+            if not self._status_buffer:
+                return
+            
+            entries, self._status_buffer = self._status_buffer, {}
+            
+            status_cases = []
+            result_cases = []
+            error_cases = []
+            status_params: List[Any] = []
+            result_params: List[Any] = []
+            error_params: List[Any] = []
+            for task_id, (status, result, error_message) in entries.items():
+                status_cases.append("WHEN %s THEN %s")
+                status_params.extend((task_id, status.value))
+                if result is not None:
+                    result_cases.append("WHEN %s THEN CAST(%s AS JSON)")
+                    result_params.extend((task_id, result))
+                if error_message is not None:
+                    error_cases.append("WHEN %s THEN %s")
+                    error_params.extend((task_id, error_message))
+            
+            set_clauses = [f"status = CASE task_id {' '.join(status_cases)} END"]
+            if result_cases:
+                set_clauses.append(f"result = CASE task_id {' '.join(result_cases)} ELSE result END")
+            if error_cases:
+                set_clauses.append(
+                    f"error_message = CASE task_id {' '.join(error_cases)} ELSE error_message END"
+                )
+            set_clauses.append("completed_at = NOW()")
+            
+            query = f"""
+            UPDATE agent_tasks 
+            SET {', '.join(set_clauses)}
+            WHERE task_id IN ({', '.join(['%s'] * len(entries))})
+            """
+            params = (*status_params, *result_params, *error_params, *entries)
+            
+            try:
+                await self.comm_service._execute_query(query, params)
+            except Exception as e:
+                # Keep the statuses for the next flush unless newer ones
+                # were buffered meanwhile
+                for task_id, entry in entries.items():
+                    self._status_buffer.setdefault(task_id, entry)
+                logger.error(f"Failed to write {len(entries)} task statuses: {e}")
+                # Retry with exponential backoff so the statuses don't wait
+                # for the next buffered one
+                self._status_flush_failures += 1
+                self._schedule_status_flush(min(
+                    self.status_flush_interval * 2 ** self._status_flush_failures,
+                    self.status_flush_max_delay
+                ))
+                raise
+            
+            self._status_flush_failures = 0
+            logger.debug(f"Task statuses written: {len(entries)}")
+
     async def cancel_task(self, task_id: str, reason: Optional[str] = None) -> bool:
         """
         Cancel a pending task.
@@ -496,19 +805,18 @@ class TaskQueueManager:
         processed_count = 0
         start_time = datetime.now()
         
-        try:
-            while processed_count < batch_size:
-                # Check timeout
+        # Tasks of a batch are independent, so up to max_concurrency of
+        # them are processed at a time
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        timed_out: List[str] = []
+        
+        async def run(task: AgentTask) -> Optional[BatchResult]:
+            async with semaphore:
+                # Check timeout; tasks not started in time go back to the queue
                 if (datetime.now() - start_time).total_seconds() > timeout_seconds:
-                    logger.warning(f"Batch processing timeout reached for {agent_name}")
-                    break
-                
-                # Dequeue next task
-                task = await self.dequeue_task(agent_name, task_types)
-                if not task:
-                    break  # No more tasks available
+                    timed_out.append(task.task_id)
+                    return None
                 
-                # Process task
                 task_start_time = datetime.now()
                 try:
                     # Check if we have a registered processor
@@ -520,23 +828,22 @@ class TaskQueueManager:
                         
                         await self.complete_task(task.task_id, result, processing_time)
                         
-                        results.append(BatchResult(
+                        return BatchResult(
                             task_id=task.task_id,
                             success=True,
                             result=result,
                             processing_time_ms=processing_time
-                        ))
-                        
-                    else:
-                        # No processor registered, fail the task
-                        error_msg = f"No processor registered for task type: {task.task_type}"
-                        await self.fail_task(task.task_id, error_msg, retry=False)
-                        
-                        results.append(BatchResult(
-                            task_id=task.task_id,
-                            success=False,
-                            error=error_msg
-                        ))
+                        )
+                    
+                    # No processor registered, fail the task
+                    error_msg = f"No processor registered for task type: {task.task_type}"
+                    await self.fail_task(task.task_id, error_msg, retry=False)
+                    
+                    return BatchResult(
+                        task_id=task.task_id,
+                        success=False,
+                        error=error_msg
+                    )
                 
                 except Exception as e:
                     processing_time = int((datetime.now() - task_start_time).total_seconds() * 1000)
@@ -544,14 +851,35 @@ class TaskQueueManager:
                     
                     await self.fail_task(task.task_id, error_msg)
                     
-                    results.append(BatchResult(
+                    return BatchResult(
                         task_id=task.task_id,
                         success=False,
                         error=error_msg,
                         processing_time_ms=processing_time
+                    )
+        
+        try:
+            # Claim the whole batch with one round of queries
+            tasks = await self.dequeue_tasks_batch(agent_name, batch_size, task_types)
+            
+            outcomes = await asyncio.gather(*(run(task) for task in tasks), return_exceptions=True)
+            
+            if timed_out:
+                logger.warning(f"Batch processing timeout reached for {agent_name}")
+                await self._release_tasks(timed_out)
+            
+            for task, outcome in zip(tasks, outcomes):
+                if isinstance(outcome, BaseException):
+                    # One task's failure must not discard the other results
+                    logger.error(f"Batch task {task.task_id} raised: {outcome}")
+                    results.append(BatchResult(
+                        task_id=task.task_id,
+                        success=False,
+                        error=f"Task processing error: {outcome}"
                     ))
-                
-                processed_count += 1
+                elif outcome is not None:
+                    results.append(outcome)
+            processed_count = len(results)
             
             # Log batch processing results
             successful = len([r for r in results if r.success])
@@ -718,6 +1046,15 @@ class TaskQueueManager:
         """
         cutoff_date = datetime.now() - timedelta(days=retention_days)
         
+        # Dependency rows of the cleaned tasks go first, while the tasks
+        # still identify them
+        dependencies_query = """
+        DELETE d FROM task_dependencies d
+        JOIN agent_tasks t ON t.task_id = d.task_id
+        WHERE t.status IN ('completed', 'failed') 
+        AND t.completed_at < %s
+        """
+        
         cleanup_query = """
         DELETE FROM agent_tasks 
         WHERE status IN ('completed', 'failed') 
@@ -725,12 +1062,12 @@ class TaskQueueManager:
         """
         
         try:
-            await self.comm_service._execute_query(cleanup_query, (cutoff_date,))
-            
-            # Get affected row count
-            count_query = "SELECT ROW_COUNT() as count"
-            result = await self.comm_service._execute_query(count_query, fetch=True, fetch_one=True)
-            cleaned_count = result["count"] if result else 0
+            await self.comm_service._execute_query(dependencies_query, (cutoff_date,))
+            # The count comes with the DELETE; a separate SELECT ROW_COUNT()
+            # may run on another pooled connection
+            cleaned_count = await self.comm_service._execute_query(
+                cleanup_query, (cutoff_date,), return_rowcount=True
+            )
             
             logger.info(f"Cleaned up {cleaned_count} old tasks (older than {retention_days} days)")
             return cleaned_count
@@ -750,17 +1087,13 @@ class TaskQueueManager:
             List of dependency task IDs
         """
         query = """
-        SELECT parameters FROM agent_tasks WHERE task_id = %s
+        SELECT depends_on FROM task_dependencies WHERE task_id = %s
         """
         
         try:
-            result = await self.comm_service._execute_query(query, (task_id,), fetch=True, fetch_one=True)
-            
-            if result and result["parameters"]:
-                parameters = json.loads(result["parameters"])
-                return parameters.get("_dependencies", [])
+            results = await self.comm_service._execute_query(query, (task_id,), fetch=True)
             
-            return []
+            return [row["depends_on"] for row in results] if results else []
             
         except Exception as e:
             logger.error(f"Failed to get task dependencies: {e}")
@@ -777,8 +1110,7 @@ class TaskQueueManager:
             List of dependent task IDs
         """
         query = """
-        SELECT task_id FROM agent_tasks 
-        WHERE JSON_SEARCH(parameters, 'one', %s, NULL, '$._dependencies[*]') IS NOT NULL
+        SELECT task_id FROM task_dependencies WHERE depends_on = %s
         """
         
         try:
@@ -6,22 +6,62 @@ It handles message passing, caching, session management, and task queuing using
 """
 
 import asyncio
-import json
 import logging
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 
 import mysql.connector
 from mysql.connector import Error as MySQLError
+from mysql.connector.constants import ClientFlag
 from mysql.connector.pooling import MySQLConnectionPool
 import mysql.connector.pooling
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from .serialization import decode_cache_value, dumps, encode_cache_value, loads
+
 logger = logging.getLogger(__name__)
 
+# Columns read into AgentMessage; polls select exactly these rather than m.*
+# so wider rows don't cost extra bytes on the wire or extra row decoding
+MESSAGE_COLUMNS = (
+    "m.id, m.channel, m.sender_agent, m.recipient_agent, m.message, m.priority, "
+    "m.created_at, m.processed, m.processed_at, m.processed_by"
+)
+
+# Characters of a turn's text kept for full-text search (fits TEXT in utf8mb4)
+TURN_TEXT_MAX_CHARS = 16000
+
+# Prepared statements kept open per pooled connection; the least recently
+# used is closed beyond this
+MAX_PREPARED_STATEMENTS = 64
+
+
+def _turn_text(content: Any) -> str:
+    """
+    Flatten the string values of a turn's content into searchable text.
+    
+    Args:
+        content: Decoded turn content
+        
+    Returns:
+        Space-separated strings, truncated to TURN_TEXT_MAX_CHARS
+    """
+    parts = []
+    stack = [content]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, dict):
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, (list, tuple)):
+            stack.extend(reversed(value))
+    return " ".join(parts)[:TURN_TEXT_MAX_CHARS]
+
 
 class TaskStatus(Enum):
     """Task status enumeration."""
@@ -40,7 +80,7 @@ class MessageCallback:
         pass
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentMessage:
     """Agent message data structure."""
     id: Optional[int] = None
@@ -130,6 +170,7 @@ class TiDBCommunicationService:
         pool_name: str = "agent_pool",
         pool_size: int = 10,
         ssl_disabled: bool = False,
+        scan_pool_size: int = 2,
     ):
         """
         Initialize TiDB communication service.
@@ -143,6 +184,9 @@ class TiDBCommunicationService:
             pool_name: Connection pool name
             pool_size: Maximum connections in pool
             ssl_disabled: Whether to disable SSL
+            scan_pool_size: Connections in the separate pool used for large
+                            scans and admin queries, so they can't hold up
+                            latency-sensitive lookups
         """
         self.config = {
             "host": host,
@@ -154,6 +198,12 @@ class TiDBCommunicationService:
             "charset": "utf8mb4",
             "use_unicode": True,
             "sql_mode": "STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO",
+            # Use the C extension for protocol parsing; mysql-connector falls
+            # back to the pure Python implementation if it isn't available
+            "use_pure": False,
+            # UPDATE row counts report matched rather than changed rows, so
+            # an update that leaves a row as it was still counts it as found
+            "client_flags": [ClientFlag.FOUND_ROWS],
         }
         
         if ssl_disabled:
@@ -162,6 +212,18 @@ class TiDBCommunicationService:
         self.pool_name = pool_name
         self.pool_size = pool_size
         self.pool: Optional[MySQLConnectionPool] = None
+        self.scan_pool_size = scan_pool_size
+        self.scan_pool: Optional[MySQLConnectionPool] = None
+        
+        # Operation logs are buffered and written with multi-row inserts
+        self.log_flush_size = 100
+        self.log_flush_interval = 0.5  # seconds
+        self._log_buffer: List[tuple] = []
+        self._log_flush_task: Optional[asyncio.Task] = None
+        
+        # Long-poll waiters per channel, resolved when a message is sent to
+        # the channel through this service
+        self._channel_waiters: Dict[str, set] = {}
         
         # Initialize connection pool
         self._initialize_pool()
@@ -172,19 +234,79 @@ class TiDBCommunicationService:
             self.pool = mysql.connector.pooling.MySQLConnectionPool(
                 pool_name=self.pool_name,
                 pool_size=self.pool_size,
-                pool_reset_session=True,
+                # Session reset would deallocate the server-side prepared
+                # statements cached on each pooled connection
+                pool_reset_session=False,
+                **self.config
+            )
+            self.scan_pool = mysql.connector.pooling.MySQLConnectionPool(
+                pool_name=f"{self.pool_name}_scan",
+                pool_size=self.scan_pool_size,
+                pool_reset_session=False,
                 **self.config
             )
             logger.info(f"Initialized TiDB connection pool '{self.pool_name}' with {self.pool_size} connections")
+            if not mysql.connector.HAVE_CEXT:
+                logger.warning("mysql-connector C extension not available; using pure Python driver")
         except MySQLError as e:
             logger.error(f"Failed to initialize TiDB connection pool: {e}")
             raise
 
-    def _get_connection(self):
-        """Get connection from pool."""
-        if not self.pool:
+    def _get_connection(self, pool: str = "default"):
+        """
+        Get connection from pool.
+        
+        Args:
+            pool: "default" for latency-sensitive queries, "scan" for large
+                  result sets and admin queries
+        """
+        target = self.scan_pool if pool == "scan" else self.pool
+        if not target:
             raise RuntimeError("Connection pool not initialized")
-        return self.pool.get_connection()
+        return target.get_connection()
+
+    @staticmethod
+    def _prepared_cursor(connection, query: str):
+        """
+        Get a prepared-statement cursor for a query on a pooled connection.
+        
+        Cursors are cached on the underlying connection, so each statement
+        is prepared once per connection and later calls only send EXECUTE
+        with the bound parameters, letting TiDB reuse its cached plan. At
+        most MAX_PREPARED_STATEMENTS stay prepared per connection.
+        
+        Args:
+            connection: Pooled connection
+            query: SQL query
+            
+        Returns:
+            Prepared dictionary cursor for the query
+        """
+        cnx = getattr(connection, "_cnx", connection)
+        cursors = cnx.__dict__.setdefault("_prepared_cursors", OrderedDict())
+        cursor = cursors.get(query)
+        if cursor is None:
+            if len(cursors) >= MAX_PREPARED_STATEMENTS:
+                _, evicted = cursors.popitem(last=False)
+                try:
+                    evicted.close()
+                except MySQLError:
+                    pass
+            cursor = connection.cursor(prepared=True, dictionary=True)
+            cursors[query] = cursor
+        else:
+            cursors.move_to_end(query)
+        return cursor
+
+    @staticmethod
+    def _discard_prepared_cursors(connection) -> None:
+        """Drop the prepared cursors cached on a connection."""
+        cnx = getattr(connection, "_cnx", connection)
+        for cursor in cnx.__dict__.pop("_prepared_cursors", {}).values():
+            try:
+                cursor.close()
+            except MySQLError:
+                pass
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def _execute_query(
@@ -192,8 +314,12 @@ class TiDBCommunicationService:
         query: str, 
         params: Optional[tuple] = None, 
         fetch: bool = False,
-        fetch_one: bool = False
-    ) -> Optional[Union[List[tuple], tuple]]:
+        fetch_one: bool = False,
+        return_rowcount: bool = False,
+        prepared: bool = False,
+        pool: str = "default",
+        return_lastrowid: bool = False
+    ) -> Optional[Union[List[tuple], tuple, int]]:
         """
         Execute database query with retry logic.
         
@@ -202,16 +328,28 @@ class TiDBCommunicationService:
             params: Query parameters
             fetch: Whether to fetch results
             fetch_one: Whether to fetch only one result
+            return_rowcount: Whether to return the number of affected rows
+                             (matched rows for UPDATE)
+            prepared: Whether to run the query as a server-side prepared
+                      statement, prepared once per pooled connection
+            pool: Connection pool to run on ("default" or "scan")
+            return_lastrowid: Whether to return the first AUTO_INCREMENT id
+                              generated by the statement
             
         Returns:
-            Query results if fetch=True, None otherwise
+            Query results if fetch=True, affected row count if
+            return_rowcount=True, generated id if return_lastrowid=True,
+            None otherwise
         """
         connection = None
         cursor = None
         
         try:
-            connection = self._get_connection()
-            cursor = connection.cursor(dictionary=True)
+            connection = self._get_connection(pool)
+            if prepared:
+                cursor = self._prepared_cursor(connection, query)
+            else:
+                cursor = connection.cursor(dictionary=True)
             
             # Log query execution
             start_time = datetime.now()
@@ -225,12 +363,23 @@ class TiDBCommunicationService:
             
             result = None
             if fetch:
-                if fetch_one:
+                if fetch_one and prepared:
+                    # Drain the result so the cached cursor can be reused
+                    rows = cursor.fetchall()
+                    result = rows[0] if rows else None
+                elif fetch_one:
                     result = cursor.fetchone()
                 else:
                     result = cursor.fetchall()
             
-            connection.commit()
+            elif return_rowcount:
+                result = cursor.rowcount
+            
+            elif return_lastrowid:
+                result = cursor.lastrowid
+            
+            # Connections run with autocommit, so no COMMIT round trip is
+            # needed; it would double the socket writes and reads per query
             
             # Log successful operation
             await self._log_operation(
@@ -252,6 +401,10 @@ class TiDBCommunicationService:
             logger.error(f"Query: {query}")
             logger.error(f"Params: {params}")
             
+            if prepared and connection:
+                self._discard_prepared_cursors(connection)
+                cursor = None
+            
             # Log failed operation
             await self._log_operation(
                 agent_name="system",
@@ -266,7 +419,7 @@ class TiDBCommunicationService:
             
             raise
         finally:
-            if cursor:
+            if cursor and not prepared:
                 cursor.close()
             if connection:
                 connection.close()
@@ -302,12 +455,13 @@ class TiDBCommunicationService:
             channel,
             sender_agent,
             recipient_agent,
-            json.dumps(message),
+            dumps(message),
             priority
         )
         
         try:
             await self._execute_query(query, params)
+            self._wake_channels((channel,))
             
             # Get the inserted message ID
             id_query = "SELECT LAST_INSERT_ID() as id"
@@ -351,7 +505,8 @@ class TiDBCommunicationService:
         channel: str, 
         agent_name: str,
         limit: int = 10,
-        include_processed: bool = False
+        include_processed: bool = False,
+        wait_ms: int = 0
     ) -> List[AgentMessage]:
         """
         Poll messages from a channel for a specific agent.
@@ -361,13 +516,15 @@ class TiDBCommunicationService:
             agent_name: Agent name for filtering
             limit: Maximum messages to retrieve
             include_processed: Whether to include already processed messages
+            wait_ms: If nothing is pending, wait up to this long for a message
+                     to be sent to the channel and poll once more
             
         Returns:
             List of agent messages
         """
         # Build query based on subscription type
-        base_query = """
-        SELECT m.* FROM agent_messages m
+        base_query = f"""
+        SELECT {MESSAGE_COLUMNS} FROM agent_messages m
         WHERE m.channel = %s
         AND (m.recipient_agent IS NULL OR m.recipient_agent = %s)
         """
@@ -383,22 +540,7 @@ class TiDBCommunicationService:
         try:
             results = await self._execute_query(base_query, tuple(params), fetch=True)
             
-            messages = []
-            if results:
-                for row in results:
-                    message = AgentMessage(
-                        id=row["id"],
-                        channel=row["channel"],
-                        sender_agent=row["sender_agent"],
-                        recipient_agent=row["recipient_agent"],
-                        message=json.loads(row["message"]) if row["message"] else {},
-                        priority=row["priority"],
-                        created_at=row["created_at"],
-                        processed=row["processed"],
-                        processed_at=row["processed_at"],
-                        processed_by=row["processed_by"]
-                    )
-                    messages.append(message)
+            messages = [self._message_from_row(row) for row in results or ()]
             
             # Log operation
             await self._log_operation(
@@ -413,7 +555,6 @@ class TiDBCommunicationService:
             )
             
             logger.debug(f"Polled {len(messages)} messages for {agent_name} from {channel}")
-            return messages
             
         except Exception as e:
             logger.error(f"Failed to poll messages: {e}")
@@ -428,6 +569,188 @@ class TiDBCommunicationService:
                 error_message=str(e)
             )
             raise
+        
+        if not messages and wait_ms > 0 and await self.wait_for_messages([channel], wait_ms / 1000):
+            return await self.poll_messages(channel, agent_name, limit, include_processed)
+        return messages
+
+    async def send_messages(self, messages: List[Dict[str, Any]]) -> List[str]:
+        """
+        Send several messages with a single multi-row INSERT.
+        
+        Args:
+            messages: Messages to send
+                     Each entry should have: channel, sender_agent, message,
+                     recipient_agent (optional), priority (optional)
+            
+        Returns:
+            Message IDs, in the order the messages were given
+        """
+        if not messages:
+            return []
+        
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(messages))
+        query = f"""
+        INSERT INTO agent_messages (channel, sender_agent, recipient_agent, message, priority)
+        VALUES {placeholders}
+        """
+        
+        params = []
+        for entry in messages:
+            params.extend((
+                entry["channel"],
+                entry["sender_agent"],
+                entry.get("recipient_agent"),
+                dumps(entry.get("message") or {}),
+                entry.get("priority", 5)
+            ))
+        
+        try:
+            # TiDB allocates consecutive AUTO_INCREMENT ids within a single
+            # INSERT, so the ids follow from the first one
+            first_id = await self._execute_query(
+                query, tuple(params), return_lastrowid=True
+            )
+            message_ids = [str(first_id + offset) for offset in range(len(messages))]
+            self._wake_channels({entry["channel"] for entry in messages})
+            
+            await self._log_operation(
+                agent_name=messages[0]["sender_agent"],
+                operation_type="send_messages",
+                operation_data={
+                    "message_count": len(messages),
+                    "channels": sorted({entry["channel"] for entry in messages})
+                },
+                success=True
+            )
+            
+            logger.debug(f"Sent {len(messages)} messages in one batch")
+            return message_ids
+            
+        except Exception as e:
+            logger.error(f"Failed to send messages: {e}")
+            raise
+
+    async def poll_messages_multi(
+        self,
+        channels: List[str],
+        agent_name: str,
+        limit: int = 10,
+        include_processed: bool = False,
+        wait_ms: int = 0
+    ) -> List[AgentMessage]:
+        """
+        Poll messages from several channels with a single query.
+        
+        Args:
+            channels: Channels to poll
+            agent_name: Agent name for filtering
+            limit: Maximum messages to retrieve across all channels
+            include_processed: Whether to include already processed messages
+            wait_ms: If nothing is pending, wait up to this long for a message
+                     to be sent to one of the channels and poll once more
+            
+        Returns:
+            List of agent messages, highest priority first
+        """
+        if not channels:
+            return []
+        
+        placeholders = ", ".join(["%s"] * len(channels))
+        query = f"""
+        SELECT {MESSAGE_COLUMNS} FROM agent_messages m
+        WHERE m.channel IN ({placeholders})
+        AND (m.recipient_agent IS NULL OR m.recipient_agent = %s)
+        """
+        
+        if not include_processed:
+            query += " AND m.processed = FALSE"
+        
+        query += " ORDER BY m.priority ASC, m.created_at ASC LIMIT %s"
+        params = (*channels, agent_name, limit)
+        
+        try:
+            # An agent's channel list rarely changes, so the statement shape
+            # is stable enough to prepare
+            results = await self._execute_query(query, params, fetch=True, prepared=True)
+            messages = [self._message_from_row(row) for row in results or ()]
+            
+            await self._log_operation(
+                agent_name=agent_name,
+                operation_type="receive_message",
+                operation_data={
+                    "channels": channels,
+                    "messages_retrieved": len(messages),
+                    "include_processed": include_processed
+                },
+                success=True
+            )
+            
+            logger.debug(f"Polled {len(messages)} messages for {agent_name} from {len(channels)} channels")
+            
+        except Exception as e:
+            logger.error(f"Failed to poll messages: {e}")
+            raise
+        
+        if not messages and wait_ms > 0 and await self.wait_for_messages(channels, wait_ms / 1000):
+            return await self.poll_messages_multi(channels, agent_name, limit, include_processed)
+        return messages
+
+    async def wait_for_messages(self, channels: List[str], timeout: float) -> bool:
+        """
+        Wait for a message to be sent to any of the channels.
+        
+        Only sends made through this service instance wake the waiter, which
+        covers agents sharing a hub; messages written by other processes are
+        picked up when the wait times out and the caller polls again. No
+        connection is held while waiting.
+        
+        Args:
+            channels: Channels to watch
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            True if a message was sent, False on timeout
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        for channel in channels:
+            self._channel_waiters.setdefault(channel, set()).add(waiter)
+        
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            for channel in channels:
+                waiters = self._channel_waiters.get(channel)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._channel_waiters[channel]
+
+    def _wake_channels(self, channels) -> None:
+        """Resolve the long-poll waiters of the channels."""
+        for channel in channels:
+            for waiter in self._channel_waiters.pop(channel, ()):
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    @staticmethod
+    def _message_from_row(row: Dict[str, Any]) -> AgentMessage:
+        """Build an AgentMessage from an agent_messages row."""
+        return AgentMessage(
+            id=row["id"],
+            channel=row["channel"],
+            sender_agent=row["sender_agent"],
+            recipient_agent=row["recipient_agent"],
+            message=loads(row["message"]) if row["message"] else {},
+            priority=row["priority"],
+            created_at=row["created_at"],
+            processed=row["processed"],
+            processed_at=row["processed_at"],
+            processed_by=row["processed_by"]
+        )
 
     async def mark_message_processed(
         self, 
@@ -448,13 +771,53 @@ class TiDBCommunicationService:
         """
         
         try:
-            await self._execute_query(query, (processed_by, message_id))
+            await self._execute_query(query, (processed_by, message_id), prepared=True)
             logger.debug(f"Message {message_id} marked as processed by {processed_by}")
             
         except Exception as e:
             logger.error(f"Failed to mark message as processed: {e}")
             raise
 
+    async def mark_messages_processed_bulk(
+        self,
+        message_ids: List[int],
+        processed_by: str
+    ) -> int:
+        """
+        Mark several messages as processed with a single UPDATE.
+
+        Args:
+            message_ids: Message IDs to mark as processed
+            processed_by: Agent that processed the messages
+
+        Returns:
+            Number of messages that were newly marked
+        """
+        if not message_ids:
+            return 0
+
+        # Pad the id list to the next power of two by repeating the last id,
+        # so only a handful of statement shapes get prepared per connection
+        padded = list(message_ids)
+        padded += padded[-1:] * ((1 << (len(padded) - 1).bit_length()) - len(padded))
+        placeholders = ", ".join(["%s"] * len(padded))
+        query = f"""
+        UPDATE agent_messages
+        SET processed = TRUE, processed_at = NOW(), processed_by = %s
+        WHERE id IN ({placeholders}) AND processed = FALSE
+        """
+
+        try:
+            updated = await self._execute_query(
+                query, (processed_by, *padded), return_rowcount=True, prepared=True
+            )
+            logger.debug(f"{updated} messages marked as processed by {processed_by}")
+            return updated
+
+        except Exception as e:
+            logger.error(f"Failed to mark messages as processed: {e}")
+            raise
+
     async def get_unprocessed_message_count(self, channel: str, agent_name: str) -> int:
         """
         Get count of unprocessed messages for an agent in a channel.
@@ -493,6 +856,9 @@ class TiDBCommunicationService:
         """
         Log agent communication operation.
         
+        The entry is buffered and written in bulk once log_flush_size entries
+        are pending or log_flush_interval seconds have passed.
+        
         Args:
             agent_name: Agent performing the operation
             operation_type: Type of operation
@@ -501,42 +867,65 @@ class TiDBCommunicationService:
             success: Whether operation succeeded
             error_message: Error message if failed
         """
-        query = """
-        INSERT INTO agent_communication_logs 
-        (agent_name, operation_type, operation_data, execution_time_ms, success, error_message)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        
-        params = (
+        self._log_buffer.append((
             agent_name,
             operation_type,
-            json.dumps(operation_data),
+            dumps(operation_data),
             execution_time_ms,
             success,
             error_message
-        )
+        ))
+        
+        if len(self._log_buffer) >= self.log_flush_size:
+            await self._flush_operation_logs()
+        elif self._log_flush_task is None or self._log_flush_task.done():
+            self._log_flush_task = asyncio.create_task(self._flush_operation_logs_later())
+
+    async def _flush_operation_logs_later(self) -> None:
+        """Flush buffered operation logs after the flush interval."""
+        await asyncio.sleep(self.log_flush_interval)
+        await self._flush_operation_logs()
+
+    async def _flush_operation_logs(self) -> None:
+        """Write all buffered operation logs in a single INSERT."""
+        if not self._log_buffer or not self.pool:
+            return
+        
+        entries, self._log_buffer = self._log_buffer, []
+        
+        query = f"""
+        INSERT INTO agent_communication_logs 
+        (agent_name, operation_type, operation_data, execution_time_ms, success, error_message)
+        VALUES {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(entries))}
+        """
+        
+        params = tuple(value for entry in entries for value in entry)
         
         try:
             # Use a separate connection to avoid recursion in logging
             connection = self._get_connection()
             cursor = connection.cursor()
             cursor.execute(query, params)
-            connection.commit()
             cursor.close()
             connection.close()
             
         except Exception as e:
             # Don't raise exceptions from logging to avoid infinite loops
-            logger.warning(f"Failed to log operation: {e}")
+            logger.warning(f"Failed to log {len(entries)} operations: {e}")
 
     async def close(self) -> None:
         """Close all connections and cleanup resources."""
+        if self._log_flush_task and not self._log_flush_task.done():
+            self._log_flush_task.cancel()
+        await self._flush_operation_logs()
+        
         if self.pool:
             # Close all connections in the pool
             try:
                 # Note: mysql-connector-python doesn't have a direct way to close all pool connections
                 # The connections will be closed when the pool is garbage collected
                 self.pool = None
+                self.scan_pool = None
                 logger.info("TiDB connection pool closed")
             except Exception as e:
                 logger.error(f"Error closing connection pool: {e}")
@@ -604,7 +993,7 @@ class TiDBCommunicationService:
         params = (
             key,
             agent_name,
-            json.dumps(result),
+            encode_cache_value(result),
             result_type,
             expires_at
         )
@@ -659,7 +1048,9 @@ class TiDBCommunicationService:
         """
         
         try:
-            result = await self._execute_query(query, (key,), fetch=True, fetch_one=True)
+            result = await self._execute_query(
+                query, (key,), fetch=True, fetch_one=True, prepared=True
+            )
             
             if result:
                 # Update access tracking
@@ -668,9 +1059,9 @@ class TiDBCommunicationService:
                 SET access_count = access_count + 1, last_accessed = NOW()
                 WHERE cache_key = %s
                 """
-                await self._execute_query(update_query, (key,))
+                await self._execute_query(update_query, (key,), prepared=True)
                 
-                cached_data = json.loads(result["result"]) if result["result"] else None
+                cached_data = decode_cache_value(result["result"])
                 
                 # Log operation
                 await self._log_operation(
@@ -716,6 +1107,150 @@ class TiDBCommunicationService:
             )
             raise
 
+    async def set_cache_many(
+        self,
+        entries: List[Dict[str, Any]],
+        agent_name: str,
+        chunk_size: int = 500
+    ) -> int:
+        """
+        Store multiple results in cache using multi-row inserts.
+        
+        Args:
+            entries: Entries to store, each with key, result, ttl_seconds
+                     and optional result_type
+            agent_name: Agent storing the cache
+            chunk_size: Maximum rows per INSERT statement
+            
+        Returns:
+            Number of entries written
+        """
+        written = 0
+        now = datetime.now()
+        
+        for start in range(0, len(entries), chunk_size):
+            chunk = entries[start:start + chunk_size]
+            
+            query = f"""
+            INSERT INTO agent_cache (cache_key, agent_name, result, result_type, expires_at)
+            VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(chunk))}
+            ON DUPLICATE KEY UPDATE
+            result = VALUES(result),
+            result_type = VALUES(result_type),
+            expires_at = VALUES(expires_at),
+            access_count = access_count + 1,
+            last_accessed = NOW()
+            """
+            
+            params = []
+            for entry in chunk:
+                params.extend((
+                    entry["key"],
+                    agent_name,
+                    encode_cache_value(entry["result"]),
+                    entry.get("result_type"),
+                    now + timedelta(seconds=entry["ttl_seconds"])
+                ))
+            
+            try:
+                await self._execute_query(query, tuple(params))
+                written += len(chunk)
+                
+                await self._log_operation(
+                    agent_name=agent_name,
+                    operation_type="cache_set_many",
+                    operation_data={"entry_count": len(chunk)},
+                    success=True
+                )
+                
+            except Exception as e:
+                logger.error(f"Failed to set cache batch: {e}")
+                await self._log_operation(
+                    agent_name=agent_name,
+                    operation_type="cache_set_many",
+                    operation_data={
+                        "entry_count": len(chunk),
+                        "error": str(e)
+                    },
+                    success=False,
+                    error_message=str(e)
+                )
+                raise
+        
+        logger.debug(f"Cache set: {written} entries by {agent_name}")
+        return written
+
+    async def get_cache_many(
+        self,
+        keys: List[str],
+        agent_name: str,
+        chunk_size: int = 500
+    ) -> Dict[str, Any]:
+        """
+        Retrieve multiple results from cache with one query per chunk.
+        
+        Args:
+            keys: Cache keys
+            agent_name: Agent requesting the cache
+            chunk_size: Maximum keys per SELECT statement
+            
+        Returns:
+            Mapping of found (unexpired) keys to their cached results
+        """
+        found: Dict[str, Any] = {}
+        
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            
+            query = f"""
+            SELECT cache_key, result FROM agent_cache
+            WHERE cache_key IN ({placeholders}) AND expires_at > NOW()
+            """
+            
+            try:
+                results = await self._execute_query(query, tuple(chunk), fetch=True)
+                
+                hit_keys = []
+                for row in results or []:
+                    found[row["cache_key"]] = decode_cache_value(row["result"])
+                    hit_keys.append(row["cache_key"])
+                
+                if hit_keys:
+                    update_query = f"""
+                    UPDATE agent_cache 
+                    SET access_count = access_count + 1, last_accessed = NOW()
+                    WHERE cache_key IN ({', '.join(['%s'] * len(hit_keys))})
+                    """
+                    await self._execute_query(update_query, tuple(hit_keys))
+                
+                await self._log_operation(
+                    agent_name=agent_name,
+                    operation_type="cache_get_many",
+                    operation_data={
+                        "requested": len(chunk),
+                        "hits": len(hit_keys)
+                    },
+                    success=True
+                )
+                
+            except Exception as e:
+                logger.error(f"Failed to get cache batch: {e}")
+                await self._log_operation(
+                    agent_name=agent_name,
+                    operation_type="cache_get_many",
+                    operation_data={
+                        "requested": len(chunk),
+                        "error": str(e)
+                    },
+                    success=False,
+                    error_message=str(e)
+                )
+                raise
+        
+        logger.debug(f"Cache get: {len(found)}/{len(keys)} hits for {agent_name}")
+        return found
+
     async def invalidate_cache(self, pattern: str, agent_name: str) -> int:
         """
         Invalidate cache entries matching a pattern.
@@ -727,15 +1262,13 @@ class TiDBCommunicationService:
         Returns:
             Number of invalidated entries
         """
-        query = "DELETE FROM agent_cache WHERE cache_key LIKE %s"
+        predicate, predicate_params = self._cache_key_predicate(pattern)
+        query = f"DELETE FROM agent_cache WHERE {predicate}"
         
         try:
-            await self._execute_query(query, (pattern,))
-            
-            # Get affected row count
-            count_query = "SELECT ROW_COUNT() as count"
-            result = await self._execute_query(count_query, fetch=True, fetch_one=True)
-            invalidated_count = result["count"] if result else 0
+            invalidated_count = await self._execute_query(
+                query, predicate_params, return_rowcount=True
+            )
             
             # Log operation
             await self._log_operation(
@@ -765,6 +1298,51 @@ class TiDBCommunicationService:
             )
             raise
 
+    @staticmethod
+    def _cache_key_predicate(pattern: str) -> Tuple[str, tuple]:
+        """
+        Build an index-friendly WHERE predicate for a cache key LIKE pattern.
+        
+        Patterns without wildcards become an equality match and patterns with
+        a literal prefix become a range scan on cache_key, with LIKE kept only
+        as a residual filter when wildcards follow the prefix. Range bounds
+        assume keys don't contain characters above U+FFFF after the prefix.
+        
+        Args:
+            pattern: Cache key pattern (SQL LIKE syntax)
+            
+        Returns:
+            Tuple of (SQL predicate, parameters)
+        """
+        prefix = []
+        rest = ""
+        escaped = False
+        for index, char in enumerate(pattern):
+            if escaped:
+                prefix.append(char)
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char in "%_":
+                rest = pattern[index:]
+                break
+            else:
+                prefix.append(char)
+        prefix = "".join(prefix)
+        
+        if not rest:
+            return "cache_key = %s", (prefix,)
+        if not prefix:
+            return "cache_key LIKE %s", (pattern,)
+        
+        upper = prefix + "\uffff"
+        if rest.strip("%") == "":
+            return "cache_key >= %s AND cache_key < %s", (prefix, upper)
+        return (
+            "cache_key >= %s AND cache_key < %s AND cache_key LIKE %s",
+            (prefix, upper, pattern)
+        )
+
     async def cleanup_expired_cache(self) -> int:
         """
         Clean up expired cache entries.
@@ -775,12 +1353,7 @@ class TiDBCommunicationService:
         query = "DELETE FROM agent_cache WHERE expires_at <= NOW()"
         
         try:
-            await self._execute_query(query)
-            
-            # Get affected row count
-            count_query = "SELECT ROW_COUNT() as count"
-            result = await self._execute_query(count_query, fetch=True, fetch_one=True)
-            cleaned_count = result["count"] if result else 0
+            cleaned_count = await self._execute_query(query, return_rowcount=True)
             
             logger.debug(f"Cleaned up {cleaned_count} expired cache entries")
             return cleaned_count
@@ -812,10 +1385,10 @@ class TiDBCommunicationService:
         params = (
             session_data.session_id,
             session_data.user_id,
-            json.dumps(session_data.agents_involved),
-            json.dumps(session_data.session_state),
-            json.dumps(session_data.conversation_history),
-            json.dumps(session_data.metadata),
+            dumps(session_data.agents_involved),
+            dumps(session_data.session_state),
+            dumps(session_data.conversation_history),
+            dumps(session_data.metadata),
             session_data.status
         )
         
@@ -833,13 +1406,18 @@ class TiDBCommunicationService:
         self, 
         session_id: str, 
         updates: Dict[str, Any]
-    ) -> None:
+    ) -> int:
         """
         Update an existing session.
         
         Args:
             session_id: Session ID to update
-            updates: Fields to update
+            updates: Fields to update; "session_state_updates" and
+                     "metadata_updates" set individual top-level keys of
+                     those columns in place instead of replacing them
+            
+        Returns:
+            Number of sessions updated (0 if the session doesn't exist)
         """
         # Build dynamic update query
         set_clauses = []
@@ -848,7 +1426,11 @@ class TiDBCommunicationService:
         for field, value in updates.items():
             if field in ["agents_involved", "session_state", "conversation_history", "metadata"]:
                 set_clauses.append(f"{field} = %s")
-                params.append(json.dumps(value))
+                params.append(dumps(value))
+            elif field in ["session_state_updates", "metadata_updates"]:
+                clause, clause_params = self._json_set_clause(field[:-len("_updates")], value)
+                set_clauses.append(clause)
+                params.extend(clause_params)
             elif field in ["status", "user_id"]:
                 set_clauses.append(f"{field} = %s")
                 params.append(value)
@@ -856,7 +1438,7 @@ class TiDBCommunicationService:
                 set_clauses.append("completed_at = NOW()")
         
         if not set_clauses:
-            return
+            return 0
         
         set_clauses.append("updated_at = NOW()")
         params.append(session_id)
@@ -868,13 +1450,54 @@ class TiDBCommunicationService:
         """
         
         try:
-            await self._execute_query(query, tuple(params))
+            updated = await self._execute_query(query, tuple(params), return_rowcount=True, prepared=True)
             logger.debug(f"Session updated: {session_id}")
+            return updated
             
         except Exception as e:
             logger.error(f"Failed to update session: {e}")
             raise
 
+    async def merge_session_state(
+        self,
+        session_id: str,
+        state_updates: Dict[str, Any]
+    ) -> int:
+        """
+        Merge top-level keys into a session's state in place.
+        
+        Only the changed keys are sent; TiDB sets them on the stored state
+        in the same statement, so there is no read-modify-write round trip
+        and concurrent merges of different keys don't overwrite each other.
+        
+        Args:
+            session_id: Session ID
+            state_updates: Keys to set, with the same semantics as dict.update
+            
+        Returns:
+            Number of sessions updated (0 if the session doesn't exist)
+        """
+        return await self.update_session(session_id, {"session_state_updates": state_updates})
+
+    @staticmethod
+    def _json_set_clause(column: str, updates: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """
+        Build a SET clause that sets top-level keys of a JSON object column.
+        
+        Args:
+            column: JSON column name
+            updates: Keys and values to set
+            
+        Returns:
+            SET clause and its parameters
+        """
+        expr = f"COALESCE({column}, JSON_OBJECT())"
+        if updates:
+            paths = ", ".join(["CONCAT('$.', JSON_QUOTE(%s)), CAST(%s AS JSON)"] * len(updates))
+            expr = f"JSON_SET({expr}, {paths})"
+        params = [value for key, item in updates.items() for value in (key, dumps(item))]
+        return f"{column} = {expr}", params
+
     async def get_session(self, session_id: str) -> Optional[AgentSessionData]:
         """
         Retrieve session data.
@@ -890,17 +1513,17 @@ class TiDBCommunicationService:
         """
         
         try:
-            result = await self._execute_query(query, (session_id,), fetch=True, fetch_one=True)
+            result = await self._execute_query(query, (session_id,), fetch=True, fetch_one=True, prepared=True)
             
             if result:
                 return AgentSessionData(
                     id=result["id"],
                     session_id=result["session_id"],
                     user_id=result["user_id"],
-                    agents_involved=json.loads(result["agents_involved"]) if result["agents_involved"] else [],
-                    session_state=json.loads(result["session_state"]) if result["session_state"] else {},
-                    conversation_history=json.loads(result["conversation_history"]) if result["conversation_history"] else [],
-                    metadata=json.loads(result["metadata"]) if result["metadata"] else {},
+                    agents_involved=loads(result["agents_involved"]) if result["agents_involved"] else [],
+                    session_state=loads(result["session_state"]) if result["session_state"] else {},
+                    conversation_history=loads(result["conversation_history"]) if result["conversation_history"] else [],
+                    metadata=loads(result["metadata"]) if result["metadata"] else {},
                     status=result["status"],
                     created_at=result["created_at"],
                     updated_at=result["updated_at"],
@@ -939,10 +1562,10 @@ class TiDBCommunicationService:
                         id=row["id"],
                         session_id=row["session_id"],
                         user_id=row["user_id"],
-                        agents_involved=json.loads(row["agents_involved"]) if row["agents_involved"] else [],
-                        session_state=json.loads(row["session_state"]) if row["session_state"] else {},
-                        conversation_history=json.loads(row["conversation_history"]) if row["conversation_history"] else [],
-                        metadata=json.loads(row["metadata"]) if row["metadata"] else {},
+                        agents_involved=loads(row["agents_involved"]) if row["agents_involved"] else [],
+                        session_state=loads(row["session_state"]) if row["session_state"] else {},
+                        conversation_history=loads(row["conversation_history"]) if row["conversation_history"] else [],
+                        metadata=loads(row["metadata"]) if row["metadata"] else {},
                         status=row["status"],
                         created_at=row["created_at"],
                         updated_at=row["updated_at"],
@@ -954,7 +1577,373 @@ class TiDBCommunicationService:
             
         except Exception as e:
             logger.error(f"Failed to get active sessions for user: {e}")
-            raise 
+            raise
+
+    @staticmethod
+    def conversation_turn_row(
+        session_id: str,
+        agent_name: str,
+        message_type: str,
+        content: Dict[str, Any],
+        ts_ms: int,
+        processing_time_ms: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        is_error: bool = False
+    ) -> tuple:
+        """
+        Encode a conversation turn as agent_conversation_turns parameters.
+
+        Content and metadata are serialized here, once per turn, so writing
+        a batch only binds the prepared values.
+
+        Args:
+            session_id: Session ID
+            agent_name: Agent that generated the turn
+            message_type: Type of message
+            content: Message content
+            ts_ms: Time of the turn in UNIX epoch milliseconds
+            processing_time_ms: Processing time in milliseconds
+            metadata: Additional turn metadata
+            is_error: Whether the turn counts as an error in session metrics
+
+        Returns:
+            Row parameters for write_conversation_turns; is_error is last
+        """
+        return (
+            session_id,
+            agent_name,
+            message_type,
+            # JSON columns reject binary strings, so bind text rather than bytes
+            dumps(content),
+            ts_ms,
+            processing_time_ms,
+            dumps(metadata or {}),
+            _turn_text(content),
+            is_error
+        )
+
+    async def write_conversation_turns(
+        self,
+        rows: List[tuple],
+        metrics: Dict[str, Dict[str, Any]]
+    ) -> int:
+        """
+        Append conversation turns and fold them into session metrics.
+
+        The turns are written with a single multi-row INSERT and each
+        session's metrics row is upserted in the same transaction on one
+        connection, so either all of it is written or none of it is.
+
+        Args:
+            rows: Turns encoded with conversation_turn_row
+            metrics: _turn_metrics_statement arguments keyed by session ID
+
+        Returns:
+            Sequence number of the first turn; with AUTO_ID_CACHE 1 the rows
+            of one INSERT get consecutive sequence numbers
+        """
+        connection = None
+
+        try:
+            connection = self._get_connection()
+            connection.start_transaction()
+
+            query, params = self._conversation_turns_statement(rows)
+            cursor = self._prepared_cursor(connection, query)
+            cursor.execute(query, params)
+            first_seq = cursor.lastrowid
+            for session_id, deltas in metrics.items():
+                query, params = self._turn_metrics_statement(session_id, **deltas)
+                self._prepared_cursor(connection, query).execute(query, params)
+
+            connection.commit()
+            return first_seq
+
+        except Exception as e:
+            if connection:
+                connection.rollback()
+                self._discard_prepared_cursors(connection)
+
+            logger.error(f"Failed to write {len(rows)} conversation turns: {e}")
+            raise
+
+        finally:
+            if connection:
+                connection.close()
+
+    @staticmethod
+    def _conversation_turns_statement(rows: List[tuple]) -> Tuple[str, tuple]:
+        """
+        Build the multi-row INSERT of encoded conversation turns.
+
+        Args:
+            rows: Turns encoded with conversation_turn_row
+
+        Returns:
+            Query and parameters
+        """
+        query = f"""
+        INSERT INTO agent_conversation_turns
+        (session_id, agent_name, message_type, content, ts_ms, processing_time_ms, metadata, turn_text, is_error)
+        VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(rows))}
+        """
+
+        return query, tuple(value for row in rows for value in row)
+
+    @staticmethod
+    def _turn_metrics_statement(
+        session_id: str,
+        turn_count: int,
+        processing_time_ms_sum: int,
+        processing_samples: int,
+        first_ts_ms: int,
+        last_ts_ms: int,
+        error_count: int,
+        message_type_counts: Dict[str, int],
+        new_agents: List[str]
+    ) -> Tuple[str, tuple]:
+        """
+        Build the upsert folding new turns into a session's metrics row.
+
+        Args:
+            session_id: Session ID
+            turn_count: Number of new turns
+            processing_time_ms_sum: Sum of their measured processing times
+            processing_samples: Number of turns with a processing time
+            first_ts_ms: Time of the earliest new turn in epoch milliseconds
+            last_ts_ms: Time of the latest new turn in epoch milliseconds
+            error_count: Number of new turns reporting an error
+            message_type_counts: New turns per message type
+            new_agents: Agents that may not have been recorded for the
+                        session yet; recording a known agent is a no-op
+
+        Returns:
+            Query and parameters
+        """
+        type_paths = ",\n                ".join(
+            ["CONCAT('$.', JSON_QUOTE(%s)), "
+             "COALESCE(JSON_EXTRACT(message_type_counts, CONCAT('$.', JSON_QUOTE(%s))), 0) + %s"]
+            * len(message_type_counts)
+        )
+        agent_pairs = ", ".join(["%s, 1"] * len(new_agents))
+        agents_update = (
+            "agents_involved = JSON_SET(COALESCE(agents_involved, JSON_OBJECT()), "
+            + ", ".join(["CONCAT('$.', JSON_QUOTE(%s)), 1"] * len(new_agents))
+            + "),"
+            if new_agents else ""
+        )
+        query = f"""
+        INSERT INTO session_metrics
+        (session_id, total_turns, sum_processing_time_ms, count_processing_samples,
+         first_ts_ms, last_ts_ms, error_count, message_type_counts, agents_involved)
+        VALUES (%s, %s, %s, %s, %s, %s, %s,
+                JSON_OBJECT({', '.join(['%s, %s'] * len(message_type_counts))}),
+                JSON_OBJECT({agent_pairs}))
+        ON DUPLICATE KEY UPDATE
+            {agents_update}
+            total_turns = total_turns + VALUES(total_turns),
+            sum_processing_time_ms = sum_processing_time_ms + VALUES(sum_processing_time_ms),
+            count_processing_samples = count_processing_samples + VALUES(count_processing_samples),
+            last_ts_ms = VALUES(last_ts_ms),
+            error_count = error_count + VALUES(error_count),
+            message_type_counts = JSON_SET(
+                message_type_counts,
+                {type_paths}
+            )
+        """
+
+        params = (
+            session_id,
+            turn_count,
+            processing_time_ms_sum,
+            processing_samples,
+            first_ts_ms,
+            last_ts_ms,
+            error_count,
+            *(value for item in message_type_counts.items() for value in item),
+            *new_agents,
+            *new_agents,
+            *(
+                value
+                for message_type, count in message_type_counts.items()
+                for value in (message_type, message_type, count)
+            )
+        )
+
+        return query, params
+
+    async def get_session_metrics_row(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the running metrics row of a session.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            Metrics row with message_type_counts decoded and agents_involved
+            as a list of agent names, or None if the session has no row
+        """
+        query = """
+        SELECT total_turns, sum_processing_time_ms, count_processing_samples,
+               first_ts_ms, last_ts_ms, error_count, message_type_counts, agents_involved
+        FROM session_metrics WHERE session_id = %s
+        """
+
+        try:
+            result = await self._execute_query(query, (session_id,), fetch=True, fetch_one=True, prepared=True)
+            if result:
+                result["message_type_counts"] = loads(result["message_type_counts"])
+                result["agents_involved"] = (
+                    list(loads(result["agents_involved"])) if result["agents_involved"] else []
+                )
+            return result
+
+        except Exception as e:
+            logger.error(f"Failed to get session metrics row: {e}")
+            raise
+
+    async def aggregate_conversation_turn_metrics(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Aggregate a session's metrics from its conversation turns.
+
+        The counting is done by TiDB over the session's range of the
+        clustered key; only the totals are returned.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            Totals shaped like get_session_metrics_row, or None if the
+            session has no turns
+        """
+        query = """
+        SELECT COUNT(*) AS total_turns,
+               SUM(processing_time_ms) AS sum_processing_time_ms,
+               COUNT(processing_time_ms) AS count_processing_samples,
+               MIN(ts_ms) AS first_ts_ms,
+               MAX(ts_ms) AS last_ts_ms,
+               SUM(is_error) AS error_count,
+               (SELECT JSON_OBJECTAGG(message_type, turns)
+                FROM (SELECT message_type, COUNT(*) AS turns
+                      FROM agent_conversation_turns
+                      WHERE session_id = %s
+                      GROUP BY message_type) types) AS message_type_counts,
+               (SELECT JSON_ARRAYAGG(agent_name)
+                FROM (SELECT DISTINCT agent_name
+                      FROM agent_conversation_turns
+                      WHERE session_id = %s) agents) AS agents_involved
+        FROM agent_conversation_turns
+        WHERE session_id = %s
+        """
+
+        try:
+            result = await self._execute_query(
+                query, (session_id, session_id, session_id), fetch=True, fetch_one=True
+            )
+            if not result or not result["total_turns"]:
+                return None
+            # SUM comes back as DECIMAL
+            result["sum_processing_time_ms"] = int(result["sum_processing_time_ms"] or 0)
+            result["error_count"] = int(result["error_count"])
+            result["message_type_counts"] = loads(result["message_type_counts"])
+            result["agents_involved"] = loads(result["agents_involved"])
+            return result
+
+        except Exception as e:
+            logger.error(f"Failed to aggregate conversation turn metrics: {e}")
+            raise
+
+    async def append_conversation_turn(self, session_id: str, turn_json: str) -> None:
+        """
+        Append one turn to a session's conversation_history column.
+
+        The array is extended server-side, so only the new turn is sent
+        instead of the whole history.
+
+        Args:
+            session_id: Session ID
+            turn_json: JSON-encoded turn
+        """
+        query = """
+        UPDATE agent_sessions
+        SET conversation_history = JSON_ARRAY_APPEND(
+                COALESCE(conversation_history, JSON_ARRAY()), '$', CAST(%s AS JSON)
+            ),
+            updated_at = NOW()
+        WHERE session_id = %s
+        """
+
+        try:
+            await self._execute_query(query, (turn_json, session_id), prepared=True)
+
+        except Exception as e:
+            logger.error(f"Failed to append conversation turn: {e}")
+            raise
+
+    async def get_conversation_turns(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        agent_name: Optional[str] = None,
+        message_type: Optional[str] = None,
+        before_seq: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the conversation turns of a session, oldest first.
+
+        Args:
+            session_id: Session ID
+            limit: Return only the most recent turns, at most this many
+            agent_name: Filter by agent
+            message_type: Filter by message type
+            before_seq: Only return turns older than this sequence number
+
+        Returns:
+            List of turn rows with content and metadata decoded
+        """
+        where_clauses = ["session_id = %s"]
+        params: List[Any] = [session_id]
+
+        if agent_name:
+            where_clauses.append("agent_name = %s")
+            params.append(agent_name)
+
+        if message_type:
+            where_clauses.append("message_type = %s")
+            params.append(message_type)
+
+        if before_seq is not None:
+            where_clauses.append("seq < %s")
+            params.append(before_seq)
+
+        query = f"""
+        SELECT seq, agent_name, message_type, content, ts_ms, processing_time_ms, metadata, is_error
+        FROM agent_conversation_turns
+        WHERE {' AND '.join(where_clauses)}
+        """
+
+        # Read the newest turns backwards so LIMIT stops the range scan early
+        if limit:
+            query += " ORDER BY seq DESC LIMIT %s"
+            params.append(limit)
+        else:
+            query += " ORDER BY seq"
+
+        try:
+            results = await self._execute_query(query, tuple(params), fetch=True, prepared=True) or []
+            if limit:
+                results.reverse()
+
+            for row in results:
+                row["content"] = loads(row["content"]) if row["content"] else {}
+                row["metadata"] = loads(row["metadata"]) if row["metadata"] else {}
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Failed to get conversation turns: {e}")
+            raise
+
    # Task Queue Operations
     async def enqueue_task(
         self,
@@ -962,7 +1951,8 @@ class TiDBCommunicationService:
         task_type: str,
         parameters: Dict[str, Any],
         priority: int = 5,
-        max_retries: int = 3
+        max_retries: int = 3,
+        task_id: Optional[str] = None
     ) -> str:
         """
         Enqueue a task for an agent.
@@ -973,11 +1963,12 @@ class TiDBCommunicationService:
             parameters: Task parameters
             priority: Task priority (1-10, lower is higher priority)
             max_retries: Maximum retry attempts
+            task_id: Task ID to use; generated when omitted
             
         Returns:
             Task ID
         """
-        task_id = str(uuid.uuid4())
+        task_id = task_id or str(uuid.uuid4())
         
         query = """
         INSERT INTO agent_tasks 
@@ -989,7 +1980,7 @@ class TiDBCommunicationService:
             task_id,
             agent_name,
             task_type,
-            json.dumps(parameters),
+            dumps(parameters),
             priority,
             max_retries
         )
@@ -1065,10 +2056,10 @@ class TiDBCommunicationService:
                     task_id=result["task_id"],
                     agent_name=result["agent_name"],
                     task_type=result["task_type"],
-                    parameters=json.loads(result["parameters"]) if result["parameters"] else {},
+                    parameters=loads(result["parameters"]) if result["parameters"] else {},
                     priority=result["priority"],
                     status=TaskStatus.PROCESSING,
-                    result=json.loads(result["result"]) if result["result"] else None,
+                    result=loads(result["result"]) if result["result"] else None,
                     error_message=result["error_message"],
                     retry_count=result["retry_count"],
                     max_retries=result["max_retries"],
@@ -1130,7 +2121,7 @@ class TiDBCommunicationService:
             set_clauses.append("completed_at = NOW()")
             if result is not None:
                 set_clauses.append("result = %s")
-                params.append(json.dumps(result))
+                params.append(dumps(result))
         elif status == TaskStatus.FAILED:
             set_clauses.append("completed_at = NOW()")
             if error_message:
@@ -1185,7 +2176,7 @@ class TiDBCommunicationService:
                     "agent_name": result["agent_name"],
                     "task_type": result["task_type"],
                     "status": result["status"],
-                    "result": json.loads(result["result"]) if result["result"] else None,
+                    "result": loads(result["result"]) if result["result"] else None,
                     "error_message": result["error_message"],
                     "retry_count": result["retry_count"],
                     "max_retries": result["max_retries"],
@@ -110,4 +110,13 @@ async def main():
     await manager.run_forever()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop on POSIX, winloop on Windows, plain asyncio if neither is installed
+    for loop_module in ("uvloop", "winloop"):
+        try:
+            run = __import__(loop_module).run
+            break
+        except ImportError:
+            continue
+    else:
+        run = asyncio.run
+    run(main())
\ No newline at end of file
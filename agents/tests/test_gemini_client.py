@@ -0,0 +1,98 @@
+"""
+Tests for GeminiClient generation config handling and request batching.
+"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from agents.communication.gemini_client import GeminiClient
+
+
+class _Types:
+    """Stand-in for google.genai.types that records the config arguments."""
+    
+    @staticmethod
+    def GenerateContentConfig(**kwargs):
+        return kwargs
+
+
+class BuildConfigTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = GeminiClient.__new__(GeminiClient)
+        patcher = mock.patch.object(GeminiClient, "_lazy_sdk", return_value=(None, _Types))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_unset_overrides_keep_defaults(self):
+        config = self.client._build_config(
+            temperature=None,
+            max_output_tokens=None,
+            system_instruction=None
+        )
+        
+        self.assertEqual(config["temperature"], 0.7)
+        self.assertEqual(config["max_output_tokens"], 2048)
+        self.assertNotIn("system_instruction", config)
+    
+    def test_overrides_replace_defaults(self):
+        config = self.client._build_config(temperature=0.0, max_output_tokens=100)
+        
+        self.assertEqual(config["temperature"], 0.0)
+        self.assertEqual(config["max_output_tokens"], 100)
+        self.assertEqual(config["top_p"], 0.8)
+
+
+class BatchDispatcherTest(unittest.IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.client = GeminiClient.__new__(GeminiClient)
+        self.client.batch_window = 0.01
+        self.client.max_batch = 32
+        self.client._batch_queue = asyncio.Queue()
+        self.client._dispatch_tasks = set()
+        self.calls = []
+        
+        async def generate(prompt, system_instruction, temperature, max_tokens):
+            self.calls.append((prompt, temperature))
+            return f"response {len(self.calls)}"
+        
+        self.client._generate = generate
+    
+    async def _dispatch(self, requests):
+        loop = asyncio.get_running_loop()
+        futures = []
+        for request in requests:
+            future = loop.create_future()
+            futures.append(future)
+            await self.client._batch_queue.put((request, future))
+        dispatcher = asyncio.create_task(self.client._batch_dispatcher())
+        try:
+            return await asyncio.gather(*futures)
+        finally:
+            dispatcher.cancel()
+    
+    async def test_identical_deterministic_requests_share_a_call(self):
+        request = ("prompt", None, 0, None)
+        
+        results = await self._dispatch([request, request])
+        
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(results[0], results[1])
+    
+    async def test_sampled_requests_bypass_the_dispatcher(self):
+        self.client._batch_loop = None
+        self.client._batch_task = None
+        
+        results = await asyncio.gather(
+            self.client.generate_content("prompt", temperature=0.7),
+            self.client.generate_content("prompt")
+        )
+        
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(len(set(results)), 2)
+        self.assertIsNone(self.client._batch_task)
+
+if __name__ == "__main__":
+    unittest.main()
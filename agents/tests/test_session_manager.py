@@ -0,0 +1,110 @@
+"""
+Tests for SessionManager metrics aggregation and the derived cache index.
+"""
+
+import unittest
+from types import SimpleNamespace
+
+from agents.communication.session_manager import (
+    ConversationTurn,
+    DerivedCacheIndex,
+    SessionManager,
+)
+
+
+def _entry(session_id, agent_name, message_type, ts_ms, processing_time_ms=None, is_error=False):
+    """Buffered (session_id, turn, row) entry; only row[-1] (is_error) is read."""
+    turn = ConversationTurn(
+        agent_name=agent_name,
+        message_type=message_type,
+        content={},
+        ts_ms=ts_ms,
+        processing_time_ms=processing_time_ms
+    )
+    return session_id, turn, (session_id, agent_name, message_type, is_error)
+
+
+class MetricsDeltasTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.manager = SessionManager(communication_service=None)
+    
+    def test_turns_are_aggregated_per_session(self):
+        deltas = self.manager._metrics_deltas([
+            _entry("s1", "tutor", "answer", 1000, processing_time_ms=30),
+            _entry("s2", "grader", "score", 1500),
+            _entry("s1", "tutor", "error", 2000, processing_time_ms=10, is_error=True),
+            _entry("s1", "coach", "answer", 3000),
+        ])
+        
+        self.assertEqual(deltas["s1"], {
+            "turn_count": 3,
+            "processing_time_ms_sum": 40,
+            "processing_samples": 2,
+            "first_ts_ms": 1000,
+            "last_ts_ms": 3000,
+            "error_count": 1,
+            "message_type_counts": {"answer": 2, "error": 1},
+            "new_agents": ["tutor", "coach"]
+        })
+        self.assertEqual(deltas["s2"]["turn_count"], 1)
+        self.assertEqual(deltas["s2"]["processing_samples"], 0)
+        self.assertEqual(deltas["s2"]["new_agents"], ["grader"])
+    
+    def test_known_agents_are_not_resent_and_cache_is_untouched(self):
+        cached = SimpleNamespace(agents_seen={"tutor"})
+        self.manager.active_sessions["s1"] = cached
+        
+        deltas = self.manager._metrics_deltas([
+            _entry("s1", "tutor", "answer", 1000),
+            _entry("s1", "coach", "answer", 2000),
+        ])
+        
+        self.assertEqual(deltas["s1"]["new_agents"], ["coach"])
+        # Only a committed flush may record agents as seen
+        self.assertEqual(cached.agents_seen, {"tutor"})
+
+
+class DerivedCacheIndexTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.cache = {}
+        self.index = DerivedCacheIndex(self.cache, maxsize=2)
+    
+    def _derive(self, session_id, key):
+        self.cache[key] = "value"
+        self.index.register(session_id, key)
+    
+    def test_invalidate_evicts_only_the_sessions_entries(self):
+        self._derive("s1", "summary:s1")
+        self._derive("s1", "metrics:s1")
+        self._derive("s2", "metrics:s2")
+        
+        self.index.invalidate("s1")
+        
+        self.assertEqual(self.cache, {"metrics:s2": "value"})
+    
+    def test_shared_entry_is_evicted_by_any_source_session(self):
+        self.cache["summaries:user"] = "value"
+        self.index.register_all(["s1", "s2"], "summaries:user")
+        
+        self.index.invalidate("s2")
+        
+        self.assertNotIn("summaries:user", self.cache)
+    
+    def test_dropping_least_recent_session_evicts_its_entries(self):
+        self._derive("s1", "metrics:s1")
+        self._derive("s2", "metrics:s2")
+        # Touching s1 makes s2 the least recently registered
+        self._derive("s1", "summary:s1")
+        
+        self._derive("s3", "metrics:s3")
+        
+        self.assertNotIn("metrics:s2", self.cache)
+        self.assertIn("metrics:s1", self.cache)
+        self.assertIn("summary:s1", self.cache)
+        self.assertIn("metrics:s3", self.cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Tests for TaskQueueManager status buffering and _delay_until formatting.
+"""
+
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from agents.communication.task_queue_manager import TaskQueueManager, _delay_until
+from agents.communication.tidb_service import TaskStatus
+
+
+class _FakeComm:
+    """Records queries; raises for the first `failures` calls."""
+    
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.queries = []
+    
+    async def _execute_query(self, query, params=None, **kwargs):
+        self.queries.append((query, params))
+        await asyncio.sleep(0)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+
+
+class DelayUntilTest(unittest.TestCase):
+    
+    def test_seconds_from_now_always_carry_microseconds(self):
+        before = datetime.now()
+        value = _delay_until(5)
+        
+        self.assertRegex(value, r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}$")
+        self.assertGreaterEqual(datetime.fromisoformat(value), before + timedelta(seconds=5))
+    
+    def test_iso_string_without_fraction_is_padded(self):
+        self.assertEqual(_delay_until("2026-01-01T10:00:00"), "2026-01-01T10:00:00.000000")
+    
+    def test_aware_time_is_converted_to_local_time(self):
+        aware = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc)
+        
+        expected = aware.astimezone().replace(tzinfo=None).isoformat(timespec="microseconds")
+        self.assertEqual(_delay_until(aware), expected)
+    
+    def test_malformed_value_is_rejected(self):
+        for value in ("tomorrow", None):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    _delay_until(value)
+
+
+class StatusFlushTest(unittest.IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.comm = _FakeComm()
+        self.manager = TaskQueueManager(self.comm)
+        self.manager.status_flush_interval = 0.01
+        self.manager.status_flush_max_delay = 0.04
+    
+    async def asyncTearDown(self):
+        task = self.manager._status_flush_task
+        if task is not None and not task.done():
+            task.cancel()
+    
+    async def test_flush_writes_one_update_with_case_expressions(self):
+        self.manager._status_buffer = {
+            "t1": (TaskStatus.COMPLETED, '{"score": 1}', None),
+            "t2": (TaskStatus.FAILED, None, "boom"),
+        }
+        
+        await self.manager.flush()
+        
+        self.assertEqual(len(self.comm.queries), 1)
+        query, params = self.comm.queries[0]
+        self.assertEqual(query.count("%s"), len(params))
+        self.assertEqual(params, (
+            "t1", "completed", "t2", "failed",
+            "t1", '{"score": 1}',
+            "t2", "boom",
+            "t1", "t2"
+        ))
+        self.assertEqual(self.manager._status_buffer, {})
+    
+    async def test_failed_flush_keeps_statuses_and_schedules_a_retry(self):
+        self.comm.failures = 1
+        self.manager._status_buffer = {"t1": (TaskStatus.COMPLETED, None, None)}
+        
+        with self.assertRaises(RuntimeError):
+            await self.manager.flush()
+        
+        self.assertIn("t1", self.manager._status_buffer)
+        self.assertEqual(self.manager._status_flush_failures, 1)
+        retry = self.manager._status_flush_task
+        self.assertIsNotNone(retry)
+        
+        await retry
+        
+        self.assertEqual(self.manager._status_buffer, {})
+        self.assertEqual(self.manager._status_flush_failures, 0)
+        self.assertEqual(len(self.comm.queries), 2)
+    
+    async def test_newer_status_wins_over_a_failed_one(self):
+        self.comm.failures = 1
+        self.manager._status_buffer = {"t1": (TaskStatus.FAILED, None, "old")}
+        flush = asyncio.create_task(self.manager.flush())
+        await asyncio.sleep(0)
+        # Buffered while the failing write is in flight
+        self.manager._status_buffer["t1"] = (TaskStatus.COMPLETED, None, None)
+        
+        with self.assertRaises(RuntimeError):
+            await flush
+        
+        self.assertEqual(self.manager._status_buffer["t1"][0], TaskStatus.COMPLETED)
+    
+    async def test_full_buffer_flush_error_does_not_reach_the_caller(self):
+        self.comm.failures = 1
+        self.manager.status_batch_size = 1
+        
+        await self.manager._buffer_status("t1", TaskStatus.COMPLETED)
+        
+        self.assertIn("t1", self.manager._status_buffer)
+        self.assertIsNotNone(self.manager._status_flush_task)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for the SQL statements TiDBCommunicationService builds in Python.
+"""
+
+import unittest
+
+from agents.communication.serialization import loads
+from agents.communication.tidb_service import TiDBCommunicationService
+
+
+class TurnMetricsStatementTest(unittest.TestCase):
+    
+    def _statement(self, message_type_counts, new_agents):
+        return TiDBCommunicationService._turn_metrics_statement(
+            "s1",
+            turn_count=3,
+            processing_time_ms_sum=40,
+            processing_samples=2,
+            first_ts_ms=1000,
+            last_ts_ms=3000,
+            error_count=1,
+            message_type_counts=message_type_counts,
+            new_agents=new_agents
+        )
+    
+    def test_placeholders_match_parameters(self):
+        for counts, agents in [
+            ({"answer": 2, "error": 1}, ["tutor", "coach"]),
+            ({"answer": 3}, []),
+        ]:
+            with self.subTest(counts=counts, agents=agents):
+                query, params = self._statement(counts, agents)
+                self.assertEqual(query.count("%s"), len(params))
+    
+    def test_parameters_follow_the_statement_order(self):
+        query, params = self._statement({"answer": 2, "error": 1}, ["tutor"])
+        
+        self.assertEqual(params[:7], ("s1", 3, 40, 2, 1000, 3000, 1))
+        # INSERT: type/count pairs, then agent names
+        self.assertEqual(params[7:11], ("answer", 2, "error", 1))
+        self.assertEqual(params[11], "tutor")
+        # UPDATE: agent paths, then (path, path, increment) per type
+        self.assertEqual(params[12], "tutor")
+        self.assertEqual(params[13:], ("answer", "answer", 2, "error", "error", 1))
+    
+    def test_known_agents_leave_agents_involved_alone(self):
+        query, _ = self._statement({"answer": 1}, [])
+        
+        self.assertNotIn("agents_involved = JSON_SET", query)
+
+
+class ConversationTurnsStatementTest(unittest.TestCase):
+    
+    def test_one_values_group_per_row(self):
+        rows = [
+            TiDBCommunicationService.conversation_turn_row("s1", "tutor", "answer", {"text": "hi"}, 1000),
+            TiDBCommunicationService.conversation_turn_row("s1", "tutor", "error", {"error": "x"}, 2000, is_error=True),
+        ]
+        
+        query, params = TiDBCommunicationService._conversation_turns_statement(rows)
+        
+        self.assertEqual(query.count("%s"), len(params))
+        self.assertEqual(len(params), 2 * len(rows[0]))
+        self.assertEqual(params[-1], True)
+
+
+class JsonSetClauseTest(unittest.TestCase):
+    
+    def test_placeholders_match_parameters(self):
+        clause, params = TiDBCommunicationService._json_set_clause(
+            "session_state", {"step": 2, "goal": {"topic": "loops"}}
+        )
+        
+        self.assertTrue(clause.startswith("session_state = JSON_SET("))
+        self.assertEqual(clause.count("%s"), len(params))
+        self.assertEqual(params[0], "step")
+        self.assertEqual(loads(params[1]), 2)
+        self.assertEqual(params[2], "goal")
+        self.assertEqual(loads(params[3]), {"topic": "loops"})
+    
+    def test_no_updates_keeps_the_column(self):
+        clause, params = TiDBCommunicationService._json_set_clause("session_state", {})
+        
+        self.assertEqual(clause, "session_state = COALESCE(session_state, JSON_OBJECT())")
+        self.assertEqual(params, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
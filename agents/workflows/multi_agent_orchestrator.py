@@ -507,7 +507,7 @@ class MultiAgentOrchestrator:
             
             results = await self.tidb_service._execute_query(
                 search_query,
-                (json.dumps(query_vector), search_type, limit),
+                (json.dumps(query_vector.tolist()), search_type, limit),
                 fetch=True
             )
             
@@ -548,7 +548,7 @@ class MultiAgentOrchestrator:
                     content_id,
                     content_type,
                     content,
-                    json.dumps(embedding_vector),
+                    json.dumps(embedding_vector.tolist()),
                     json.dumps(metadata),
                     datetime.now(),
                     datetime.now()
@@ -7,7 +7,7 @@ import os
 import json
 import asyncio
 import subprocess
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
 from datetime import datetime
 import httpx
 from pathlib import Path
@@ -16,10 +16,139 @@ class AgentService:
     def __init__(self):
         self.agents_path = Path(__file__).parent.parent.parent / "agents"
         self.api_bridge_path = self.agents_path / "api_bridge.py"
+        # Unix socket of a persistent `api_bridge.py --socket` process; when
+        # unset, every action falls back to spawning a bridge subprocess.
+        self.bridge_socket = os.getenv("AGENT_BRIDGE_SOCKET")
+        self._bridge_reader: Optional[asyncio.StreamReader] = None
+        self._bridge_writer: Optional[asyncio.StreamWriter] = None
+        self._bridge_lock = asyncio.Lock()
+        self._bridge_pending: Dict[int, asyncio.Future] = {}
+        self._bridge_reader_task: Optional[asyncio.Task] = None
+        self._next_request_id = 0
+        # send_message calls arriving within this window go to the bridge
+        # as one send_messages batch
+        self.send_coalesce_window = 0.005  # seconds
+        self._send_buffer: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._send_flush_handle: Optional[asyncio.TimerHandle] = None
+        # Running flushes, referenced until done so they aren't collected
+        self._send_flush_tasks: Set[asyncio.Task] = set()
+    
+    async def _ensure_bridge_connection(self) -> None:
+        """Open (or reopen) the persistent connection to the bridge daemon."""
+        async with self._bridge_lock:
+            if self._bridge_writer and not self._bridge_writer.is_closing():
+                return
+            self._bridge_reader, self._bridge_writer = await asyncio.open_unix_connection(
+                self.bridge_socket
+            )
+            self._bridge_reader_task = asyncio.create_task(self._read_bridge_responses())
+    
+    async def _read_bridge_responses(self) -> None:
+        """Route responses from the bridge daemon to their waiting callers."""
+        try:
+            while True:
+                line = await self._bridge_reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._bridge_pending.pop(response.get("id"), None)
+                if future and not future.done():
+                    future.set_result(response)
+        finally:
+            # Connection lost: fail everything still in flight
+            for future in self._bridge_pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Agent bridge connection closed"))
+            self._bridge_pending.clear()
+            if self._bridge_writer:
+                self._bridge_writer.close()
+    
+    async def _execute_via_bridge(self, action: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute agent action over the persistent bridge socket"""
+        await self._ensure_bridge_connection()
+        
+        self._next_request_id += 1
+        request_id = self._next_request_id
+        future = asyncio.get_running_loop().create_future()
+        self._bridge_pending[request_id] = future
+        
+        request = {"id": request_id, "action": action, "data": data}
+        self._bridge_writer.write((json.dumps(request) + "\n").encode())
+        await self._bridge_writer.drain()
+        
+        try:
+            response = await asyncio.wait_for(future, timeout=30.0)
+        finally:
+            self._bridge_pending.pop(request_id, None)
+        
+        if response.get("success"):
+            return {
+                "success": True,
+                "result": response.get("result"),
+                "action": action
+            }
+        return {
+            "success": False,
+            "error": response.get("error", "Unknown error"),
+            "action": action
+        }
+        
+    async def _coalesce_send_message(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a send_message for the next batched send_messages call"""
+        future = asyncio.get_running_loop().create_future()
+        self._send_buffer.append((data, future))
+        if self._send_flush_handle is None:
+            self._send_flush_handle = asyncio.get_running_loop().call_later(
+                self.send_coalesce_window,
+                self._start_send_flush
+            )
+        return await future
+    
+    def _start_send_flush(self) -> None:
+        """Run a flush of the send buffer, keeping a reference to its task"""
+        task = asyncio.create_task(self._flush_send_buffer())
+        self._send_flush_tasks.add(task)
+        task.add_done_callback(self._send_flush_tasks.discard)
+    
+    async def _flush_send_buffer(self) -> None:
+        """Send all queued messages in one bridge request"""
+        batch, self._send_buffer = self._send_buffer, []
+        self._send_flush_handle = None
+        if not batch:
+            return
+        
+        try:
+            response = await self._execute_via_bridge(
+                "send_messages", {"messages": [data for data, _ in batch]}
+            )
+        except Exception as e:
+            response = {"success": False, "error": str(e)}
+        
+        message_ids = response.get("result") or []
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if response.get("success"):
+                future.set_result({
+                    "success": True,
+                    "result": message_ids[index],
+                    "action": "send_message"
+                })
+            else:
+                future.set_result({
+                    "success": False,
+                    "error": response.get("error", "Unknown error"),
+                    "action": "send_message"
+                })
         
     async def execute_action(self, action: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute agent action via Python subprocess"""
+        """Execute agent action via the bridge daemon or a Python subprocess"""
         try:
+            if self.bridge_socket:
+                if action == "send_message":
+                    return await self._coalesce_send_message(data)
+                return await self._execute_via_bridge(action, data)
+            
             # Prepare command
             cmd = [
                 "python",